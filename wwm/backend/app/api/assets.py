@@ -0,0 +1,105 @@
+"""Content-hashed, precompressed frontend assets.
+
+``build_frontend_assets`` copies ``style.css`` and ``app.js`` to
+``<name>.<hash>.<ext>`` with ``.gz`` (and, with brotli installed, ``.br``)
+siblings, and writes an ``index.html`` that points at the hashed names. The
+hashed files never change, so ``PrecompressedFiles`` serves them as immutable; ``index.html``
+is revalidated on every load.
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.api.compression import brotli, negotiate_encoding, supported_encodings
+
+logger = logging.getLogger(__name__)
+
+HASHED_ASSETS = ("style.css", "app.js")
+ASSETS_URL = "/assets"
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _write_with_variants(path: Path, data: bytes) -> None:
+    _write_atomic(path, data)
+    _write_atomic(path.with_name(path.name + SUFFIXES["gzip"]), gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write_atomic(path.with_name(path.name + SUFFIXES["br"]), brotli.compress(data, quality=11))
+
+
+def build_frontend_assets(source_dir: Path, build_dir: Path) -> dict[str, str]:
+    """Write hashed, precompressed assets and a rewritten index.html; returns name -> hashed name."""
+    build_dir.mkdir(parents=True, exist_ok=True)
+    manifest: dict[str, str] = {}
+    for name in HASHED_ASSETS:
+        source = source_dir / name
+        if not source.exists():
+            continue
+        data = source.read_bytes()
+        stem, ext = os.path.splitext(name)
+        hashed = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+        if not (build_dir / hashed).exists():
+            _write_with_variants(build_dir / hashed, data)
+        manifest[name] = hashed
+
+    index = source_dir / "index.html"
+    if index.exists():
+        html = index.read_text(encoding="utf-8")
+        for name, hashed in manifest.items():
+            html = html.replace(f'"{name}"', f'"{ASSETS_URL}/{hashed}"')
+        built_index = build_dir / "index.html"
+        if not built_index.exists() or built_index.read_text(encoding="utf-8") != html:
+            _write_with_variants(built_index, html.encode("utf-8"))
+
+    for path in build_dir.iterdir():
+        if path.suffix == ".tmp":
+            continue
+        base = path.name.removesuffix(".gz").removesuffix(".br")
+        if base != "index.html" and base not in manifest.values():
+            path.unlink(missing_ok=True)
+    logger.info("Built frontend assets in %s: %s", build_dir, manifest)
+    return manifest
+
+
+class PrecompressedFiles(StaticFiles):
+    """StaticFiles that picks a ``.br``/``.gz`` sibling by Accept-Encoding and sets Cache-Control."""
+
+    def __init__(self, *args, cache_control: str = IMMUTABLE, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    def file_response(self, full_path, stat_result, scope: Scope, status_code: int = 200) -> Response:
+        path = Path(full_path)
+        request_headers = Headers(scope=scope)
+        available = tuple(
+            encoding for encoding in supported_encodings() if path.with_name(path.name + SUFFIXES[encoding]).exists()
+        )
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""), available)
+        if encoding:
+            path = path.with_name(path.name + SUFFIXES[encoding])
+            stat_result = os.stat(path)
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        response = FileResponse(path, status_code=status_code, media_type=media_type, stat_result=stat_result)
+        response.headers["Cache-Control"] = self.cache_control
+        response.headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
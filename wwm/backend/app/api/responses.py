@@ -0,0 +1,62 @@
+"""Opt-in fast JSON encoding for large list responses.
+
+With ``FAST_JSON=true`` the big list endpoints return ``FastJSONResponse``,
+which encodes with orjson (or msgspec) directly and skips FastAPI's
+``jsonable_encoder`` walk. Without either library, or with the setting off,
+they fall back to the standard encoder.
+"""
+
+from datetime import date, datetime
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, tuple):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default)
+
+elif msgspec is not None:
+    _encoder = msgspec.json.Encoder(enc_hook=_default)
+
+    def dumps(content: Any) -> bytes:
+        return _encoder.encode(content)
+
+else:
+
+    def dumps(content: Any) -> bytes:
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def fast_json(content: Any) -> Any:
+    """Wrap ``content`` in ``FastJSONResponse`` when enabled; otherwise return it for FastAPI to encode."""
+    if settings.fast_json:
+        return FastJSONResponse(content)
+    return content
@@ -1,16 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Header
-from sqlalchemy import func, select, text, delete
-from sqlalchemy.orm import Session, selectinload
-
-from app.db.session import get_db
+import asyncio
+import csv
+import io
+import json
+import tempfile
+import time
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session, aliased, sessionmaker
+
+from app.api.responses import fast_json
+from app.db.session import SessionLocal, get_db, get_read_db, read_sessionmaker
 from app.core.config import settings
-from app.models import Affiliation, AuditLog, GenomicRecord, Sample, SampleAffiliation, SampleSpecies
-from app.schemas.schemas import ApprovalRequest, GenomicRecordOut, GenomicsCreate, SpeciesCreate
+from app.models import Affiliation, BackgroundJob, GenomicRecord, IngestRun, Sample, SampleSpecies
+from app.schemas.schemas import (
+    ApprovalRequest,
+    BulkApprovalRequest,
+    BulkSpeciesRequest,
+    GenomicRecordOut,
+    GenomicsCreate,
+    SpeciesCreate,
+)
 from app.services.accession import validate_accession
 from app.services.audit import write_audit
 from app.services.auth import require_role
-from app.services.kobo_ingest import fetch_kobo_submissions, get_first, get_kobo_fields_debug, ingest_kobo_submissions
-from app.services.scheduler import scheduler
+from app.services.curation import bulk_add_species, bulk_set_status
+from app.services.events import broadcaster, format_sse
+from app.services.export import EXPORT_FORMATS, export_cache_path, stream_export
+from app.services.genomics_import import import_genomics_csv
+from app.services.jobs import job_status, submit_ingest_job
+from app.services.kobo_ingest import (
+    fetch_kobo_submissions,
+    get_kobo_fields_debug,
+    refresh_kobo_samples,
+    run_kobo_ingest,
+    submission_sample_id,
+)
+from app.services.kobo_assets import find_asset, kobo_assets
+from app.services.kobo_webhook import enqueue_submission, verify_webhook, webhook_enabled
+from app.services.photos import is_raster_image, photo_file
+from app.services.points import STATUS_CODES, points_as_bytes, points_as_json, sample_points, sample_popup
+from app.services.sample_filters import sample_filter_clauses
+from app.services.scheduler import leader, scheduler
+from app.services.samples import (
+    current_change_token,
+    parse_change_token,
+    parse_fields,
+    sample_changes,
+    sample_detail,
+    sample_list,
+    sample_rows,
+)
+from app.services.search import search
+from app.services.spatial import samples_near
+from app.services.stats import country_stats, refresh_country_stats, sample_timeseries
 
 router = APIRouter(prefix="/api", tags=["wwm"])
 
@@ -22,6 +68,7 @@ def health(db: Session = Depends(get_db)):
         "status": "ok",
         "database": "connected",
         "scheduler": "running" if scheduler.running else "stopped",
+        "scheduler_leader": leader.is_leader,
     }
 
 
@@ -30,73 +77,247 @@ def list_samples(
     species: str | None = Query(default=None),
     status: str | None = Query(default=None),
     affiliation: str | None = Query(default=None),
+    fields: str | None = Query(default=None, description="Comma-separated subset of sample fields"),
+    layout: Literal["objects", "rows"] = Query(default="objects"),
+    db: Session = Depends(get_read_db),
+):
+    try:
+        selected = parse_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if layout == "rows":
+        return fast_json(sample_rows(db, selected, species=species, status=status, affiliation=affiliation))
+    return fast_json(sample_list(db, selected, species=species, status=status, affiliation=affiliation))
+
+
+@router.get("/samples/near")
+def list_samples_near(
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    radius_km: float = Query(default=10, gt=0, le=1000),
+    k: int = Query(default=50, ge=1, le=500),
+    species: str | None = Query(default=None),
+    status: str | None = Query(default=None),
+    affiliation: str | None = Query(default=None),
+    db: Session = Depends(get_read_db),
+):
+    results = samples_near(
+        db,
+        lat=lat,
+        lon=lon,
+        radius_km=radius_km,
+        k=k,
+        filters=sample_filter_clauses(species=species, status=status, affiliation=affiliation),
+    )
+    return {"lat": lat, "lon": lon, "radius_km": radius_km, "count": len(results), "results": results}
+
+
+@router.get("/samples/points")
+def list_sample_points(
+    points_format: Literal["json", "binary"] = Query(default="json", alias="format"),
+    species: str | None = Query(default=None),
+    status: str | None = Query(default=None),
+    affiliation: str | None = Query(default=None),
+    db: Session = Depends(get_read_db),
+):
+    token = current_change_token(db)
+    columns = sample_points(db, species=species, status=status, affiliation=affiliation)
+    if points_format == "json":
+        return {"token": token, **points_as_json(*columns)}
+    return Response(
+        content=points_as_bytes(*columns),
+        media_type="application/octet-stream",
+        headers={
+            "X-Point-Count": str(len(columns[0])),
+            "X-Status-Codes": ",".join(STATUS_CODES),
+            "X-Change-Token": token,
+        },
+    )
+
+
+@router.get("/samples/points/{sample_id}")
+def get_sample_popup(sample_id: int, db: Session = Depends(get_read_db)):
+    popup = sample_popup(db, sample_id)
+    if popup is None:
+        raise HTTPException(status_code=404, detail="Sample not found")
+    return popup
+
+
+@router.get("/samples/changes")
+def list_sample_changes(
+    since: str | None = Query(default=None, description="Token from the previous call; omit for a full sync"),
+    species: str | None = Query(default=None),
+    status: str | None = Query(default=None),
+    affiliation: str | None = Query(default=None),
+    fields: str | None = Query(default=None),
     db: Session = Depends(get_db),
 ):
-    stmt = select(Sample).options(
-        selectinload(Sample.affiliations).selectinload(SampleAffiliation.affiliation),
-        selectinload(Sample.species_entries).selectinload(SampleSpecies.genomic_records),
+    parsed = parse_change_token(since)
+    if parsed is None:
+        raise HTTPException(status_code=400, detail="Malformed change token")
+    txid, issued_at = parsed
+    if txid and issued_at < time.time() - settings.change_feed_retention_days * 86400:
+        raise HTTPException(status_code=410, detail="Change token expired; start a full sync")
+    try:
+        selected = parse_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return sample_changes(db, txid, selected, species=species, status=status, affiliation=affiliation)
+
+
+@router.get("/samples/{sample_id}/photo")
+def get_sample_photo(
+    sample_id: int,
+    request: Request,
+    variant: Literal["thumbnail", "original"] = Query(default="thumbnail"),
+    db: Session = Depends(get_read_db),
+):
+    photo = photo_file(db, sample_id, variant)
+    if photo is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    path, media_type, etag = photo
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400", "X-Content-Type-Options": "nosniff"}
+    if not is_raster_image(media_type):
+        # Stored before non-images were refused; never render those from our origin.
+        headers["Content-Disposition"] = f'attachment; filename="sample-{sample_id}-photo"'
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+@router.get("/samples/{external_id}")
+def get_sample(
+    external_id: str,
+    include_raw: bool = Query(default=False),
+    x_api_key: str | None = Header(default=None),
+    db: Session = Depends(get_read_db),
+):
+    if include_raw:
+        # The raw submission carries collector details the public record leaves out.
+        require_role("curator")(x_api_key)
+    detail = sample_detail(db, external_id, include_raw=include_raw)
+    if detail is None:
+        raise HTTPException(status_code=404, detail="Sample not found")
+    return detail
+
+
+@router.get("/export")
+def export_samples(
+    export_format: Literal["csv", "geojson", "parquet"] = Query(default="csv", alias="format"),
+    species: str | None = Query(default=None),
+    status: str | None = Query(default=None),
+    affiliation: str | None = Query(default=None),
+    read_session: sessionmaker = Depends(read_sessionmaker),
+    db: Session = Depends(get_db),
+):
+    filters = {"species": species, "status": status, "affiliation": affiliation}
+    media_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"wwm-samples.{extension}"
+
+    # The cache key is read before the export query and both go to the primary,
+    # so a cached file is never older than the data version in its name.
+    cache_path = export_cache_path(db, export_format, filters)
+    if cache_path is not None and cache_path.exists():
+        return FileResponse(cache_path, media_type=media_type, filename=filename)
+
+    return StreamingResponse(
+        stream_export(export_format, filters, cache_path, SessionLocal if cache_path else read_session),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
-    if status:
-        stmt = stmt.where(Sample.status == status)
 
-    if species:
-        stmt = stmt.join(SampleSpecies, SampleSpecies.sample_id == Sample.id).where(
-            func.lower(SampleSpecies.species_name) == species.lower()
-        )
+@router.get("/search")
+def search_samples(
+    q: str = Query(min_length=3, max_length=100),
+    limit: int = Query(default=10, ge=1, le=25),
+    db: Session = Depends(get_read_db),
+):
+    return {"query": q, "results": search(db, q, limit=limit)}
 
-    if affiliation:
-        stmt = (
-            stmt.join(SampleAffiliation, SampleAffiliation.sample_id == Sample.id)
-            .join(Affiliation, Affiliation.id == SampleAffiliation.affiliation_id)
-            .where(func.lower(Affiliation.name) == affiliation.lower())
-        )
 
-    stmt = stmt.order_by(Sample.submitted_at.desc())
-    samples = db.execute(stmt).scalars().unique().all()
+@router.get("/stats/countries")
+def stats_by_country(db: Session = Depends(get_read_db)):
+    return country_stats(db)
 
-    return [
-        {
-            "sample_id": sample.external_sample_id,
-            "data_source": sample.data_source,
-            "status": sample.status,
-            "site_name": sample.site_name or "Unknown site",
-            "sampling_date": sample.sampling_date.isoformat()
-            if sample.sampling_date
-            else sample.submitted_at.date().isoformat(),
-            "collector_name": sample.submitted_by
-            or (sample.raw_payload or {}).get("collector_name")
-            or (sample.raw_payload or {}).get("collector"),
-            "tube_id": (sample.raw_payload or {}).get("tube_id"),
-            "soil_ph": (sample.raw_payload or {}).get("soil_ph"),
-            "depth_cm": (sample.raw_payload or {}).get("depth_cm"),
-            "lat": sample.latitude,
-            "lon": sample.longitude,
-            "affiliations": [sa.affiliation.name for sa in sample.affiliations],
-            "affiliation_other": (sample.raw_payload or {}).get("affiliation_other"),
-            "species": [sp.species_name for sp in sample.species_entries],
-            "has_genomic_links": any(sp.genomic_records for sp in sample.species_entries),
-        }
-        for sample in samples
-    ]
+
+@router.get("/stats/timeseries")
+def stats_timeseries(
+    bucket: Literal["month", "quarter", "year"] = "month",
+    species: str | None = None,
+    affiliation: str | None = None,
+    db: Session = Depends(get_read_db),
+):
+    return sample_timeseries(db, bucket=bucket, species=species, affiliation=affiliation)
+
+
+@router.get("/events")
+async def sample_events(request: Request):
+    """Server-sent sample changes; clients resync via /samples/changes on connect and on ``resync``."""
+    subscriber = broadcaster.subscribe()
+
+    async def stream():
+        event_id = 0
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=settings.events_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                event_id += 1
+                yield format_sse(event, event_id)
+                if subscriber.overflowed and subscriber.queue.empty():
+                    break
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/species")
-def list_species(db: Session = Depends(get_db)):
+def list_species(db: Session = Depends(get_read_db)):
     rows = db.execute(
         select(SampleSpecies.species_name, func.count(SampleSpecies.id).label("sample_count"))
         .group_by(SampleSpecies.species_name)
         .order_by(SampleSpecies.species_name.asc())
     ).all()
-    return [{"species_name": row.species_name, "sample_count": row.sample_count} for row in rows]
+    return fast_json([{"species_name": row.species_name, "sample_count": row.sample_count} for row in rows])
 
 
 @router.get("/affiliations")
-def list_affiliations(db: Session = Depends(get_db)):
+def list_affiliations(db: Session = Depends(get_read_db)):
     rows = db.execute(select(Affiliation).order_by(Affiliation.name.asc())).scalars().all()
     return [{"slug": row.name, "name": row.display_name} for row in rows]
 
 
+@router.post("/samples/bulk/approve")
+def bulk_approve_samples(
+    payload: BulkApprovalRequest,
+    _: str = Depends(require_role("curator")),
+    db: Session = Depends(get_db),
+):
+    result = bulk_set_status(db, payload, status=payload.status, actor="curator")
+    db.commit()
+    return result
+
+
+@router.post("/samples/bulk/species")
+def bulk_add_curated_species(
+    payload: BulkSpeciesRequest,
+    _: str = Depends(require_role("curator")),
+    db: Session = Depends(get_db),
+):
+    result = bulk_add_species(db, payload, species_name=payload.species_name.strip(), actor="curator")
+    db.commit()
+    return result
+
+
 @router.post("/samples/{sample_id}/approve")
 def approve_sample(
     sample_id: int,
@@ -117,6 +338,8 @@ def approve_sample(
         entity_id=str(sample.id),
         detail={"status": payload.status},
     )
+    db.flush()
+    refresh_country_stats(db, [sample.id])
     db.commit()
     db.refresh(sample)
     return {"id": sample.id, "status": sample.status}
@@ -148,6 +371,8 @@ def add_curated_species(
         entity_id="pending",
         detail={"sample_id": sample_id, "species_name": species.species_name},
     )
+    db.flush()
+    refresh_country_stats(db, [sample_id])
     db.commit()
     db.refresh(species)
     return {
@@ -190,13 +415,21 @@ def add_genomics_record(
             "validated": validation.accession_validated,
         },
     )
-
+    db.flush()
+    refresh_country_stats(db, [species_entry.sample_id])
     db.commit()
     db.refresh(record)
     return record
 
 
-@router.post("/admin/ingest/kobo")
+def _job_accepted(job: BackgroundJob, created: bool) -> JSONResponse:
+    body = {"job_id": job.id, "status": job.status, "status_url": f"/api/admin/jobs/{job.id}"}
+    if not created:
+        body["detail"] = "Another ingest job is already active"
+    return JSONResponse(status_code=202 if created else 409, content=body)
+
+
+@router.post("/admin/ingest/kobo", status_code=202)
 def trigger_kobo_ingest(
     x_api_key: str | None = Header(default=None),
     db: Session = Depends(get_db),
@@ -206,26 +439,159 @@ def trigger_kobo_ingest(
     elif x_api_key and x_api_key != settings.api_key_admin:
         raise HTTPException(status_code=403, detail="Invalid admin API key")
 
-    result = ingest_kobo_submissions(db, actor="admin")
-    return result
+    job, created = submit_ingest_job(
+        db,
+        "kobo_ingest",
+        lambda job_db, progress: run_kobo_ingest(job_db, trigger="admin", progress=progress),
+        requested_by="admin",
+    )
+    return _job_accepted(job, created)
+
+
+@router.get("/admin/jobs/{job_id}")
+def get_background_job(job_id: str, _: str = Depends(require_role("admin")), db: Session = Depends(get_db)):
+    job = db.get(BackgroundJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+
+@router.get("/admin/ingest/runs")
+def list_ingest_runs(
+    limit: int = Query(default=20, ge=1, le=200),
+    _: str = Depends(require_role("admin")),
+    db: Session = Depends(get_db),
+):
+    runs = db.execute(select(IngestRun).order_by(IngestRun.started_at.desc()).limit(limit)).scalars().all()
+    return [
+        {
+            "id": run.id,
+            "trigger": run.trigger,
+            "mode": run.mode,
+            "status": run.status,
+            "started_at": run.started_at.isoformat(),
+            "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+            "processed": run.processed,
+            "total": run.total,
+            "ingested": run.ingested,
+            "duplicates": run.duplicates,
+            "possible_duplicates": run.possible_duplicates,
+            "errors": run.errors,
+            "error": run.error,
+            "checkpoint": {"page_start": run.checkpoint_page_start, "last_id": run.checkpoint_last_id},
+            "assets": list((run.assets or {}).values()),
+        }
+        for run in runs
+    ]
+
+
+@router.post("/admin/import/genomics")
+async def import_genomics(
+    request: Request,
+    _: str = Depends(require_role("admin")),
+    db: Session = Depends(get_db),
+):
+    """Import a ``external_sample_id,species_name,accession`` CSV sent as the request body."""
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        stream = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+        try:
+            report = await run_in_threadpool(import_genomics_csv, db, stream, "admin")
+        except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        finally:
+            stream.detach()
+    return report.as_dict()
+
+
+@router.post("/webhooks/kobo", status_code=202)
+async def receive_kobo_webhook(
+    request: Request,
+    x_kobo_signature: str | None = Header(default=None),
+    x_webhook_token: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    if not webhook_enabled():
+        raise HTTPException(status_code=503, detail="Kobo webhook is not configured")
+    body = await request.body()
+    if not verify_webhook(body, x_kobo_signature, x_webhook_token):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    try:
+        payload = json.loads(body)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Body must be JSON") from exc
+    if not isinstance(payload, dict) or not payload.get("_uuid"):
+        raise HTTPException(status_code=422, detail="Submission has no _uuid")
+
+    queued = await run_in_threadpool(enqueue_submission, db, payload)
+    return {"queued": queued, "kobo_uuid": payload["_uuid"]}
+
+
+@router.get("/admin/samples/possible-duplicates")
+def list_possible_duplicates(
+    limit: int = Query(default=200, ge=1, le=2000),
+    _: str = Depends(require_role("curator")),
+    db: Session = Depends(get_db),
+):
+    original = aliased(Sample)
+    rows = db.execute(
+        select(
+            Sample.id,
+            Sample.external_sample_id,
+            Sample.status,
+            Sample.sampling_date,
+            original.id.label("original_id"),
+            original.external_sample_id.label("original_sample_id"),
+            original.sampling_date.label("original_sampling_date"),
+            func.ST_Distance(func.geography(Sample.geom), func.geography(original.geom)).label("distance_m"),
+        )
+        .join(original, original.id == Sample.possible_duplicate_of_id)
+        .order_by(Sample.submitted_at.desc())
+        .limit(limit)
+    ).all()
+    return [
+        {
+            "id": row.id,
+            "sample_id": row.external_sample_id,
+            "status": row.status,
+            "sampling_date": row.sampling_date.isoformat() if row.sampling_date else None,
+            "possible_duplicate_of": {
+                "id": row.original_id,
+                "sample_id": row.original_sample_id,
+                "sampling_date": row.original_sampling_date.isoformat() if row.original_sampling_date else None,
+            },
+            "distance_m": round(row.distance_m, 1),
+        }
+        for row in rows
+    ]
 
 
 @router.get("/admin/kobo/fields")
-def debug_kobo_fields(_: str = Depends(require_role("admin"))):
-    return get_kobo_fields_debug()
+def debug_kobo_fields(
+    asset: str | None = Query(default=None, description="Asset name or uid; defaults to the first configured"),
+    _: str = Depends(require_role("admin")),
+):
+    selected = None
+    if asset is not None:
+        selected = find_asset(asset)
+        if selected is None:
+            raise HTTPException(status_code=404, detail="Unknown Kobo asset")
+    return get_kobo_fields_debug(selected)
 
 
 @router.get("/admin/verify/kobo-sync")
 def verify_kobo_sync(_: str = Depends(require_role("admin")), db: Session = Depends(get_db)):
-    submissions = fetch_kobo_submissions()
+    kobo_count = 0
     kobo_sample_ids: list[str] = []
-    for submission in submissions:
-        sample_id = get_first(submission, "sample_id", "_uuid", "_id")
-        if sample_id is None:
-            continue
-        sample_id_str = str(sample_id).strip()
-        if sample_id_str and sample_id_str not in kobo_sample_ids:
-            kobo_sample_ids.append(sample_id_str)
+    for asset in kobo_assets():
+        submissions = fetch_kobo_submissions(asset=asset)
+        kobo_count += len(submissions)
+        for submission in submissions:
+            sample_id = submission_sample_id(submission, asset)
+            if sample_id and sample_id not in kobo_sample_ids:
+                kobo_sample_ids.append(sample_id)
 
     db_kobo_sample_ids = db.execute(
         select(Sample.external_sample_id).where(Sample.data_source == "kobo").order_by(Sample.external_sample_id.asc())
@@ -238,8 +604,8 @@ def verify_kobo_sync(_: str = Depends(require_role("admin")), db: Session = Depe
     kobo_set = set(kobo_sample_ids)
     db_kobo_set = set(db_kobo_sample_ids)
 
-    return {
-        "kobo_count": len(submissions),
+    return fast_json({
+        "kobo_count": kobo_count,
         "db_count_total": db_count_total,
         "db_count_kobo": db_count_kobo,
         "db_count_seed": db_count_seed,
@@ -247,36 +613,10 @@ def verify_kobo_sync(_: str = Depends(require_role("admin")), db: Session = Depe
         "db_kobo_sample_ids": sorted(db_kobo_set),
         "in_db_kobo_not_in_kobo": sorted(db_kobo_set - kobo_set),
         "in_kobo_not_in_db": sorted(kobo_set - db_kobo_set),
-    }
+    })
 
 
-@router.post("/admin/kobo/refresh")
+@router.post("/admin/kobo/refresh", status_code=202)
 def refresh_kobo_data(_: str = Depends(require_role("admin")), db: Session = Depends(get_db)):
-    submissions = fetch_kobo_submissions()
-    kobo_count_reported = len(submissions)
-
-    kobo_samples = db.execute(select(Sample).where(Sample.data_source == "kobo")).scalars().all()
-    deleted_kobo_samples = len(kobo_samples)
-    kobo_sample_db_ids = [str(sample.id) for sample in kobo_samples]
-
-    if kobo_sample_db_ids:
-        db.execute(
-            delete(AuditLog).where(
-                AuditLog.entity_type == "sample",
-                AuditLog.entity_id.in_(kobo_sample_db_ids),
-            )
-        )
-
-    for sample in kobo_samples:
-        db.delete(sample)
-    db.commit()
-
-    ingest_result = ingest_kobo_submissions(db, actor="admin_refresh")
-    seed_samples_remaining = db.execute(select(func.count(Sample.id)).where(Sample.data_source == "seed")).scalar_one()
-
-    return {
-        "deleted_kobo_samples": deleted_kobo_samples,
-        "reingested_kobo_samples": ingest_result.get("ingested", 0),
-        "seed_samples_remaining": seed_samples_remaining,
-        "kobo_count_reported": kobo_count_reported,
-    }
+    job, created = submit_ingest_job(db, "kobo_refresh", refresh_kobo_samples, requested_by="admin")
+    return _job_accepted(job, created)
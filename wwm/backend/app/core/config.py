@@ -11,6 +11,11 @@ class Settings(BaseSettings):
     app_name: str = "World Worm Map"
     environment: str = "development"
     database_url: str = "postgresql+psycopg2://wwm:wwm@db:5432/wwm"
+    database_read_url: str = ""
+    replica_max_lag_seconds: float = 10.0
+    replica_lag_check_seconds: float = 5.0
+    replica_connect_timeout_seconds: int = 3
+    read_your_writes_seconds: int = 30
 
     api_key_admin: str = "admin-key"
     api_key_curator: str = "curator-key"
@@ -18,12 +23,59 @@ class Settings(BaseSettings):
     kobo_base_url: str = "https://eu.kobotoolbox.org"
     kobo_asset_uid: str = "a8Rvu5KasYeAfsa2GfFppG"
     kobo_token: str = ""
+    kobo_page_size: int = 1000
+    kobo_assets: str = ""
+    kobo_max_connections: int = 4
+    ingest_batch_size: int = 500
+    kobo_webhook_secret: str = ""
+    kobo_webhook_token: str = ""
+    webhook_drain_seconds: int = 5
+    webhook_batch_size: int = 200
+    webhook_max_attempts: int = 5
+    webhook_retention_days: int = 7
 
     enable_real_ncbi_validation: bool = False
     ncbi_api_base: str = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+    ncbi_esummary_base: str = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
+    accession_validation_batch_size: int = 200
+
+    export_chunk_size: int = 2000
+    export_cache_dir: str = ""
+
+    import_batch_size: int = 5000
+    import_max_reported_errors: int = 1000
 
     ingest_hour: int = 2
     ingest_minute: int = 0
+    ingest_interval_minutes: int = 0
+    scheduler_enabled: bool = True
+    job_workers: int = 2
+    job_stale_minutes: int = 30
+
+    ingest_duplicate_check: bool = False
+    duplicate_radius_m: float = 25.0
+    duplicate_window_days: int = 1
+
+    country_list_path: str = ""
+    stats_refresh_minutes: int = 5
+    change_feed_retention_days: int = 30
+    events_heartbeat_seconds: int = 15
+    events_max_pending: int = 1000
+    events_coalesce_limit: int = 200
+    fast_json: bool = False
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    frontend_build_dir: str = ""
+
+    attachment_cache_dir: str = ""
+    attachment_download_workers: int = 4
+    attachment_batch_size: int = 100
+    attachment_max_bytes: int = 20_000_000
+    attachment_max_attempts: int = 3
+    attachment_fetch_minutes: int = 10
+    thumbnail_size: int = 480
+    thumbnail_workers: int = 2
     cors_origins: str = "http://localhost:8080,http://127.0.0.1:8080,http://localhost:8000"
 
 
@@ -0,0 +1,26 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+from app.db.session import engine
+
+# Application-wide PostgreSQL advisory lock keys.
+MIGRATION_LOCK_KEY = 7_261_001
+SCHEDULER_LEADER_LOCK_KEY = 7_261_002
+INGEST_LOCK_KEY = 7_261_003
+
+
+@contextmanager
+def try_advisory_lock(key: int) -> Iterator[bool]:
+    """Hold a session-level advisory lock on a dedicated connection, if free.
+
+    Yields whether the lock was acquired; the lock is released on exit.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        acquired = bool(connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar())
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
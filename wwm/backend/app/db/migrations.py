@@ -0,0 +1,778 @@
+"""Versioned schema migrations.
+
+Each migration is a numbered list of SQL statements applied once, in order, and
+recorded in ``schema_migrations``. ``Base.metadata.create_all`` runs before the
+pending migrations so new model tables exist; a change that adds a table must
+still ship a migration (even if it only adds indexes) so that workers already at
+the previous head pick it up.
+
+A migration may carry an ``after`` hook for data work that needs the ORM (a
+backfill, a rollup rebuild). It runs in the migration's transaction right after
+its statements, so a failing hook leaves the version unrecorded and it is
+retried on the next start.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.db.locks import MIGRATION_LOCK_KEY
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: tuple[str, ...]
+    after: Callable[[Session], None] | None = None
+
+
+def _build_country_stats(db: Session) -> None:
+    from app.services.stats import backfill_country_codes, refresh_country_stats
+
+    backfilled = backfill_country_codes(db)
+    countries = refresh_country_stats(db)
+    logger.info("Country stats built for %s countries (%s country codes backfilled)", countries, backfilled)
+
+
+def _backfill_kobo_assets(db: Session) -> None:
+    from app.services.kobo_ingest import backfill_kobo_asset_uid
+
+    backfilled = backfill_kobo_asset_uid(db)
+    logger.info("Tagged %s existing Kobo samples with their asset uid", backfilled)
+
+
+def _queue_existing_photos(db: Session) -> None:
+    from app.services.photos import queue_missing_photos
+
+    queued = queue_missing_photos(db)
+    logger.info("Queued %s photo attachments of existing Kobo samples", queued)
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        name="legacy_sample_columns",
+        statements=(
+            "ALTER TABLE IF EXISTS samples ADD COLUMN IF NOT EXISTS country VARCHAR(120)",
+            "ALTER TABLE IF EXISTS samples ADD COLUMN IF NOT EXISTS data_source VARCHAR(20) NOT NULL DEFAULT 'kobo'",
+            "ALTER TABLE IF EXISTS samples ADD COLUMN IF NOT EXISTS kobo_uuid VARCHAR(255)",
+            "ALTER TABLE IF EXISTS samples ADD COLUMN IF NOT EXISTS kobo_id VARCHAR(255)",
+            "ALTER TABLE IF EXISTS samples ADD COLUMN IF NOT EXISTS kobo_submission_time TIMESTAMP",
+            "CREATE INDEX IF NOT EXISTS idx_samples_data_source ON samples (data_source)",
+            "UPDATE samples SET data_source = 'seed' "
+            "WHERE data_source = 'kobo' "
+            "AND (external_sample_id LIKE 'SEED-%' OR submitted_by = 'demo@example.org')",
+        ),
+    ),
+    Migration(
+        version=2,
+        name="hot_path_indexes",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS idx_sample_species_species_name_lower "
+            "ON sample_species (lower(species_name))",
+            "CREATE INDEX IF NOT EXISTS idx_affiliations_name_lower ON affiliations (lower(name))",
+            "CREATE INDEX IF NOT EXISTS idx_samples_status_submitted_at ON samples (status, submitted_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_samples_submitted_at ON samples (submitted_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_samples_geom ON samples USING gist (geom)",
+            "CREATE INDEX IF NOT EXISTS idx_sample_species_sample_id ON sample_species (sample_id)",
+            "CREATE INDEX IF NOT EXISTS idx_sample_affiliations_sample_id ON sample_affiliations (sample_id)",
+            "CREATE INDEX IF NOT EXISTS idx_genomic_records_sample_species_id ON genomic_records (sample_species_id)",
+            "ANALYZE samples",
+            "ANALYZE sample_species",
+            "ANALYZE sample_affiliations",
+            "ANALYZE genomic_records",
+        ),
+    ),
+    Migration(
+        version=3,
+        name="ingest_runs",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS idx_ingest_runs_started_at ON ingest_runs (started_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_samples_source_submission_time "
+            "ON samples (data_source, kobo_submission_time)",
+        ),
+    ),
+    Migration(
+        version=4,
+        name="partitioned_audit_log",
+        statements=(
+            """
+            DO $$
+            BEGIN
+                IF (SELECT relkind FROM pg_class WHERE oid = 'audit_log'::regclass) = 'r' THEN
+                    ALTER TABLE audit_log RENAME TO audit_log_legacy;
+                    ALTER TABLE audit_log_legacy RENAME CONSTRAINT audit_log_pkey TO audit_log_legacy_pkey;
+                    ALTER SEQUENCE IF EXISTS audit_log_id_seq RENAME TO audit_log_legacy_id_seq;
+                    CREATE TABLE audit_log (
+                        id BIGSERIAL NOT NULL,
+                        actor VARCHAR(255) NOT NULL,
+                        action VARCHAR(120) NOT NULL,
+                        entity_type VARCHAR(100) NOT NULL,
+                        entity_id VARCHAR(120) NOT NULL,
+                        detail JSONB,
+                        created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                        PRIMARY KEY (id, created_at)
+                    ) PARTITION BY RANGE (created_at);
+                END IF;
+            END $$
+            """,
+            """
+            CREATE OR REPLACE FUNCTION wwm_create_audit_partition(month_start date) RETURNS void AS $$
+            BEGIN
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_log FOR VALUES FROM (%L) TO (%L)',
+                    'audit_log_' || to_char(month_start, 'YYYY_MM'),
+                    month_start,
+                    (month_start + interval '1 month')::date
+                );
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            """
+            CREATE OR REPLACE FUNCTION wwm_ensure_audit_partitions(months_ahead integer) RETURNS void AS $$
+            DECLARE
+                first_month date := date_trunc('month', now() AT TIME ZONE 'utc')::date;
+            BEGIN
+                FOR offset_months IN 0..months_ahead LOOP
+                    PERFORM wwm_create_audit_partition((first_month + make_interval(months => offset_months))::date);
+                END LOOP;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            "CREATE TABLE IF NOT EXISTS audit_log_default PARTITION OF audit_log DEFAULT",
+            """
+            DO $$
+            DECLARE
+                legacy_month date;
+            BEGIN
+                IF to_regclass('audit_log_legacy') IS NOT NULL THEN
+                    FOR legacy_month IN
+                        SELECT DISTINCT date_trunc('month', created_at)::date FROM audit_log_legacy
+                    LOOP
+                        PERFORM wwm_create_audit_partition(legacy_month);
+                    END LOOP;
+                    INSERT INTO audit_log (id, actor, action, entity_type, entity_id, detail, created_at)
+                    SELECT id, actor, action, entity_type, entity_id, detail::jsonb, created_at FROM audit_log_legacy;
+                    PERFORM setval('audit_log_id_seq', GREATEST((SELECT MAX(id) FROM audit_log_legacy), 1));
+                    DROP TABLE audit_log_legacy;
+                END IF;
+            END $$
+            """,
+            "SELECT wwm_ensure_audit_partitions(3)",
+            "CREATE INDEX IF NOT EXISTS idx_audit_log_entity ON audit_log (entity_type, entity_id)",
+        ),
+    ),
+    Migration(
+        version=5,
+        name="split_raw_payloads",
+        statements=(
+            "ALTER TABLE samples ADD COLUMN IF NOT EXISTS tube_id VARCHAR(255)",
+            "ALTER TABLE samples ADD COLUMN IF NOT EXISTS soil_ph DOUBLE PRECISION",
+            "ALTER TABLE samples ADD COLUMN IF NOT EXISTS depth_cm DOUBLE PRECISION",
+            "ALTER TABLE samples ADD COLUMN IF NOT EXISTS affiliation_other VARCHAR(255)",
+            """
+            DO $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'samples' AND column_name = 'raw_payload'
+                ) THEN
+                    UPDATE samples SET
+                        tube_id = NULLIF(trim(raw_payload ->> 'tube_id'), ''),
+                        soil_ph = CASE WHEN trim(raw_payload ->> 'soil_ph') ~ '^-?[0-9]+([.,][0-9]+)?$'
+                            THEN replace(trim(raw_payload ->> 'soil_ph'), ',', '.')::double precision END,
+                        depth_cm = CASE WHEN trim(raw_payload ->> 'depth_cm') ~ '^-?[0-9]+([.,][0-9]+)?$'
+                            THEN replace(trim(raw_payload ->> 'depth_cm'), ',', '.')::double precision END,
+                        affiliation_other = NULLIF(trim(raw_payload ->> 'affiliation_other'), '')
+                    WHERE raw_payload IS NOT NULL;
+
+                    INSERT INTO sample_raw_payloads (sample_id, payload, received_at)
+                    SELECT
+                        id,
+                        CASE WHEN jsonb_typeof(raw_payload::jsonb -> 'kobo') = 'object'
+                            THEN raw_payload::jsonb -> 'kobo' ELSE raw_payload::jsonb END,
+                        submitted_at
+                    FROM samples
+                    WHERE raw_payload IS NOT NULL
+                    ON CONFLICT (sample_id) DO NOTHING;
+
+                    ALTER TABLE samples DROP COLUMN raw_payload;
+                END IF;
+            END $$
+            """,
+            """
+            DO $$
+            BEGIN
+                EXECUTE 'ALTER TABLE sample_raw_payloads ALTER COLUMN payload SET COMPRESSION lz4';
+            EXCEPTION WHEN OTHERS THEN
+                RAISE NOTICE 'lz4 TOAST compression unavailable, keeping default pglz: %', SQLERRM;
+            END $$
+            """,
+        ),
+    ),
+    Migration(
+        version=6,
+        name="deferred_accession_validation",
+        statements=(
+            "ALTER TABLE genomic_records ADD COLUMN IF NOT EXISTS accession_checked_at TIMESTAMP",
+            "CREATE INDEX IF NOT EXISTS idx_genomic_records_unchecked ON genomic_records (id) "
+            "WHERE accession_checked_at IS NULL AND NOT accession_validated",
+            "CREATE INDEX IF NOT EXISTS idx_genomic_records_species_accession "
+            "ON genomic_records (sample_species_id, accession)",
+        ),
+    ),
+    Migration(
+        version=7,
+        name="data_version_counter",
+        statements=(
+            "CREATE SEQUENCE IF NOT EXISTS wwm_data_version",
+            """
+            CREATE OR REPLACE FUNCTION wwm_bump_data_version() RETURNS trigger AS $$
+            BEGIN
+                PERFORM nextval('wwm_data_version');
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            """
+            DO $$
+            DECLARE
+                tracked text;
+            BEGIN
+                FOREACH tracked IN ARRAY ARRAY[
+                    'samples', 'sample_species', 'sample_affiliations', 'genomic_records', 'affiliations'
+                ] LOOP
+                    EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_data_version ON %I', tracked, tracked);
+                    EXECUTE format(
+                        'CREATE TRIGGER trg_%s_data_version '
+                        'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I '
+                        'FOR EACH STATEMENT EXECUTE FUNCTION wwm_bump_data_version()',
+                        tracked,
+                        tracked
+                    );
+                END LOOP;
+            END $$
+            """,
+        ),
+    ),
+    Migration(
+        version=8,
+        name="trigram_search",
+        statements=(
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            "CREATE INDEX IF NOT EXISTS idx_samples_external_sample_id_trgm "
+            "ON samples USING gin (external_sample_id gin_trgm_ops)",
+            "CREATE INDEX IF NOT EXISTS idx_samples_site_name_trgm ON samples USING gin (site_name gin_trgm_ops)",
+            "CREATE INDEX IF NOT EXISTS idx_samples_notes_trgm ON samples USING gin (notes gin_trgm_ops)",
+            "CREATE INDEX IF NOT EXISTS idx_sample_species_species_name_trgm "
+            "ON sample_species USING gin (species_name gin_trgm_ops)",
+        ),
+    ),
+    Migration(
+        version=9,
+        name="geography_index",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS idx_samples_geog ON samples USING gist (geography(geom))",
+        ),
+    ),
+    Migration(
+        version=10,
+        name="possible_duplicates",
+        statements=(
+            "ALTER TABLE samples ADD COLUMN IF NOT EXISTS possible_duplicate_of_id INTEGER "
+            "REFERENCES samples (id) ON DELETE SET NULL",
+            "CREATE INDEX IF NOT EXISTS idx_samples_possible_duplicate_of_id ON samples (possible_duplicate_of_id) "
+            "WHERE possible_duplicate_of_id IS NOT NULL",
+        ),
+    ),
+    Migration(
+        version=11,
+        name="country_stats",
+        statements=(
+            "ALTER TABLE samples ADD COLUMN IF NOT EXISTS country_code VARCHAR(2)",
+            "CREATE INDEX IF NOT EXISTS idx_samples_country_key ON samples ((coalesce(country_code, 'ZZ')))",
+        ),
+        after=_build_country_stats,
+    ),
+    Migration(
+        version=12,
+        name="sample_activity_rollup",
+        statements=(
+            """
+            CREATE MATERIALIZED VIEW IF NOT EXISTS sample_activity_monthly AS
+            WITH base AS (
+                SELECT
+                    s.id,
+                    s.status,
+                    date_trunc('month', coalesce(s.sampling_date, s.submitted_at::date))::date AS bucket,
+                    lower(ss.species_name) AS species,
+                    lower(a.name) AS affiliation
+                FROM samples s
+                LEFT JOIN sample_species ss ON ss.sample_id = s.id
+                LEFT JOIN sample_affiliations sa ON sa.sample_id = s.id
+                LEFT JOIN affiliations a ON a.id = sa.affiliation_id
+            )
+            SELECT
+                bucket,
+                CASE WHEN GROUPING(species) = 1 THEN '*' ELSE coalesce(species, '') END AS species_key,
+                CASE WHEN GROUPING(affiliation) = 1 THEN '*' ELSE coalesce(affiliation, '') END AS affiliation_key,
+                status,
+                count(DISTINCT id) AS sample_count
+            FROM base
+            GROUP BY GROUPING SETS (
+                (bucket, status),
+                (bucket, status, species),
+                (bucket, status, affiliation),
+                (bucket, status, species, affiliation)
+            )
+            """,
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_sample_activity_monthly_key "
+            "ON sample_activity_monthly (species_key, affiliation_key, bucket, status)",
+        ),
+    ),
+    Migration(
+        version=13,
+        name="sample_change_feed",
+        statements=(
+            "ALTER TABLE samples ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL "
+            "DEFAULT (now() AT TIME ZONE 'utc')",
+            "ALTER TABLE samples ADD COLUMN IF NOT EXISTS change_txid BIGINT NOT NULL DEFAULT 0",
+            "ALTER TABLE sample_species ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL "
+            "DEFAULT (now() AT TIME ZONE 'utc')",
+            "ALTER TABLE sample_affiliations ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL "
+            "DEFAULT (now() AT TIME ZONE 'utc')",
+            "ALTER TABLE genomic_records ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL "
+            "DEFAULT (now() AT TIME ZONE 'utc')",
+            "CREATE INDEX IF NOT EXISTS idx_samples_change_txid ON samples (change_txid)",
+            "CREATE INDEX IF NOT EXISTS idx_sample_tombstones_change_txid ON sample_tombstones (change_txid)",
+            "CREATE INDEX IF NOT EXISTS idx_sample_tombstones_deleted_at ON sample_tombstones (deleted_at)",
+            """
+            CREATE OR REPLACE FUNCTION wwm_touch_row() RETURNS trigger AS $$
+            BEGIN
+                NEW.updated_at := now() AT TIME ZONE 'utc';
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            """
+            CREATE OR REPLACE FUNCTION wwm_touch_sample() RETURNS trigger AS $$
+            BEGIN
+                NEW.updated_at := now() AT TIME ZONE 'utc';
+                NEW.change_txid := pg_current_xact_id()::text::bigint;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            """
+            CREATE OR REPLACE FUNCTION wwm_touch_parent_sample() RETURNS trigger AS $$
+            DECLARE
+                child RECORD;
+                parent_id INTEGER;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    child := OLD;
+                ELSE
+                    child := NEW;
+                END IF;
+                IF TG_TABLE_NAME = 'genomic_records' THEN
+                    SELECT sample_id INTO parent_id FROM sample_species WHERE id = child.sample_species_id;
+                ELSE
+                    parent_id := child.sample_id;
+                END IF;
+                UPDATE samples SET updated_at = now() AT TIME ZONE 'utc'
+                WHERE id = parent_id AND change_txid <> pg_current_xact_id()::text::bigint;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            """
+            CREATE OR REPLACE FUNCTION wwm_record_sample_tombstones() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO sample_tombstones (sample_id, external_sample_id, deleted_at, change_txid)
+                SELECT id, external_sample_id, now() AT TIME ZONE 'utc', pg_current_xact_id()::text::bigint
+                FROM deleted_samples
+                ON CONFLICT (sample_id) DO NOTHING;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS trg_samples_touch ON samples",
+            "CREATE TRIGGER trg_samples_touch BEFORE INSERT OR UPDATE ON samples "
+            "FOR EACH ROW EXECUTE FUNCTION wwm_touch_sample()",
+            "DROP TRIGGER IF EXISTS trg_samples_tombstone ON samples",
+            "CREATE TRIGGER trg_samples_tombstone AFTER DELETE ON samples "
+            "REFERENCING OLD TABLE AS deleted_samples "
+            "FOR EACH STATEMENT EXECUTE FUNCTION wwm_record_sample_tombstones()",
+            """
+            DO $$
+            DECLARE
+                child text;
+            BEGIN
+                FOREACH child IN ARRAY ARRAY['sample_species', 'sample_affiliations', 'genomic_records'] LOOP
+                    EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_touch ON %I', child, child);
+                    EXECUTE format(
+                        'CREATE TRIGGER trg_%s_touch BEFORE UPDATE ON %I '
+                        'FOR EACH ROW EXECUTE FUNCTION wwm_touch_row()',
+                        child,
+                        child
+                    );
+                    EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_touch_sample ON %I', child, child);
+                    EXECUTE format(
+                        'CREATE TRIGGER trg_%s_touch_sample AFTER INSERT OR UPDATE OR DELETE ON %I '
+                        'FOR EACH ROW EXECUTE FUNCTION wwm_touch_parent_sample()',
+                        child,
+                        child
+                    );
+                END LOOP;
+            END $$
+            """,
+        ),
+    ),
+    Migration(
+        version=14,
+        name="kobo_webhook_queue",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS idx_kobo_webhook_queue_pending ON kobo_webhook_queue (id) "
+            "WHERE processed_at IS NULL",
+            "CREATE INDEX IF NOT EXISTS idx_kobo_webhook_queue_processed_at ON kobo_webhook_queue (processed_at)",
+            "CREATE INDEX IF NOT EXISTS idx_samples_kobo_uuid ON samples (kobo_uuid)",
+        ),
+    ),
+    Migration(
+        version=15,
+        name="ingest_checkpoints",
+        statements=(
+            "ALTER TABLE ingest_runs ADD COLUMN IF NOT EXISTS since TIMESTAMP",
+            "ALTER TABLE ingest_runs ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP",
+            "ALTER TABLE ingest_runs ADD COLUMN IF NOT EXISTS processed INTEGER NOT NULL DEFAULT 0",
+            "ALTER TABLE ingest_runs ADD COLUMN IF NOT EXISTS total INTEGER",
+            "ALTER TABLE ingest_runs ADD COLUMN IF NOT EXISTS possible_duplicates INTEGER NOT NULL DEFAULT 0",
+            "ALTER TABLE ingest_runs ADD COLUMN IF NOT EXISTS checkpoint_page_start INTEGER",
+            "ALTER TABLE ingest_runs ADD COLUMN IF NOT EXISTS checkpoint_last_id BIGINT",
+        ),
+    ),
+    Migration(
+        version=16,
+        name="sample_event_notify",
+        statements=(
+            """
+            CREATE OR REPLACE FUNCTION wwm_notify_sample_event() RETURNS trigger AS $$
+            DECLARE
+                sample RECORD;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    sample := OLD;
+                ELSE
+                    sample := NEW;
+                END IF;
+                PERFORM pg_notify(
+                    'wwm_sample_events',
+                    json_build_object(
+                        'op', lower(TG_OP),
+                        'id', sample.id,
+                        'status', sample.status,
+                        'lat', sample.latitude,
+                        'lon', sample.longitude
+                    )::text
+                );
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS trg_samples_notify ON samples",
+            "CREATE TRIGGER trg_samples_notify AFTER INSERT OR UPDATE OR DELETE ON samples "
+            "FOR EACH ROW EXECUTE FUNCTION wwm_notify_sample_event()",
+        ),
+    ),
+    Migration(
+        version=17,
+        name="kobo_assets",
+        statements=(
+            "ALTER TABLE samples ADD COLUMN IF NOT EXISTS kobo_asset_uid VARCHAR(64)",
+            "CREATE INDEX IF NOT EXISTS idx_samples_kobo_asset_time ON samples (kobo_asset_uid, kobo_submission_time)",
+            "ALTER TABLE ingest_runs ADD COLUMN IF NOT EXISTS assets JSONB",
+        ),
+        after=_backfill_kobo_assets,
+    ),
+    Migration(
+        version=18,
+        name="sample_photos",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS idx_sample_photos_sample ON sample_photos (sample_id)",
+            "CREATE INDEX IF NOT EXISTS idx_sample_photos_pending ON sample_photos (id) WHERE status = 'pending'",
+        ),
+        after=_queue_existing_photos,
+    ),
+    Migration(
+        version=19,
+        name="audit_partition_default_rows",
+        statements=(
+            """
+            CREATE OR REPLACE FUNCTION wwm_create_audit_partition(month_start date) RETURNS void AS $$
+            DECLARE
+                partition_name text := 'audit_log_' || to_char(month_start, 'YYYY_MM');
+                month_end date := (month_start + interval '1 month')::date;
+            BEGIN
+                IF to_regclass(partition_name) IS NOT NULL THEN
+                    RETURN;
+                END IF;
+                LOCK TABLE audit_log_default IN SHARE ROW EXCLUSIVE MODE;
+                IF to_regclass(partition_name) IS NOT NULL THEN
+                    RETURN;
+                END IF;
+                -- Rows that landed in the default partition for this month would
+                -- make the partition bound overlap; move them across first.
+                EXECUTE format('CREATE TABLE %I (LIKE audit_log INCLUDING DEFAULTS)', partition_name);
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM audit_log_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    month_start, month_end, partition_name
+                );
+                EXECUTE format(
+                    'ALTER TABLE audit_log ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, month_start, month_end
+                );
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            """
+            CREATE OR REPLACE FUNCTION wwm_ensure_audit_partitions(months_ahead integer) RETURNS void AS $$
+            DECLARE
+                first_month date := date_trunc('month', now() AT TIME ZONE 'utc')::date;
+                stray_month date;
+            BEGIN
+                FOR stray_month IN
+                    SELECT DISTINCT date_trunc('month', created_at)::date FROM audit_log_default
+                LOOP
+                    PERFORM wwm_create_audit_partition(stray_month);
+                END LOOP;
+                FOR offset_months IN 0..months_ahead LOOP
+                    PERFORM wwm_create_audit_partition((first_month + make_interval(months => offset_months))::date);
+                END LOOP;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+        ),
+    ),
+    Migration(
+        version=20,
+        name="comma_decimal_backfill",
+        statements=(
+            """
+            UPDATE samples SET soil_ph = replace(raw.value, ',', '.')::double precision
+            FROM (
+                SELECT sample_id, trim(value) AS value
+                FROM sample_raw_payloads, jsonb_each_text(payload)
+                WHERE key = 'soil_ph' OR key LIKE '%/soil_ph'
+            ) AS raw
+            WHERE samples.id = raw.sample_id AND samples.soil_ph IS NULL AND raw.value ~ '^-?[0-9]+,[0-9]+$'
+            """,
+            """
+            UPDATE samples SET depth_cm = replace(raw.value, ',', '.')::double precision
+            FROM (
+                SELECT sample_id, trim(value) AS value
+                FROM sample_raw_payloads, jsonb_each_text(payload)
+                WHERE key = 'depth_cm' OR key LIKE '%/depth_cm'
+            ) AS raw
+            WHERE samples.id = raw.sample_id AND samples.depth_cm IS NULL AND raw.value ~ '^-?[0-9]+,[0-9]+$'
+            """,
+        ),
+    ),
+    Migration(
+        version=21,
+        name="transactional_data_version",
+        statements=(
+            "CREATE TABLE IF NOT EXISTS wwm_data_version_state ("
+            "id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id), "
+            "version BIGINT NOT NULL)",
+            # Start past the old sequence so caches keyed under it are not reused.
+            "INSERT INTO wwm_data_version_state (version) SELECT last_value + 1 FROM wwm_data_version "
+            "ON CONFLICT (id) DO NOTHING",
+            """
+            CREATE OR REPLACE FUNCTION wwm_bump_data_version() RETURNS trigger AS $$
+            BEGIN
+                IF current_setting('wwm.data_version_bumped', true) IS DISTINCT FROM 'on' THEN
+                    UPDATE wwm_data_version_state SET version = version + 1;
+                    PERFORM set_config('wwm.data_version_bumped', 'on', true);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            # Deferred so the state row is only locked while the writing transaction commits.
+            """
+            DO $$
+            DECLARE
+                tracked text;
+            BEGIN
+                FOREACH tracked IN ARRAY ARRAY[
+                    'samples', 'sample_species', 'sample_affiliations', 'genomic_records', 'affiliations'
+                ] LOOP
+                    EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_data_version ON %I', tracked, tracked);
+                    EXECUTE format(
+                        'CREATE CONSTRAINT TRIGGER trg_%s_data_version '
+                        'AFTER INSERT OR UPDATE OR DELETE ON %I '
+                        'DEFERRABLE INITIALLY DEFERRED '
+                        'FOR EACH ROW EXECUTE FUNCTION wwm_bump_data_version()',
+                        tracked,
+                        tracked
+                    );
+                    EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_data_version_truncate ON %I', tracked, tracked);
+                    EXECUTE format(
+                        'CREATE TRIGGER trg_%s_data_version_truncate AFTER TRUNCATE ON %I '
+                        'FOR EACH STATEMENT EXECUTE FUNCTION wwm_bump_data_version()',
+                        tracked,
+                        tracked
+                    );
+                END LOOP;
+            END $$
+            """,
+            "DROP SEQUENCE IF EXISTS wwm_data_version",
+        ),
+    ),
+    Migration(
+        version=22,
+        name="audit_partition_lock_order",
+        statements=(
+            # Lock the default partition before scanning it: workers starting together
+            # would otherwise each hold ACCESS SHARE from the scan and deadlock on the
+            # stronger locks that creating a partition takes.
+            """
+            CREATE OR REPLACE FUNCTION wwm_ensure_audit_partitions(months_ahead integer) RETURNS void AS $$
+            DECLARE
+                first_month date := date_trunc('month', now() AT TIME ZONE 'utc')::date;
+                stray_month date;
+            BEGIN
+                LOCK TABLE audit_log_default IN SHARE ROW EXCLUSIVE MODE;
+                FOR stray_month IN
+                    SELECT DISTINCT date_trunc('month', created_at)::date FROM audit_log_default
+                LOOP
+                    PERFORM wwm_create_audit_partition(stray_month);
+                END LOOP;
+                FOR offset_months IN 0..months_ahead LOOP
+                    PERFORM wwm_create_audit_partition((first_month + make_interval(months => offset_months))::date);
+                END LOOP;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+        ),
+    ),
+    Migration(
+        version=23,
+        name="sample_event_statement_notify",
+        statements=(
+            # One NOTIFY per statement instead of per row. Statements touching more
+            # than 50 samples send a bare resync, which also keeps payloads far below
+            # the 8000-byte NOTIFY limit.
+            """
+            CREATE OR REPLACE FUNCTION wwm_notify_sample_statement() RETURNS trigger AS $$
+            DECLARE
+                changed_rows json;
+                changed_count integer;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    SELECT count(*), json_agg(json_build_array(id, status, latitude, longitude))
+                    INTO changed_count, changed_rows
+                    FROM (SELECT * FROM old_table LIMIT 51) AS changed;
+                ELSE
+                    SELECT count(*), json_agg(json_build_array(id, status, latitude, longitude))
+                    INTO changed_count, changed_rows
+                    FROM (SELECT * FROM new_table LIMIT 51) AS changed;
+                END IF;
+                IF changed_count = 0 THEN
+                    RETURN NULL;
+                ELSIF changed_count > 50 THEN
+                    PERFORM pg_notify('wwm_sample_events', '{"resync":true}');
+                ELSE
+                    PERFORM pg_notify(
+                        'wwm_sample_events',
+                        json_build_object('op', lower(TG_OP), 'rows', changed_rows)::text
+                    );
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS trg_samples_notify ON samples",
+            "DROP FUNCTION IF EXISTS wwm_notify_sample_event()",
+            "DROP TRIGGER IF EXISTS trg_samples_notify_insert ON samples",
+            "CREATE TRIGGER trg_samples_notify_insert AFTER INSERT ON samples "
+            "REFERENCING NEW TABLE AS new_table "
+            "FOR EACH STATEMENT EXECUTE FUNCTION wwm_notify_sample_statement()",
+            "DROP TRIGGER IF EXISTS trg_samples_notify_update ON samples",
+            "CREATE TRIGGER trg_samples_notify_update AFTER UPDATE ON samples "
+            "REFERENCING NEW TABLE AS new_table "
+            "FOR EACH STATEMENT EXECUTE FUNCTION wwm_notify_sample_statement()",
+            "DROP TRIGGER IF EXISTS trg_samples_notify_delete ON samples",
+            "CREATE TRIGGER trg_samples_notify_delete AFTER DELETE ON samples "
+            "REFERENCING OLD TABLE AS old_table "
+            "FOR EACH STATEMENT EXECUTE FUNCTION wwm_notify_sample_statement()",
+        ),
+    ),
+)
+
+HEAD_VERSION = MIGRATIONS[-1].version
+
+
+def _current_version(connection: Connection) -> int:
+    table = connection.execute(text("SELECT to_regclass('schema_migrations')")).scalar()
+    if table is None:
+        return 0
+    return connection.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar_one()
+
+
+def is_at_head(engine: Engine) -> bool:
+    with engine.connect() as connection:
+        return _current_version(connection) >= HEAD_VERSION
+
+
+def run_migrations(engine: Engine) -> list[int]:
+    """Bring the schema to ``HEAD_VERSION`` and return the versions applied.
+
+    Concurrent workers serialise on a transaction-scoped advisory lock and
+    re-read the version once they hold it, so only one of them does the work.
+    """
+    if is_at_head(engine):
+        return []
+
+    applied: list[int] = []
+    with engine.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+        connection.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "version INTEGER PRIMARY KEY, "
+                "name VARCHAR(120) NOT NULL, "
+                "applied_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'))"
+            )
+        )
+        current = _current_version(connection)
+        if current >= HEAD_VERSION:
+            return applied
+
+        Base.metadata.create_all(bind=connection)
+        for migration in MIGRATIONS:
+            if migration.version <= current:
+                continue
+            logger.info("Applying schema migration %03d_%s", migration.version, migration.name)
+            for statement in migration.statements:
+                connection.execute(text(statement))
+            if migration.after is not None:
+                with Session(bind=connection, join_transaction_mode="create_savepoint") as db:
+                    migration.after(db)
+                    db.commit()
+            connection.execute(
+                text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                {"version": migration.version, "name": migration.name},
+            )
+            applied.append(migration.version)
+    return applied
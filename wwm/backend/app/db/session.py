@@ -1,13 +1,83 @@
 from collections.abc import Generator
+import logging
+import threading
+import time
 
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 engine = create_engine(settings.database_url, pool_pre_ping=True)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+# Optional streaming replica for read-only endpoints; see ``read_sessionmaker``.
+read_engine = (
+    create_engine(
+        settings.database_read_url,
+        pool_pre_ping=True,
+        connect_args={"connect_timeout": settings.replica_connect_timeout_seconds},
+    )
+    if settings.database_read_url
+    else None
+)
+ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False) if read_engine else None
+
+RECENT_WRITE_COOKIE = "wwm_recent_write"
+
+# NULL (unusable) while the standby has no streaming WAL receiver: received and
+# replayed LSNs then agree although the replica is falling behind. Roles without
+# pg_read_all_stats see a NULL status, so only the receiver's presence counts then.
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE coalesce(status, 'streaming') = 'streaming') "
+    "THEN NULL "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class _ReplicaHealth:
+    """Replica lag, measured at most every ``settings.replica_lag_check_seconds`` per process.
+
+    One request runs the probe; requests arriving meanwhile use the previous answer.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._usable = False
+
+    def usable(self) -> bool:
+        with self._lock:
+            if time.monotonic() - self._checked_at < settings.replica_lag_check_seconds:
+                return self._usable
+            self._checked_at = time.monotonic()
+        usable, state = self._probe()
+        if usable != self._usable:
+            logger.info("Read replica %s (%s).", "in use" if usable else "bypassed", state)
+        self._usable = usable
+        return usable
+
+    def _probe(self) -> tuple[bool, str]:
+        try:
+            with read_engine.connect() as connection:
+                lag = connection.execute(_REPLICA_LAG_SQL).scalar_one()
+        except DBAPIError:
+            logger.warning("Read replica unreachable; reading from the primary.")
+            return False, "unreachable"
+        if lag is None:
+            return False, "WAL receiver not streaming"
+        return float(lag) <= settings.replica_max_lag_seconds, f"lag {float(lag):.1f}s"
+
+
+replica_health = _ReplicaHealth()
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -15,3 +85,23 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def read_sessionmaker(request: Request) -> sessionmaker:
+    """Replica sessions for read-only endpoints, falling back to the primary.
+
+    The primary is used when no replica is configured, when it lags more than
+    ``settings.replica_max_lag_seconds`` or is down, and for clients that
+    wrote recently (``RECENT_WRITE_COOKIE``) so they see their own changes.
+    """
+    if ReadSessionLocal is None or request.cookies.get(RECENT_WRITE_COOKIE):
+        return SessionLocal
+    return ReadSessionLocal if replica_health.usable() else SessionLocal
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    db = read_sessionmaker(request)()
+    try:
+        yield db
+    finally:
+        db.close()
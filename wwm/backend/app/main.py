@@ -1,15 +1,25 @@
+import logging
 from pathlib import Path
+import tempfile
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 
+from app.api.assets import REVALIDATE, PrecompressedFiles, build_frontend_assets
+from app.api.compression import CompressionMiddleware
 from app.api.routes import router
 from app.core.config import settings
 from app.db.init_db import init_db
+from app.db.session import RECENT_WRITE_COOKIE, SessionLocal
+from app.services.countries import load_countries
+from app.services.events import broadcaster
+from app.services.jobs import fail_abandoned_jobs, shutdown_jobs
 from app.services.scheduler import start_scheduler, stop_scheduler
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title=settings.app_name)
 cors_origins = [origin.strip() for origin in settings.cors_origins.split(",") if origin.strip()]
 
@@ -19,28 +29,71 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Point-Count", "X-Status-Codes", "X-Change-Token"],
 )
+if settings.compression_min_size > 0:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
 
 app.include_router(router)
 
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+@app.middleware("http")
+async def mark_recent_writes(request: Request, call_next):
+    """Pin a client to the primary for a short while after a successful write (read-your-writes)."""
+    response = await call_next(request)
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        response.set_cookie(
+            RECENT_WRITE_COOKIE,
+            "1",
+            max_age=settings.read_your_writes_seconds,
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
 frontend_dir = Path(__file__).resolve().parents[1] / "frontend"
+index_files: PrecompressedFiles | None = None
 if frontend_dir.exists():
     app.mount("/frontend", StaticFiles(directory=frontend_dir), name="frontend")
+    build_dir = Path(settings.frontend_build_dir or Path(tempfile.gettempdir()) / "wwm-frontend")
+    try:
+        build_frontend_assets(frontend_dir, build_dir)
+    except OSError:
+        logger.exception("Could not build frontend assets in %s; serving index.html unhashed.", build_dir)
+    else:
+        app.mount("/assets", PrecompressedFiles(directory=build_dir), name="assets")
+        index_files = PrecompressedFiles(directory=build_dir, cache_control=REVALIDATE)
 
 
 @app.on_event("startup")
 def on_startup() -> None:
+    load_countries()
     init_db()
+    with SessionLocal() as db:
+        abandoned = fail_abandoned_jobs(db)
+    if abandoned:
+        logger.warning("Marked %s background jobs of exited workers as failed.", abandoned)
     start_scheduler()
 
 
 @app.on_event("shutdown")
 def on_shutdown() -> None:
     stop_scheduler()
+    shutdown_jobs()
+    broadcaster.stop()
 
 
 @app.get("/")
-def root():
+async def root(request: Request):
+    if index_files is not None:
+        return await index_files.get_response("index.html", request.scope)
     index_path = frontend_dir / "index.html"
     if index_path.exists():
         return FileResponse(index_path)
@@ -1,10 +1,17 @@
 from app.models.models import (
     Affiliation,
     AuditLog,
+    BackgroundJob,
+    CountryStats,
     GenomicRecord,
+    IngestRun,
+    KoboWebhookSubmission,
     Sample,
     SampleAffiliation,
+    SamplePhoto,
+    SampleRawPayload,
     SampleSpecies,
+    SampleTombstone,
     User,
 )
 
@@ -13,7 +20,14 @@ __all__ = [
     "Affiliation",
     "Sample",
     "SampleAffiliation",
+    "SamplePhoto",
+    "SampleRawPayload",
     "SampleSpecies",
+    "SampleTombstone",
     "GenomicRecord",
     "AuditLog",
+    "IngestRun",
+    "CountryStats",
+    "KoboWebhookSubmission",
+    "BackgroundJob",
 ]
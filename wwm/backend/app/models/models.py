@@ -3,17 +3,19 @@ from typing import Optional
 
 from geoalchemy2 import Geometry
 from sqlalchemy import (
-    JSON,
+    BigInteger,
     Boolean,
     Date,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -43,16 +45,27 @@ class Sample(Base):
     external_sample_id: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     submitted_by: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     country: Mapped[Optional[str]] = mapped_column(String(120), nullable=True)
+    country_code: Mapped[Optional[str]] = mapped_column(String(2), nullable=True)
     data_source: Mapped[str] = mapped_column(String(20), nullable=False, default="kobo")
     kobo_uuid: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     kobo_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     kobo_submission_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    kobo_asset_uid: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     site_name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     sampling_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     status: Mapped[str] = mapped_column(String(30), nullable=False, default="pending")
     submitted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    raw_payload: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    tube_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    soil_ph: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    depth_cm: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    affiliation_other: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    possible_duplicate_of_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("samples.id", ondelete="SET NULL"), nullable=True
+    )
+    # Maintained by the triggers of migration 13, including for child-table writes.
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    change_txid: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
 
     latitude: Mapped[float] = mapped_column(Float, nullable=False)
     longitude: Mapped[float] = mapped_column(Float, nullable=False)
@@ -60,6 +73,32 @@ class Sample(Base):
 
     affiliations: Mapped[list["SampleAffiliation"]] = relationship(back_populates="sample", cascade="all, delete-orphan")
     species_entries: Mapped[list["SampleSpecies"]] = relationship(back_populates="sample", cascade="all, delete-orphan")
+    raw_submission: Mapped[Optional["SampleRawPayload"]] = relationship(
+        back_populates="sample", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+
+class SampleRawPayload(Base):
+    """Original Kobo submission, kept out of the ``samples`` row and loaded on demand."""
+
+    __tablename__ = "sample_raw_payloads"
+
+    sample_id: Mapped[int] = mapped_column(ForeignKey("samples.id", ondelete="CASCADE"), primary_key=True)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    received_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    sample: Mapped[Sample] = relationship(back_populates="raw_submission")
+
+
+class SampleTombstone(Base):
+    """Deleted sample, recorded by trigger so change-feed clients can drop it."""
+
+    __tablename__ = "sample_tombstones"
+
+    sample_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    external_sample_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    change_txid: Mapped[int] = mapped_column(BigInteger, nullable=False)
 
 
 class SampleAffiliation(Base):
@@ -69,6 +108,7 @@ class SampleAffiliation(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     sample_id: Mapped[int] = mapped_column(ForeignKey("samples.id", ondelete="CASCADE"), nullable=False)
     affiliation_id: Mapped[int] = mapped_column(ForeignKey("affiliations.id", ondelete="CASCADE"), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
     sample: Mapped[Sample] = relationship(back_populates="affiliations")
     affiliation: Mapped[Affiliation] = relationship()
@@ -83,6 +123,7 @@ class SampleSpecies(Base):
     is_provisional: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     curated_by: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
     sample: Mapped[Sample] = relationship(back_populates="species_entries")
     genomic_records: Mapped[list["GenomicRecord"]] = relationship(back_populates="sample_species", cascade="all, delete-orphan")
@@ -96,18 +137,123 @@ class GenomicRecord(Base):
     accession: Mapped[str] = mapped_column(String(255), nullable=False)
     accession_validated: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     resolved_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    accession_checked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
     sample_species: Mapped[SampleSpecies] = relationship(back_populates="genomic_records")
 
 
 class AuditLog(Base):
+    """Append-only audit trail, range-partitioned by month on ``created_at``.
+
+    Partitions are created by ``wwm_ensure_audit_partitions`` (see migration 4);
+    rows outside every monthly partition land in ``audit_log_default``.
+    """
+
     __tablename__ = "audit_log"
+    __table_args__ = (
+        Index("idx_audit_log_entity", "entity_type", "entity_id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     actor: Mapped[str] = mapped_column(String(255), nullable=False)
     action: Mapped[str] = mapped_column(String(120), nullable=False)
     entity_type: Mapped[str] = mapped_column(String(100), nullable=False)
     entity_id: Mapped[str] = mapped_column(String(120), nullable=False)
-    detail: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    detail: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.utcnow, nullable=False)
+
+
+class IngestRun(Base):
+    __tablename__ = "ingest_runs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    trigger: Mapped[str] = mapped_column(String(50), nullable=False)
+    mode: Mapped[str] = mapped_column(String(20), nullable=False, default="full")
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="running")
+    since: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    ingested: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    duplicates: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    possible_duplicates: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    errors: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Resume point, committed together with each batch.
+    checkpoint_page_start: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    checkpoint_last_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    # Per-asset watermark, checkpoint and metrics, keyed by Kobo asset uid.
+    assets: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+
+
+class CountryStats(Base):
+    __tablename__ = "country_stats"
+
+    country_code: Mapped[str] = mapped_column(String(2), primary_key=True)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pending_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    validated_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rejected_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    species_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    genomic_link_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class KoboWebhookSubmission(Base):
+    """Durable queue of submissions pushed by the Kobo REST service, drained by the scheduler leader."""
+
+    __tablename__ = "kobo_webhook_queue"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    kobo_uuid: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    received_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    processed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+
+class BackgroundJob(Base):
+    """Admin job run on the in-process worker pool; progress is written back as it runs."""
+
+    __tablename__ = "background_jobs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    requested_by: Mapped[str] = mapped_column(String(50), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    result: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+
+class SamplePhoto(Base):
+    """Kobo photo attachment of a sample, downloaded into the content-addressed attachment cache."""
+
+    __tablename__ = "sample_photos"
+    __table_args__ = (UniqueConstraint("sample_id", "filename", name="uq_sample_photo"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    sample_id: Mapped[int] = mapped_column(ForeignKey("samples.id", ondelete="CASCADE"), nullable=False)
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    source_url: Mapped[str] = mapped_column(Text, nullable=False)
+    asset_uid: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    media_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    size_bytes: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    has_thumbnail: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    fetched_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class SpeciesCreate(BaseModel):
@@ -12,6 +12,39 @@ class ApprovalRequest(BaseModel):
     status: Literal["validated", "rejected"]
 
 
+class SampleFilter(BaseModel):
+    species: Optional[str] = None
+    status: Optional[str] = None
+    affiliation: Optional[str] = None
+
+    @model_validator(mode="after")
+    def require_criterion(self):
+        if not (self.species or self.status or self.affiliation):
+            raise ValueError("filter needs at least one of species, status or affiliation")
+        return self
+
+
+class SampleSelection(BaseModel):
+    """Either explicit sample IDs or a filter, as accepted by the bulk endpoints."""
+
+    ids: Optional[list[int]] = Field(default=None, min_length=1, max_length=10000)
+    filter: Optional[SampleFilter] = None
+
+    @model_validator(mode="after")
+    def require_one_selector(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("provide exactly one of ids or filter")
+        return self
+
+
+class BulkApprovalRequest(SampleSelection):
+    status: Literal["validated", "rejected"]
+
+
+class BulkSpeciesRequest(SampleSelection):
+    species_name: str = Field(min_length=2, max_length=255)
+
+
 class GenomicsCreate(BaseModel):
     accession: str = Field(min_length=2, max_length=255)
 
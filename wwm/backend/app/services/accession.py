@@ -4,6 +4,8 @@ import requests
 
 from app.core.config import settings
 
+NUCCORE_URL = "https://www.ncbi.nlm.nih.gov/nuccore/"
+
 
 @dataclass
 class AccessionValidationResult:
@@ -17,7 +19,7 @@ def validate_accession(accession: str) -> AccessionValidationResult:
     if not accession:
         return AccessionValidationResult(False, None)
 
-    fallback_url = f"https://www.ncbi.nlm.nih.gov/nuccore/{accession}"
+    fallback_url = f"{NUCCORE_URL}{accession}"
 
     if not settings.enable_real_ncbi_validation:
         return AccessionValidationResult(False, fallback_url)
@@ -37,3 +39,34 @@ def validate_accession(accession: str) -> AccessionValidationResult:
         return AccessionValidationResult(is_valid, fallback_url if is_valid else None)
     except requests.RequestException:
         return AccessionValidationResult(False, None)
+
+
+def validate_accessions(accessions: list[str]) -> dict[str, AccessionValidationResult] | None:
+    """Validate many accessions with one NCBI esummary call.
+
+    Returns ``None`` when NCBI could not be reached so callers can retry later.
+    """
+    accessions = [accession.strip() for accession in accessions if accession.strip()]
+    if not accessions:
+        return {}
+
+    data = {"db": "nucleotide", "id": ",".join(accessions), "retmode": "json"}
+    try:
+        response = requests.post(settings.ncbi_esummary_base, data=data, timeout=30)
+        response.raise_for_status()
+        result = response.json().get("result", {})
+    except (requests.RequestException, ValueError):
+        return None
+
+    known: set[str] = set()
+    for uid in result.get("uids", []):
+        summary = result.get(uid) or {}
+        for key in ("caption", "accessionversion"):
+            if summary.get(key):
+                known.add(str(summary[key]).upper())
+
+    results: dict[str, AccessionValidationResult] = {}
+    for accession in accessions:
+        is_valid = accession.upper() in known or accession.split(".")[0].upper() in known
+        results[accession] = AccessionValidationResult(is_valid, f"{NUCCORE_URL}{accession}" if is_valid else None)
+    return results
@@ -1,15 +1,65 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+import logging
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import Session, SessionTransaction
 
 from app.models import AuditLog
 
+logger = logging.getLogger(__name__)
+
+_BUFFER_KEY = "audit_buffer"
+
 
 def write_audit(db: Session, actor: str, action: str, entity_type: str, entity_id: str, detail: dict | None = None) -> None:
-    db.add(
-        AuditLog(
-            actor=actor,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            detail=detail,
+    """Queue an audit row on the session; queued rows are bulk-inserted at commit."""
+    transaction = db.get_nested_transaction() or db.get_transaction() or db.begin()
+    db.info.setdefault(_BUFFER_KEY, []).append(
+        (
+            transaction,
+            {
+                "actor": actor,
+                "action": action,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "detail": detail,
+                "created_at": datetime.utcnow(),
+            },
         )
     )
+
+
+def _within(transaction: SessionTransaction | None, ancestor: SessionTransaction) -> bool:
+    while transaction is not None:
+        if transaction is ancestor:
+            return True
+        transaction = transaction.parent
+    return False
+
+
+@event.listens_for(Session, "before_commit")
+def _flush_audit_buffer(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    buffered = session.info.pop(_BUFFER_KEY, None)
+    if buffered:
+        session.execute(insert(AuditLog), [row for _, row in buffered])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_audit(session: Session, previous_transaction: SessionTransaction) -> None:
+    buffered = session.info.get(_BUFFER_KEY)
+    if buffered:
+        buffered[:] = [entry for entry in buffered if not _within(entry[0], previous_transaction)]
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_audit_buffer(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_BUFFER_KEY, None)
+
+
+def ensure_audit_partitions(db: Session, months_ahead: int = 3) -> None:
+    """Create monthly ``audit_log`` partitions from the current month up to ``months_ahead``."""
+    db.execute(text("SELECT wwm_ensure_audit_partitions(:months_ahead)"), {"months_ahead": months_ahead})
+    db.commit()
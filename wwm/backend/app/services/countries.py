@@ -0,0 +1,64 @@
+"""ISO 3166 country list from the Kobo form, loaded once per process."""
+
+import csv
+import logging
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_COUNTRY_CODE = "ZZ"
+
+_DEFAULT_COUNTRY_LIST = Path(__file__).resolve().parents[3] / "forms" / "country_list_iso3166.csv"
+
+_names: dict[str, str] = {}
+_lookup: dict[str, str] = {}
+
+
+def load_countries(path: str | Path | None = None) -> int:
+    """Read ``list_name,name,label::English`` rows; safe to call again to reload."""
+    source = Path(path or settings.country_list_path or _DEFAULT_COUNTRY_LIST)
+    names: dict[str, str] = {}
+    try:
+        with source.open(newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                code = (row.get("name") or "").strip().upper()
+                label = (row.get("label::English") or "").strip()
+                if len(code) == 2 and label:
+                    names[code] = label
+    except OSError:
+        logger.warning("Country list %s not readable; country codes will not be normalised.", source)
+        return 0
+
+    lookup = {code.casefold(): code for code in names}
+    lookup.update({label.casefold(): code for code, label in names.items()})
+    _names.clear()
+    _names.update(names)
+    _lookup.clear()
+    _lookup.update(lookup)
+    return len(names)
+
+
+def country_lookup() -> dict[str, str]:
+    """Casefolded code or English name -> ISO code."""
+    if not _lookup:
+        load_countries()
+    return dict(_lookup)
+
+
+def normalize_country(value: str | None) -> str | None:
+    """Map an ISO code or English country name (any case) to its ISO 3166 alpha-2 code."""
+    if not value:
+        return None
+    if not _lookup:
+        load_countries()
+    return _lookup.get(" ".join(value.split()).casefold())
+
+
+def country_name(code: str) -> str:
+    if code == UNKNOWN_COUNTRY_CODE:
+        return "Unknown"
+    if not _names:
+        load_countries()
+    return _names.get(code, code)
@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import ColumnElement, and_, false, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Sample, SampleSpecies
+from app.schemas.schemas import SampleSelection
+from app.services.audit import write_audit
+from app.services.sample_filters import sample_filter_clauses
+from app.services.stats import refresh_country_stats
+
+
+def _selection_clause(selection: SampleSelection) -> ColumnElement[bool]:
+    if selection.ids is not None:
+        return Sample.id.in_(selection.ids)
+    criteria = selection.filter
+    return and_(*sample_filter_clauses(species=criteria.species, status=criteria.status, affiliation=criteria.affiliation))
+
+
+def _existing_ids(db: Session, ids: set[int]) -> set[int]:
+    if not ids:
+        return set()
+    return set(db.execute(select(Sample.id).where(Sample.id.in_(ids))).scalars())
+
+
+def _per_item_results(db: Session, selection: SampleSelection, changed: dict[int, dict[str, Any]]) -> list[dict[str, Any]]:
+    """Changed rows for filter selections; one entry per requested ID otherwise."""
+    if selection.ids is None:
+        return [{"id": sample_id, "result": "updated", **extra} for sample_id, extra in changed.items()]
+
+    requested = list(dict.fromkeys(selection.ids))
+    existing = _existing_ids(db, set(requested) - changed.keys())
+    results: list[dict[str, Any]] = []
+    for sample_id in requested:
+        if sample_id in changed:
+            results.append({"id": sample_id, "result": "updated", **changed[sample_id]})
+        elif sample_id in existing:
+            results.append({"id": sample_id, "result": "unchanged"})
+        else:
+            results.append({"id": sample_id, "result": "not_found"})
+    return results
+
+
+def bulk_set_status(db: Session, selection: SampleSelection, status: str, actor: str) -> dict[str, Any]:
+    """Set ``status`` on every selected sample with one UPDATE ... RETURNING.
+
+    Does not commit; the caller owns the transaction.
+    """
+    rows = db.execute(
+        update(Sample)
+        .where(_selection_clause(selection), Sample.status.is_distinct_from(status))
+        .values(status=status)
+        .returning(Sample.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+    for sample_id in rows:
+        write_audit(
+            db,
+            actor=actor,
+            action="approve_sample",
+            entity_type="sample",
+            entity_id=str(sample_id),
+            detail={"status": status, "bulk": True},
+        )
+
+    refresh_country_stats(db, rows)
+    changed = {sample_id: {"status": status} for sample_id in rows}
+    return {"status": status, "updated": len(rows), "results": _per_item_results(db, selection, changed)}
+
+
+def bulk_add_species(db: Session, selection: SampleSelection, species_name: str, actor: str) -> dict[str, Any]:
+    """Attach a curated species to every selected sample that lacks it, with one INSERT ... SELECT.
+
+    Does not commit; the caller owns the transaction.
+    """
+    already_assigned = (
+        select(SampleSpecies.id)
+        .where(
+            SampleSpecies.sample_id == Sample.id,
+            func.lower(SampleSpecies.species_name) == species_name.lower(),
+        )
+        .exists()
+    )
+    source = select(
+        Sample.id,
+        literal(species_name),
+        false(),
+        literal(actor),
+        literal(datetime.utcnow()),
+    ).where(_selection_clause(selection), ~already_assigned)
+
+    table = SampleSpecies.__table__
+    rows = db.execute(
+        insert(table)
+        .from_select(["sample_id", "species_name", "is_provisional", "curated_by", "created_at"], source)
+        .returning(table.c.id, table.c.sample_id)
+    ).all()
+
+    for row in rows:
+        write_audit(
+            db,
+            actor=actor,
+            action="add_species",
+            entity_type="sample_species",
+            entity_id=str(row.id),
+            detail={"sample_id": row.sample_id, "species_name": species_name, "bulk": True},
+        )
+
+    refresh_country_stats(db, [row.sample_id for row in rows])
+    changed = {row.sample_id: {"sample_species_id": row.id} for row in rows}
+    return {"species_name": species_name, "updated": len(rows), "results": _per_item_results(db, selection, changed)}
@@ -0,0 +1,13 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+def current_data_version(db: Session) -> int:
+    """Counter bumped once per committed write to sample data (migrations 7 and 21).
+
+    The bump is an ordinary row update made by a deferred trigger, so a reader
+    only sees a new version together with the data that produced it. Read it
+    before querying the data it keys: caches for samples, species,
+    affiliations or genomic records.
+    """
+    return db.execute(text("SELECT version FROM wwm_data_version_state")).scalar_one()
@@ -0,0 +1,170 @@
+"""Live sample events: PostgreSQL LISTEN/NOTIFY fanned out to SSE clients.
+
+Each worker process keeps one listening connection on a background thread
+(started with the first subscriber). Triggers send one notification per
+statement on ``samples`` (migration 23). The listener reads a burst of them,
+coalesces it to one ``sample`` event per changed sample, and copies those into
+the bounded asyncio queue of each connected client. A burst touching more
+than ``settings.events_coalesce_limit`` samples (a refresh, a bulk approve, a
+backfill) is sent as a single ``resync`` instead. A client that cannot keep up
+gets a ``resync`` event and is dropped from the fan-out; it should fall back to
+``/api/samples/changes``.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from typing import Any
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "wwm_sample_events"
+RESYNC = {"type": "resync"}
+# How long the listener keeps reading once notifications arrive, so one commit lands in one burst.
+BURST_QUIET_SECONDS = 0.05
+BURST_MAX_SECONDS = 1.0
+
+
+def coalesce_events(payloads: list[str], limit: int) -> list[dict[str, Any]]:
+    """One ``sample`` event per sample (its last change) from a burst of notification payloads.
+
+    Returns just ``[RESYNC]`` when a statement asked for it or more than
+    ``limit`` samples changed.
+    """
+    latest: dict[Any, dict[str, Any]] = {}
+    for payload in payloads:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed sample event payload: %r", payload)
+            continue
+        if message.get("resync"):
+            return [RESYNC]
+        for sample_id, status, lat, lon in message.get("rows") or []:
+            latest.pop(sample_id, None)
+            latest[sample_id] = {
+                "type": "sample",
+                "op": message.get("op"),
+                "id": sample_id,
+                "status": status,
+                "lat": lat,
+                "lon": lon,
+            }
+        if len(latest) > limit:
+            return [RESYNC]
+    return list(latest.values())
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int):
+        self.loop = loop
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=max_pending)
+        self.overflowed = False
+
+    def offer(self, event: dict[str, Any]) -> None:
+        """Runs on the event loop thread."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class EventBroadcaster:
+    def __init__(self, channel: str = CHANNEL, poll_seconds: float = 5.0):
+        self.channel = channel
+        self.poll_seconds = poll_seconds
+        self._subscribers: set[_Subscriber] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    def subscribe(self) -> _Subscriber:
+        subscriber = _Subscriber(asyncio.get_running_loop(), settings.events_max_pending)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._listen_forever, name="wwm-events", daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: _Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def _publish(self, event: dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+            except RuntimeError:
+                self.unsubscribe(subscriber)
+
+    def _listen_forever(self) -> None:
+        backoff = 1.0
+        while not self._stopping.is_set():
+            try:
+                self._listen()
+                backoff = 1.0
+            except Exception:
+                logger.exception("Sample event listener failed; reconnecting in %.0fs.", backoff)
+                # Clients may have missed events while we were disconnected.
+                self._publish(RESYNC)
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+
+    def _listen(self) -> None:
+        raw = engine.raw_connection()
+        try:
+            connection = raw.driver_connection
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+            logger.info("Listening for sample events on %s.", self.channel)
+            while not self._stopping.is_set():
+                if select.select([connection], [], [], self.poll_seconds) == ([], [], []):
+                    continue
+                for event in coalesce_events(self._read_burst(connection), settings.events_coalesce_limit):
+                    self._publish(event)
+        finally:
+            raw.invalidate()
+
+
+    @staticmethod
+    def _read_burst(connection) -> list[str]:
+        """Payloads of everything that arrives until the connection goes quiet (bounded)."""
+        payloads: list[str] = []
+        deadline = time.monotonic() + BURST_MAX_SECONDS
+        while True:
+            connection.poll()
+            payloads.extend(notify.payload for notify in connection.notifies)
+            connection.notifies.clear()
+            if time.monotonic() >= deadline:
+                return payloads
+            if select.select([connection], [], [], BURST_QUIET_SECONDS) == ([], [], []):
+                return payloads
+
+
+broadcaster = EventBroadcaster()
+
+
+def format_sse(event: dict[str, Any], event_id: int) -> str:
+    return f"id: {event_id}\nevent: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
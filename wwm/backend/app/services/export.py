@@ -0,0 +1,269 @@
+"""Streaming sample exports (CSV, GeoJSON, Parquet) with an optional on-disk cache.
+
+Rows are read through a server-side cursor in partitions of
+``settings.export_chunk_size`` and encoded chunk by chunk, so an export never
+holds the full result in memory. When ``settings.export_cache_dir`` is set,
+completed exports are kept on disk keyed by format, filters and the current
+data version; any write to sample data bumps the version and makes old files
+unreachable.
+"""
+
+from collections.abc import Iterable, Iterator, Sequence
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Row, Select, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import Affiliation, Sample, SampleAffiliation, SampleSpecies
+from app.services.data_version import current_data_version
+from app.services.sample_filters import has_genomic_links, sample_filter_clauses
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "geojson": ("application/geo+json", "geojson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+EXPORT_FIELDS = (
+    "sample_id",
+    "data_source",
+    "status",
+    "site_name",
+    "sampling_date",
+    "submitted_at",
+    "collector_name",
+    "country",
+    "tube_id",
+    "soil_ph",
+    "depth_cm",
+    "lat",
+    "lon",
+    "affiliations",
+    "species",
+    "has_genomic_links",
+)
+
+
+def export_statement(species: str | None = None, status: str | None = None, affiliation: str | None = None) -> Select:
+    affiliations = (
+        select(func.array_agg(aggregate_order_by(Affiliation.name, Affiliation.name)))
+        .select_from(SampleAffiliation)
+        .join(Affiliation, Affiliation.id == SampleAffiliation.affiliation_id)
+        .where(SampleAffiliation.sample_id == Sample.id)
+        .scalar_subquery()
+    )
+    species_names = (
+        select(func.array_agg(aggregate_order_by(SampleSpecies.species_name, SampleSpecies.id)))
+        .where(SampleSpecies.sample_id == Sample.id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Sample.external_sample_id.label("sample_id"),
+            Sample.data_source,
+            Sample.status,
+            func.coalesce(Sample.site_name, "Unknown site").label("site_name"),
+            func.coalesce(Sample.sampling_date, func.date(Sample.submitted_at)).label("sampling_date"),
+            Sample.submitted_at,
+            Sample.submitted_by.label("collector_name"),
+            Sample.country,
+            Sample.tube_id,
+            Sample.soil_ph,
+            Sample.depth_cm,
+            Sample.latitude.label("lat"),
+            Sample.longitude.label("lon"),
+            affiliations.label("affiliations"),
+            species_names.label("species"),
+            has_genomic_links().label("has_genomic_links"),
+        )
+        .where(*sample_filter_clauses(species=species, status=status, affiliation=affiliation))
+        .order_by(Sample.id)
+    )
+
+
+def _row_values(row: Row) -> dict[str, Any]:
+    values = dict(row._mapping)
+    values["sampling_date"] = values["sampling_date"].isoformat() if values["sampling_date"] else None
+    values["submitted_at"] = values["submitted_at"].isoformat() if values["submitted_at"] else None
+    values["affiliations"] = values["affiliations"] or []
+    values["species"] = values["species"] or []
+    return values
+
+
+def _csv_chunks(partitions: Iterable[Sequence[Row]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for rows in partitions:
+        for row in rows:
+            values = _row_values(row)
+            values["affiliations"] = ";".join(values["affiliations"])
+            values["species"] = ";".join(values["species"])
+            writer.writerow([values[field] for field in EXPORT_FIELDS])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _geojson_chunks(partitions: Iterable[Sequence[Row]]) -> Iterator[bytes]:
+    yield b'{"type":"FeatureCollection","features":['
+    separator = ""
+    for rows in partitions:
+        features = []
+        for row in rows:
+            properties = _row_values(row)
+            geometry = {"type": "Point", "coordinates": [properties.pop("lon"), properties.pop("lat")]}
+            features.append(json.dumps({"type": "Feature", "geometry": geometry, "properties": properties}))
+        if features:
+            yield (separator + ",".join(features)).encode("utf-8")
+            separator = ","
+    yield b"]}"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever pyarrow wrote since the last drain."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_chunks(partitions: Iterable[Sequence[Row]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("sample_id", pa.string()),
+            ("data_source", pa.string()),
+            ("status", pa.string()),
+            ("site_name", pa.string()),
+            ("sampling_date", pa.string()),
+            ("submitted_at", pa.string()),
+            ("collector_name", pa.string()),
+            ("country", pa.string()),
+            ("tube_id", pa.string()),
+            ("soil_ph", pa.float64()),
+            ("depth_cm", pa.float64()),
+            ("lat", pa.float64()),
+            ("lon", pa.float64()),
+            ("affiliations", pa.list_(pa.string())),
+            ("species", pa.list_(pa.string())),
+            ("has_genomic_links", pa.bool_()),
+        ]
+    )
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for rows in partitions:
+            writer.write_table(pa.Table.from_pylist([_row_values(row) for row in rows], schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+_WRITERS = {"csv": _csv_chunks, "geojson": _geojson_chunks, "parquet": _parquet_chunks}
+
+
+def export_cache_path(db: Session, export_format: str, filters: dict[str, str | None]) -> Path | None:
+    if not settings.export_cache_dir:
+        return None
+    version = current_data_version(db)
+    key = json.dumps({"format": export_format, **filters}, sort_keys=True)
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return Path(settings.export_cache_dir) / f"v{version}-{digest}.{EXPORT_FORMATS[export_format][1]}"
+
+
+def _prune_stale_exports(current: Path) -> None:
+    version_prefix = current.name.split("-", 1)[0] + "-"
+    for path in current.parent.glob("v*-*"):
+        if not path.name.startswith(version_prefix) and path.suffix != ".tmp":
+            path.unlink(missing_ok=True)
+
+
+def _tee_to_cache(chunks: Iterator[bytes], cache_path: Path) -> Iterator[bytes]:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    completed = False
+    try:
+        with tmp_path.open("wb") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+                yield chunk
+        os.replace(tmp_path, cache_path)
+        completed = True
+        _prune_stale_exports(cache_path)
+    finally:
+        if not completed:
+            tmp_path.unlink(missing_ok=True)
+
+
+def stream_export(
+    export_format: str,
+    filters: dict[str, str | None],
+    cache_path: Path | None = None,
+    session_factory: sessionmaker = SessionLocal,
+) -> Iterator[bytes]:
+    """Yield the encoded export; owns its session because it outlives the request dependency."""
+    db = session_factory()
+    try:
+        result = db.execute(export_statement(**filters).execution_options(yield_per=settings.export_chunk_size))
+        chunks = _WRITERS[export_format](result.partitions())
+        if cache_path is not None:
+            yield from _tee_to_cache(chunks, cache_path)
+        else:
+            yield from chunks
+    finally:
+        db.close()
+
+
+def precompute_exports() -> list[Path]:
+    """Write unfiltered exports for every format into the cache if they are missing."""
+    written: list[Path] = []
+    filters = {"species": None, "status": None, "affiliation": None}
+    for export_format in EXPORT_FORMATS:
+        db = SessionLocal()
+        try:
+            cache_path = export_cache_path(db, export_format, filters)
+        finally:
+            db.close()
+        if cache_path is None or cache_path.exists():
+            continue
+        for _ in stream_export(export_format, filters, cache_path):
+            pass
+        written.append(cache_path)
+    return written
@@ -0,0 +1,260 @@
+"""Streaming bulk import of curated species and genomic accessions from CSV.
+
+Rows are read in batches of ``settings.import_batch_size``. Each batch resolves
+its sample IDs with one query, is COPYed into a temporary staging table and is
+merged set-based into ``sample_species`` and ``genomic_records``, then
+committed. Accessions are stored unvalidated; ``validate_pending_accessions``
+checks them against NCBI later in batches.
+"""
+
+from collections.abc import Iterable
+import csv
+from dataclasses import dataclass, field
+from datetime import datetime
+import io
+import logging
+from typing import Any, TextIO
+import uuid
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import GenomicRecord, Sample
+from app.services.accession import NUCCORE_URL, validate_accessions
+from app.services.audit import write_audit
+from app.services.stats import refresh_country_stats
+
+logger = logging.getLogger(__name__)
+
+IMPORT_COLUMNS = ("external_sample_id", "species_name", "accession")
+
+_CREATE_STAGING = text(
+    "CREATE TEMP TABLE IF NOT EXISTS genomics_import_staging ("
+    "row_number INTEGER NOT NULL, "
+    "sample_id INTEGER NOT NULL, "
+    "species_name VARCHAR(255) NOT NULL, "
+    "accession VARCHAR(255) NOT NULL"
+    ") ON COMMIT DELETE ROWS"
+)
+
+_MERGE_SPECIES = text(
+    """
+    INSERT INTO sample_species (sample_id, species_name, is_provisional, curated_by, created_at)
+    SELECT DISTINCT ON (st.sample_id, lower(st.species_name))
+        st.sample_id, st.species_name, false, :actor, :now
+    FROM genomics_import_staging st
+    WHERE NOT EXISTS (
+        SELECT 1 FROM sample_species ss
+        WHERE ss.sample_id = st.sample_id AND lower(ss.species_name) = lower(st.species_name)
+    )
+    ORDER BY st.sample_id, lower(st.species_name), st.row_number
+    RETURNING id
+    """
+)
+
+_MERGE_RECORDS = text(
+    """
+    WITH targets AS (
+        SELECT DISTINCT ON (st.sample_id, lower(st.species_name), st.accession)
+            st.accession,
+            (
+                SELECT ss.id FROM sample_species ss
+                WHERE ss.sample_id = st.sample_id AND lower(ss.species_name) = lower(st.species_name)
+                ORDER BY ss.id
+                LIMIT 1
+            ) AS sample_species_id
+        FROM genomics_import_staging st
+        ORDER BY st.sample_id, lower(st.species_name), st.accession, st.row_number
+    )
+    INSERT INTO genomic_records (sample_species_id, accession, accession_validated, resolved_url, created_at)
+    SELECT t.sample_species_id, t.accession, false, :url_prefix || t.accession, :now
+    FROM targets t
+    WHERE NOT EXISTS (
+        SELECT 1 FROM genomic_records g
+        WHERE g.sample_species_id = t.sample_species_id AND g.accession = t.accession
+    )
+    RETURNING id
+    """
+)
+
+
+@dataclass
+class ImportRow:
+    row_number: int
+    external_sample_id: str
+    species_name: str
+    accession: str
+
+
+@dataclass
+class ImportReport:
+    import_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    rows: int = 0
+    staged: int = 0
+    species_created: int = 0
+    records_created: int = 0
+    records_existing: int = 0
+    error_count: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+    # (sample_id, lower(species_name), accession) already merged in this upload.
+    seen_records: set[tuple[int, str, str]] = field(default_factory=set, repr=False)
+
+    def add_error(self, row_number: int, external_sample_id: str | None, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < settings.import_max_reported_errors:
+            self.errors.append({"row": row_number, "external_sample_id": external_sample_id, "error": message})
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "import_id": self.import_id,
+            "rows": self.rows,
+            "staged": self.staged,
+            "species_created": self.species_created,
+            "records_created": self.records_created,
+            "records_existing": self.records_existing,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "errors_truncated": self.error_count > len(self.errors),
+        }
+
+
+def _parse_rows(stream: TextIO, report: ImportReport) -> Iterable[ImportRow]:
+    reader = csv.DictReader(stream)
+    missing = [column for column in IMPORT_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+
+    for record in reader:
+        row_number = reader.line_num
+        report.rows += 1
+        external_sample_id = (record.get("external_sample_id") or "").strip()
+        species_name = (record.get("species_name") or "").strip()
+        accession = (record.get("accession") or "").strip()
+
+        if not external_sample_id:
+            report.add_error(row_number, None, "external_sample_id is empty")
+        elif not 2 <= len(species_name) <= 255:
+            report.add_error(row_number, external_sample_id, "species_name must be 2-255 characters")
+        elif not 2 <= len(accession) <= 255:
+            report.add_error(row_number, external_sample_id, "accession must be 2-255 characters")
+        else:
+            yield ImportRow(row_number, external_sample_id, species_name, accession)
+
+
+def _copy_to_staging(db: Session, rows: list[tuple[int, int, str, str]]) -> None:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = db.connection().connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY genomics_import_staging (row_number, sample_id, species_name, accession) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def _merge_batch(db: Session, batch: list[ImportRow], report: ImportReport, actor: str) -> None:
+    external_ids = {row.external_sample_id for row in batch}
+    sample_ids = dict(
+        db.execute(
+            select(Sample.external_sample_id, Sample.id).where(Sample.external_sample_id.in_(external_ids))
+        ).all()
+    )
+
+    staged: list[tuple[int, int, str, str]] = []
+    for row in batch:
+        sample_id = sample_ids.get(row.external_sample_id)
+        if sample_id is None:
+            report.add_error(row.row_number, row.external_sample_id, "unknown external_sample_id")
+            continue
+        staged.append((row.row_number, sample_id, row.species_name, row.accession))
+    if not staged:
+        return
+
+    db.execute(_CREATE_STAGING)
+    _copy_to_staging(db, staged)
+
+    now = datetime.utcnow()
+    species_created = len(db.execute(_MERGE_SPECIES, {"actor": actor, "now": now}).all())
+    records_created = len(db.execute(_MERGE_RECORDS, {"url_prefix": NUCCORE_URL, "now": now}).all())
+
+    refresh_country_stats(db, [row[1] for row in staged])
+
+    report.staged += len(staged)
+    report.species_created += species_created
+    report.records_created += records_created
+    # Repeats of a record within this upload are neither created nor "existing".
+    targets = {(sample_id, species_name.lower(), accession) for _, sample_id, species_name, accession in staged}
+    new_targets = targets - report.seen_records
+    report.seen_records |= targets
+    report.records_existing += len(new_targets) - records_created
+
+    write_audit(
+        db,
+        actor=actor,
+        action="import_genomics_batch",
+        entity_type="genomics_import",
+        entity_id=report.import_id,
+        detail={"staged": len(staged), "species_created": species_created, "records_created": records_created},
+    )
+
+
+def import_genomics_csv(db: Session, stream: TextIO, actor: str = "admin") -> ImportReport:
+    """Import ``external_sample_id,species_name,accession`` rows, committing once per batch."""
+    report = ImportReport()
+    batch: list[ImportRow] = []
+    for row in _parse_rows(stream, report):
+        batch.append(row)
+        if len(batch) >= settings.import_batch_size:
+            _merge_batch(db, batch, report, actor)
+            db.commit()
+            batch.clear()
+
+    if batch:
+        _merge_batch(db, batch, report, actor)
+        db.commit()
+
+    logger.info(
+        "Genomics import %s: %s rows, %s records created, %s errors",
+        report.import_id,
+        report.rows,
+        report.records_created,
+        report.error_count,
+    )
+    return report
+
+
+def validate_pending_accessions(db: Session, max_batches: int = 50) -> int:
+    """Validate not-yet-checked accessions against NCBI in batches; returns records checked."""
+    if not settings.enable_real_ncbi_validation:
+        return 0
+
+    checked = 0
+    for _ in range(max_batches):
+        records = db.execute(
+            select(GenomicRecord)
+            .where(GenomicRecord.accession_checked_at.is_(None), GenomicRecord.accession_validated.is_(False))
+            .order_by(GenomicRecord.id)
+            .limit(settings.accession_validation_batch_size)
+        ).scalars().all()
+        if not records:
+            break
+
+        results = validate_accessions([record.accession for record in records])
+        if results is None:
+            logger.warning("NCBI unreachable; leaving %s accessions for the next run.", len(records))
+            break
+
+        now = datetime.utcnow()
+        for record in records:
+            result = results.get(record.accession.strip())
+            if result is not None:
+                record.accession_validated = result.accession_validated
+                record.resolved_url = result.resolved_url
+            record.accession_checked_at = now
+        db.commit()
+        checked += len(records)
+    return checked
@@ -0,0 +1,232 @@
+"""Admin background jobs on a bounded in-process worker pool.
+
+Jobs are rows in ``background_jobs`` so any worker can report on them. The
+running job writes its progress back (at most once a second) through its own
+short sessions. Independently, a heartbeat thread refreshes ``heartbeat_at``
+of every job this process has queued or is running, even while a job makes
+no progress (e.g. a long download). An ``ingest``-type job whose heartbeat is
+older than ``settings.job_stale_minutes`` is treated as dead, and
+``fail_abandoned_jobs`` marks such leftovers failed at startup.
+Ingest-type jobs additionally hold ``INGEST_LOCK_KEY`` while running, so they
+never overlap each other or the scheduler's ingest runs.
+"""
+
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+import logging
+import threading
+import time
+from typing import Any
+import uuid
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.locks import INGEST_LOCK_KEY, try_advisory_lock
+from app.db.session import SessionLocal
+from app.models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+INGEST_JOB_KINDS = ("kobo_ingest", "kobo_refresh")
+ACTIVE_STATUSES = ("queued", "running")
+
+JobFunction = Callable[[Session, Callable[[int, int], None]], dict[str, Any]]
+
+_executor = ThreadPoolExecutor(max_workers=settings.job_workers, thread_name_prefix="wwm-job")
+_submit_lock = threading.Lock()
+
+
+class _Heartbeat:
+    """Keeps ``heartbeat_at`` fresh for the jobs this process owns, from a single daemon thread."""
+
+    def __init__(self) -> None:
+        self._jobs: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    @property
+    def interval_seconds(self) -> float:
+        return max(5.0, settings.job_stale_minutes * 60 / 3)
+
+    def track(self, job_id: str, future: Future) -> None:
+        with self._lock:
+            self._jobs[job_id] = future
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._beat_forever, name="wwm-job-heartbeat", daemon=True)
+                self._thread.start()
+        future.add_done_callback(lambda _: self._forget(job_id))
+
+    def _forget(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def owned(self) -> dict[str, Future]:
+        with self._lock:
+            return dict(self._jobs)
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def _beat_forever(self) -> None:
+        while not self._stopping.wait(self.interval_seconds):
+            job_ids = list(self.owned())
+            if not job_ids:
+                continue
+            try:
+                db = SessionLocal()
+                try:
+                    db.execute(
+                        update(BackgroundJob)
+                        .where(BackgroundJob.id.in_(job_ids), BackgroundJob.status.in_(ACTIVE_STATUSES))
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+                    db.commit()
+                finally:
+                    db.close()
+            except Exception:
+                logger.exception("Could not write the background job heartbeat")
+
+
+_heartbeat = _Heartbeat()
+
+
+class _ProgressReporter:
+    def __init__(self, job_id: str, interval_seconds: float = 1.0):
+        self.job_id = job_id
+        self.interval_seconds = interval_seconds
+        self._last_write = 0.0
+
+    def __call__(self, processed: int, total: int) -> None:
+        now = time.monotonic()
+        if processed < total and now - self._last_write < self.interval_seconds:
+            return
+        self._last_write = now
+        _update_job(self.job_id, processed=processed, total=total, heartbeat_at=datetime.utcnow())
+
+
+def _update_job(job_id: str, **values: Any) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(update(BackgroundJob).where(BackgroundJob.id == job_id).values(**values))
+        db.commit()
+    finally:
+        db.close()
+
+
+def active_ingest_job(db: Session) -> BackgroundJob | None:
+    stale_before = datetime.utcnow() - timedelta(minutes=settings.job_stale_minutes)
+    return db.execute(
+        select(BackgroundJob)
+        .where(
+            BackgroundJob.kind.in_(INGEST_JOB_KINDS),
+            BackgroundJob.status.in_(ACTIVE_STATUSES),
+            BackgroundJob.heartbeat_at >= stale_before,
+        )
+        .order_by(BackgroundJob.created_at)
+        .limit(1)
+    ).scalar_one_or_none()
+
+
+def _run(job_id: str, kind: str, function: JobFunction) -> None:
+    started = datetime.utcnow()
+    _update_job(job_id, status="running", started_at=started, heartbeat_at=started)
+    try:
+        with try_advisory_lock(INGEST_LOCK_KEY) as acquired:
+            if not acquired:
+                _update_job(
+                    job_id,
+                    status="failed",
+                    finished_at=datetime.utcnow(),
+                    error="Another ingest is already running",
+                )
+                return
+            db = SessionLocal()
+            try:
+                result = function(db, _ProgressReporter(job_id))
+            finally:
+                db.close()
+    except Exception as exc:
+        logger.exception("Background job %s (%s) failed", job_id, kind)
+        _update_job(job_id, status="failed", finished_at=datetime.utcnow(), error=f"{type(exc).__name__}: {exc}")
+        return
+    _update_job(job_id, status="succeeded", finished_at=datetime.utcnow(), heartbeat_at=datetime.utcnow(), result=result)
+
+
+def submit_ingest_job(db: Session, kind: str, function: JobFunction, requested_by: str) -> tuple[BackgroundJob, bool]:
+    """Queue an ingest-type job; returns ``(job, created)``, or the already active job and False."""
+    with _submit_lock:
+        active = active_ingest_job(db)
+        if active is not None:
+            return active, False
+        job = BackgroundJob(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            status="queued",
+            requested_by=requested_by,
+            created_at=datetime.utcnow(),
+            heartbeat_at=datetime.utcnow(),
+        )
+        db.add(job)
+        db.commit()
+    _heartbeat.track(job.id, _executor.submit(_run, job.id, kind, function))
+    return job, True
+
+
+def fail_abandoned_jobs(db: Session) -> int:
+    """Mark queued or running jobs whose heartbeat went stale as failed; their worker exited. Commits."""
+    stale_before = datetime.utcnow() - timedelta(minutes=settings.job_stale_minutes)
+    abandoned = db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.status.in_(ACTIVE_STATUSES), BackgroundJob.heartbeat_at < stale_before)
+        .values(status="failed", finished_at=datetime.utcnow(), error="worker exited")
+    ).rowcount
+    db.commit()
+    return abandoned
+
+
+def job_status(job: BackgroundJob) -> dict[str, Any]:
+    rate = eta_seconds = None
+    if job.started_at is not None and job.processed:
+        elapsed = ((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds()
+        if elapsed > 0:
+            rate = round(job.processed / elapsed, 2)
+            if job.status == "running" and job.total is not None:
+                eta_seconds = round(max(job.total - job.processed, 0) / rate, 1)
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "requested_by": job.requested_by,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "progress": {
+            "processed": job.processed,
+            "total": job.total,
+            "rate_per_second": rate,
+            "eta_seconds": eta_seconds,
+        },
+        "result": job.result,
+        "error": job.error,
+    }
+
+
+def shutdown_jobs() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
+    _heartbeat.stop()
+    cancelled = [job_id for job_id, future in _heartbeat.owned().items() if future.cancelled()]
+    if cancelled:
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id.in_(cancelled), BackgroundJob.status == "queued")
+                .values(status="failed", finished_at=datetime.utcnow(), error="worker shut down before the job started")
+            )
+            db.commit()
+        finally:
+            db.close()
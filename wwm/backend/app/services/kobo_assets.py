@@ -0,0 +1,118 @@
+"""Configured Kobo assets (forms) and their field mappings.
+
+``KOBO_ASSETS`` is a JSON list such as::
+
+    [{"uid": "a8Rvu5KasYeAfsa2GfFppG", "name": "current"},
+     {"uid": "aXy...", "name": "updated"}]
+
+An optional ``fields`` object (e.g. ``{"collector_name": ["recorded_by"]}``)
+maps a canonical field (see ``DEFAULT_FIELD_KEYS``) to the Kobo
+question names to try, in order, replacing the defaults for that field.
+``base_url`` and ``token`` default to ``KOBO_BASE_URL``/``KOBO_TOKEN``.
+With ``KOBO_ASSETS`` empty, the single ``KOBO_ASSET_UID`` asset is used.
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+import json
+
+from app.core.config import settings
+
+DEFAULT_FIELD_KEYS: dict[str, tuple[str, ...]] = {
+    "sample_id": ("sample_id",),
+    "site_name": ("site_name",),
+    "collector_name": ("collector_name", "collector"),
+    "sampling_date": ("sampling_date",),
+    "gps_coordinates": ("gps_coordinates",),
+    "affiliation": ("affiliation",),
+    "affiliation_other": ("affiliation_other",),
+    "country": ("country",),
+    "habitat_type": ("habitat_type",),
+    "soil_type": ("soil_type",),
+    "soil_ph": ("soil_ph",),
+    "depth_cm": ("depth_cm",),
+    "num_samples": ("num_samples",),
+    "tube_id": ("tube_id",),
+    "notes": ("notes", "additional_notes"),
+    "climate_info": ("climate_info",),
+    "photo_sample": ("photo_sample",),
+    "start": ("start",),
+    "end": ("end",),
+    "today": ("today",),
+    "instance_uuid": ("instance_uuid",),
+    "meta_instance_id": ("meta/instanceID",),
+}
+
+
+@dataclass(frozen=True)
+class KoboAsset:
+    uid: str
+    name: str
+    base_url: str
+    token: str
+    fields: dict[str, tuple[str, ...]] = field(default_factory=dict, compare=False, hash=False)
+
+    def keys(self, name: str) -> tuple[str, ...]:
+        return self.fields.get(name, DEFAULT_FIELD_KEYS[name])
+
+    @property
+    def data_url(self) -> str:
+        return f"{self.base_url.rstrip('/')}/api/v2/assets/{self.uid}/data/"
+
+
+def _parse_asset(item: dict) -> KoboAsset:
+    uid = str(item.get("uid") or "").strip()
+    if not uid:
+        raise ValueError("Every KOBO_ASSETS entry needs a uid")
+    fields: dict[str, tuple[str, ...]] = {}
+    for name, keys in (item.get("fields") or {}).items():
+        if name not in DEFAULT_FIELD_KEYS:
+            raise ValueError(f"Unknown field {name!r} in KOBO_ASSETS mapping for {uid}")
+        fields[name] = (keys,) if isinstance(keys, str) else tuple(keys)
+    return KoboAsset(
+        uid=uid,
+        name=str(item.get("name") or uid),
+        base_url=item.get("base_url") or settings.kobo_base_url,
+        token=item.get("token") or settings.kobo_token,
+        fields=fields,
+    )
+
+
+@lru_cache(maxsize=1)
+def kobo_assets() -> tuple[KoboAsset, ...]:
+    """Configured assets; raises ValueError on a malformed ``KOBO_ASSETS``."""
+    if not settings.kobo_assets.strip():
+        if not settings.kobo_asset_uid:
+            return ()
+        return (KoboAsset(settings.kobo_asset_uid, "default", settings.kobo_base_url, settings.kobo_token),)
+    items = json.loads(settings.kobo_assets)
+    if not isinstance(items, list):
+        raise ValueError("KOBO_ASSETS must be a JSON list")
+    assets = tuple(_parse_asset(item) for item in items)
+    if len({asset.uid for asset in assets}) != len(assets):
+        raise ValueError("KOBO_ASSETS lists the same uid twice")
+    return assets
+
+
+def default_asset() -> KoboAsset:
+    """First configured asset; the fallback mapping for submissions with no known asset."""
+    assets = kobo_assets()
+    if assets:
+        return assets[0]
+    return KoboAsset(settings.kobo_asset_uid, "default", settings.kobo_base_url, settings.kobo_token)
+
+
+def asset_for_submission(submission: dict) -> KoboAsset:
+    """The asset a pushed submission belongs to (Kobo sends ``_xform_id_string``)."""
+    uid = submission.get("_xform_id_string")
+    for asset in kobo_assets():
+        if asset.uid == uid:
+            return asset
+    return default_asset()
+
+
+def find_asset(name_or_uid: str) -> KoboAsset | None:
+    for asset in kobo_assets():
+        if name_or_uid in (asset.name, asset.uid):
+            return asset
+    return None
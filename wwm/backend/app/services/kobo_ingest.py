@@ -1,17 +1,29 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
+import json
 import logging
+import queue
 import re
-from typing import Any
+import threading
+import time
+from typing import Any, Callable, Iterator, NamedTuple
 
 import requests
-from sqlalchemy import exists, func, select
+from requests.adapters import HTTPAdapter
+from sqlalchemy import delete, exists, func, or_, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
 
 from app.core.config import settings
-from app.models import Affiliation, Sample, SampleAffiliation, SampleSpecies
+from app.models import Affiliation, AuditLog, IngestRun, Sample, SampleAffiliation, SampleRawPayload, SampleSpecies
 from app.services.audit import write_audit
+from app.services.countries import normalize_country
+from app.services.kobo_assets import KoboAsset, default_asset, kobo_assets
+from app.services.photos import queue_sample_photo
+from app.services.spatial import find_nearby_candidates, find_nearby_samples
+from app.services.stats import refresh_country_stats
 
 logger = logging.getLogger(__name__)
 
@@ -89,6 +101,16 @@ def _parse_datetime(value: Any) -> datetime | None:
     return None
 
 
+def _parse_float(value: Any) -> float | None:
+    text = _clean_string(value)
+    if text is None:
+        return None
+    try:
+        return float(text.replace(",", "."))
+    except ValueError:
+        return None
+
+
 def _parse_geopoint(value: Any) -> tuple[float, float] | None:
     if value is None:
         return None
@@ -118,20 +140,60 @@ def _extract_submissions(payload: Any) -> list[dict[str, Any]]:
     return []
 
 
-def fetch_kobo_submissions() -> list[dict[str, Any]]:
-    if not settings.kobo_asset_uid or not settings.kobo_token:
-        return []
+def iter_kobo_pages(
+    since: datetime | None = None,
+    after_id: int | None = None,
+    asset: KoboAsset | None = None,
+    session: requests.Session | None = None,
+) -> Iterator[tuple[int, list[dict[str, Any]], int | None]]:
+    """Yield ``(page_start, submissions, total)`` pages of one asset in ``_id`` order.
+
+    ``since`` limits to submissions at or after that submission time and
+    ``after_id`` to ``_id`` values above a checkpoint. ``total`` is Kobo's
+    match count when reported. ``asset`` defaults to the first configured one.
+    """
+    asset = asset or default_asset()
+    if not asset.uid or not asset.token:
+        return
 
-    base_url = settings.kobo_base_url.rstrip("/")
-    url = f"{base_url}/api/v2/assets/{settings.kobo_asset_uid}/data/"
+    http = session or requests
     headers = {
-        "Authorization": f"Token {settings.kobo_token}",
+        "Authorization": f"Token {asset.token}",
         "Accept": "application/json",
     }
 
-    response = requests.get(url, headers=headers, params={"format": "json"}, timeout=30)
-    response.raise_for_status()
-    return _extract_submissions(response.json())
+    query: dict[str, Any] = {}
+    if since is not None:
+        query["_submission_time"] = {"$gte": since.strftime("%Y-%m-%dT%H:%M:%S")}
+    if after_id is not None:
+        query["_id"] = {"$gt": after_id}
+
+    start = 0
+    while True:
+        params = {"format": "json", "limit": settings.kobo_page_size, "start": start, "sort": json.dumps({"_id": 1})}
+        if query:
+            params["query"] = json.dumps(query)
+        response = http.get(asset.data_url, headers=headers, params=params, timeout=60)
+        response.raise_for_status()
+        payload = response.json()
+        submissions = _extract_submissions(payload)
+        total = payload.get("count") if isinstance(payload, dict) else None
+        yield start, submissions, total
+        if not submissions or not (isinstance(payload, dict) and payload.get("next")):
+            return
+        start += len(submissions)
+
+
+def fetch_kobo_submissions(since: datetime | None = None, asset: KoboAsset | None = None) -> list[dict[str, Any]]:
+    """Fetch submissions for one asset, optionally only those submitted at or after ``since``."""
+    return [submission for _, page, _ in iter_kobo_pages(since=since, asset=asset) for submission in page]
+
+
+def submission_sample_id(submission: dict[str, Any], asset: KoboAsset | None = None) -> str | None:
+    """The sample ID a submission is stored under: the mapped ``sample_id``, else ``_uuid``/``_id``."""
+    asset = asset or default_asset()
+    value = get_first(submission, *asset.keys("sample_id"), "_uuid", "_id")
+    return None if _is_empty(value) else str(value).strip()
 
 
 def _parse_affiliation_values(value: Any) -> list[str]:
@@ -194,8 +256,13 @@ def _attach_affiliations(db: Session, sample: Sample, normalized: dict[str, Any]
                 db.add(SampleAffiliation(sample_id=sample.id, affiliation_id=affiliation.id))
 
 
-def _normalize_submission(submission: dict[str, Any]) -> dict[str, Any] | None:
-    preferred_sample_id = get_first(submission, "sample_id")
+def _normalize_submission(submission: dict[str, Any], asset: KoboAsset | None = None) -> dict[str, Any] | None:
+    asset = asset or default_asset()
+
+    def field(name: str, *fallbacks: str, default: Any = None) -> Any:
+        return get_first(submission, *asset.keys(name), *fallbacks, default=default)
+
+    preferred_sample_id = field("sample_id")
     fallback_sample_id = get_first(submission, "_uuid", "_id")
     sample_id_value = preferred_sample_id or fallback_sample_id
 
@@ -205,18 +272,18 @@ def _normalize_submission(submission: dict[str, Any]) -> dict[str, Any] | None:
     if _is_empty(preferred_sample_id):
         logger.warning("Kobo submission missing sample_id; falling back to _uuid/_id: %s", sample_id_value)
 
-    site_name = _clean_string(get_first(submission, "site_name")) or "Unknown site"
-    collector_name = _clean_string(get_first(submission, "collector_name", "collector"))
-    sampling_date = _parse_date(get_first(submission, "sampling_date", "_submission_time")) or date.today()
-    gps_raw = get_first(submission, "gps_coordinates", "_geolocation")
+    site_name = _clean_string(field("site_name")) or "Unknown site"
+    collector_name = _clean_string(field("collector_name"))
+    sampling_date = _parse_date(field("sampling_date", "_submission_time")) or date.today()
+    gps_raw = field("gps_coordinates", "_geolocation")
     geopoint = _parse_geopoint(gps_raw)
     if geopoint is None:
         return None
 
-    affiliation_raw = get_first(submission, "affiliation", default=[])
+    affiliation_raw = field("affiliation", default=[])
     affiliation_slugs = _parse_affiliation_values(affiliation_raw)
-    affiliation_other = _clean_string(get_first(submission, "affiliation_other"))
-    country_value = _clean_string(get_first(submission, "country"))
+    affiliation_other = _clean_string(field("affiliation_other"))
+    country_value = _clean_string(field("country"))
     kobo_uuid = _clean_string(get_first(submission, "_uuid"))
     kobo_id = _clean_string(get_first(submission, "_id"))
     kobo_submission_time = _parse_datetime(get_first(submission, "_submission_time"))
@@ -233,20 +300,21 @@ def _normalize_submission(submission: dict[str, Any]) -> dict[str, Any] | None:
         "kobo_uuid": kobo_uuid,
         "kobo_id": kobo_id,
         "kobo_submission_time": kobo_submission_time,
-        "habitat_type": _clean_string(get_first(submission, "habitat_type")),
-        "soil_type": _clean_string(get_first(submission, "soil_type")),
-        "soil_ph": _clean_string(get_first(submission, "soil_ph")),
-        "depth_cm": _clean_string(get_first(submission, "depth_cm")),
-        "num_samples": _clean_string(get_first(submission, "num_samples")),
-        "tube_id": _clean_string(get_first(submission, "tube_id")),
-        "notes": _clean_string(get_first(submission, "notes", "additional_notes")),
-        "climate_info": _clean_string(get_first(submission, "climate_info")),
-        "photo_sample": get_first(submission, "photo_sample"),
-        "start": _clean_string(get_first(submission, "start")),
-        "end": _clean_string(get_first(submission, "end")),
-        "today": _clean_string(get_first(submission, "today")),
-        "instance_uuid": _clean_string(get_first(submission, "instance_uuid")),
-        "meta_instance_id": _clean_string(get_first(submission, "meta/instanceID")),
+        "kobo_asset_uid": asset.uid,
+        "habitat_type": _clean_string(field("habitat_type")),
+        "soil_type": _clean_string(field("soil_type")),
+        "soil_ph": _parse_float(field("soil_ph")),
+        "depth_cm": _parse_float(field("depth_cm")),
+        "num_samples": _clean_string(field("num_samples")),
+        "tube_id": _clean_string(field("tube_id")),
+        "notes": _clean_string(field("notes")),
+        "climate_info": _clean_string(field("climate_info")),
+        "photo_sample": field("photo_sample"),
+        "start": _clean_string(field("start")),
+        "end": _clean_string(field("end")),
+        "today": _clean_string(field("today")),
+        "instance_uuid": _clean_string(field("instance_uuid")),
+        "meta_instance_id": _clean_string(field("meta_instance_id")),
         "affiliation_raw": affiliation_raw,
         "affiliation_slugs": affiliation_slugs,
         "affiliation_other": affiliation_other,
@@ -254,13 +322,14 @@ def _normalize_submission(submission: dict[str, Any]) -> dict[str, Any] | None:
     }
 
 
-def get_kobo_fields_debug() -> dict[str, Any]:
-    submissions = fetch_kobo_submissions()
+def get_kobo_fields_debug(asset: KoboAsset | None = None) -> dict[str, Any]:
+    asset = asset or default_asset()
+    submissions = fetch_kobo_submissions(asset=asset)
     if not submissions:
-        return {"count": 0, "keys": [], "mapped": {}}
+        return {"asset": asset.name, "count": 0, "keys": [], "mapped": {}}
 
     latest = submissions[0]
-    normalized = _normalize_submission(latest)
+    normalized = _normalize_submission(latest, asset)
     mapped = {
         "sample_id": normalized.get("sample_id") if normalized else None,
         "site_name": normalized.get("site_name") if normalized else None,
@@ -271,31 +340,87 @@ def get_kobo_fields_debug() -> dict[str, Any]:
         "affiliation_other": normalized.get("affiliation_other") if normalized else None,
         "affiliation_slugs": normalized.get("affiliation_slugs") if normalized else [],
     }
-    return {"count": len(submissions), "keys": sorted(latest.keys()), "mapped": mapped}
-
-
-def ingest_kobo_submissions(db: Session, actor: str = "system") -> dict[str, int]:
-    submissions = fetch_kobo_submissions()
-    ingested = 0
-    duplicates = 0
-    errors = 0
-    debug_logged = 0
-
-    for raw_item in submissions:
+    return {"asset": asset.name, "count": len(submissions), "keys": sorted(latest.keys()), "mapped": mapped}
+
+
+def latest_kobo_submission_time(db: Session, asset_uid: str) -> datetime | None:
+    """Watermark for incremental runs: newest submission time already stored for one asset."""
+    return db.execute(
+        select(func.max(Sample.kobo_submission_time)).where(
+            Sample.data_source == "kobo", Sample.kobo_asset_uid == asset_uid
+        )
+    ).scalar()
+
+
+def backfill_kobo_asset_uid(db: Session) -> int:
+    """Tag Kobo samples stored before per-asset tracking with ``KOBO_ASSET_UID``; does not commit."""
+    return db.execute(
+        update(Sample)
+        .where(Sample.data_source == "kobo", Sample.kobo_asset_uid.is_(None))
+        .values(kobo_asset_uid=settings.kobo_asset_uid)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+class BatchResult(NamedTuple):
+    inserted: list[int]
+    # Index into the batch's raw items -> why that submission was skipped.
+    failed: dict[int, str]
+
+
+def ingest_submission_batch(
+    db: Session,
+    raw_items: list[dict[str, Any]],
+    actor: str,
+    counts: dict[str, int],
+    asset: KoboAsset | None = None,
+) -> BatchResult:
+    """Insert one batch of raw submissions of ``asset``, one savepoint per submission.
+
+    Updates ``counts`` in place and leaves committing to the caller. Returns
+    the new sample IDs and the submissions that could not be stored; those
+    already present count as duplicates, not failures.
+    """
+    failed: dict[int, str] = {}
+    normalized_items: list[dict[str, Any]] = []
+    raw_indexes: list[int] = []
+    for raw_index, raw_item in enumerate(raw_items):
+        try:
+            normalized = _normalize_submission(raw_item, asset)
+        except Exception as exc:
+            logger.exception("Failed to normalize Kobo submission")
+            failed[raw_index] = f"{type(exc).__name__}: {exc}"
+            counts["errors"] += 1
+            continue
+        if normalized:
+            normalized_items.append(normalized)
+            raw_indexes.append(raw_index)
+        else:
+            failed[raw_index] = "submission lacks a sample id or valid coordinates"
+            counts["errors"] += 1
+
+    nearby_existing: dict[int, int] = {}
+    nearby_in_batch: dict[int, list[int]] = {}
+    if settings.ingest_duplicate_check and normalized_items:
+        candidates = [(index, item["lat"], item["lon"], item["sampling_date"]) for index, item in enumerate(normalized_items)]
+        radius_m, window_days = settings.duplicate_radius_m, settings.duplicate_window_days
+        nearby_existing = find_nearby_samples(db, candidates, radius_m, window_days)
+        nearby_in_batch = find_nearby_candidates(candidates, radius_m, window_days)
+    inserted_ids: dict[int, int] = {}
+
+    for index, normalized in enumerate(normalized_items):
         try:
             with db.begin_nested():
-                normalized = _normalize_submission(raw_item)
-                if not normalized:
-                    errors += 1
-                    continue
-
                 ext_id = normalized["sample_id"]
-                already_exists = db.execute(select(exists().where(Sample.external_sample_id == ext_id))).scalar()
+                same_submission = Sample.external_sample_id == ext_id
+                if normalized.get("kobo_uuid"):
+                    same_submission = or_(same_submission, Sample.kobo_uuid == normalized["kobo_uuid"])
+                already_exists = db.execute(select(exists().where(same_submission))).scalar()
                 if already_exists:
-                    duplicates += 1
+                    counts["duplicates"] += 1
                     continue
 
-                if settings.environment == "development" and debug_logged < 3:
+                if settings.environment == "development" and counts["ingested"] < 3:
                     logger.info(
                         "Kobo mapped record: sample_id=%s site_name=%s gps=%s affiliation_raw=%s",
                         normalized["sample_id"],
@@ -303,39 +428,34 @@ def ingest_kobo_submissions(db: Session, actor: str = "system") -> dict[str, int
                         normalized["gps_coordinates_raw"],
                         normalized["affiliation_raw"],
                     )
-                    debug_logged += 1
+
+                duplicate_of = nearby_existing.get(index)
+                if duplicate_of is None:
+                    duplicate_of = next(
+                        (inserted_ids[earlier] for earlier in nearby_in_batch.get(index, ()) if earlier in inserted_ids),
+                        None,
+                    )
 
                 sample = Sample(
                     external_sample_id=ext_id,
                     submitted_by=normalized.get("collector_name"),
                     country=normalized.get("country"),
+                    country_code=normalize_country(normalized.get("country")),
                     data_source="kobo",
                     kobo_uuid=normalized.get("kobo_uuid"),
                     kobo_id=normalized.get("kobo_id"),
                     kobo_submission_time=normalized.get("kobo_submission_time"),
+                    kobo_asset_uid=normalized.get("kobo_asset_uid"),
                     site_name=normalized.get("site_name"),
                     sampling_date=normalized.get("sampling_date"),
                     status="pending",
                     notes=str(normalized.get("notes")) if normalized.get("notes") is not None else None,
-                    raw_payload={
-                        "kobo": normalized.get("raw"),
-                        "collector_name": normalized.get("collector_name"),
-                        "country": normalized.get("country"),
-                        "habitat_type": normalized.get("habitat_type"),
-                        "soil_type": normalized.get("soil_type"),
-                        "soil_ph": normalized.get("soil_ph"),
-                        "depth_cm": normalized.get("depth_cm"),
-                        "num_samples": normalized.get("num_samples"),
-                        "tube_id": normalized.get("tube_id"),
-                        "climate_info": normalized.get("climate_info"),
-                        "photo_sample": normalized.get("photo_sample"),
-                        "start": normalized.get("start"),
-                        "end": normalized.get("end"),
-                        "today": normalized.get("today"),
-                        "instance_uuid": normalized.get("instance_uuid"),
-                        "meta_instance_id": normalized.get("meta_instance_id"),
-                        "affiliation_other": normalized.get("affiliation_other"),
-                    },
+                    tube_id=normalized.get("tube_id"),
+                    soil_ph=normalized.get("soil_ph"),
+                    depth_cm=normalized.get("depth_cm"),
+                    affiliation_other=normalized.get("affiliation_other"),
+                    possible_duplicate_of_id=duplicate_of,
+                    raw_submission=SampleRawPayload(payload=normalized["raw"]),
                     submitted_at=datetime.utcnow(),
                     latitude=normalized["lat"],
                     longitude=normalized["lon"],
@@ -345,6 +465,7 @@ def ingest_kobo_submissions(db: Session, actor: str = "system") -> dict[str, int
                 db.flush()
 
                 _attach_affiliations(db, sample, normalized)
+                queue_sample_photo(db, sample.id, normalized)
 
                 db.add(
                     SampleSpecies(
@@ -363,14 +484,320 @@ def ingest_kobo_submissions(db: Session, actor: str = "system") -> dict[str, int
                     entity_id=str(sample.id),
                     detail={"external_sample_id": ext_id, "source": "kobo"},
                 )
-                ingested += 1
-        except Exception:
+                if duplicate_of is not None:
+                    write_audit(
+                        db,
+                        actor=actor,
+                        action="flag_possible_duplicate",
+                        entity_type="sample",
+                        entity_id=str(sample.id),
+                        detail={"possible_duplicate_of_id": duplicate_of},
+                    )
+                    counts["possible_duplicates"] += 1
+                inserted_ids[index] = sample.id
+                counts["ingested"] += 1
+        except Exception as exc:
             logger.exception("Failed to ingest Kobo submission")
-            errors += 1
+            failed[raw_indexes[index]] = f"{type(exc).__name__}: {exc}"
+            counts["errors"] += 1
+    return BatchResult(list(inserted_ids.values()), failed)
+
+
+def _submission_id(submission: dict[str, Any]) -> int | None:
+    try:
+        return int(submission.get("_id"))
+    except (TypeError, ValueError):
+        return None
+
+
+COUNT_KEYS = ("ingested", "duplicates", "possible_duplicates", "errors")
+
+
+def _asset_state(asset: KoboAsset, since: datetime | None, after_id: int | None = None) -> dict[str, Any]:
+    return {
+        "name": asset.name,
+        "status": "pending",
+        "since": since.isoformat() if since else None,
+        "checkpoint_last_id": after_id,
+        "pages": 0,
+        "processed": 0,
+        "total": None,
+        **dict.fromkeys(COUNT_KEYS, 0),
+        "fetch_seconds": None,
+        "error": None,
+    }
+
 
+def resumable_ingest_run(db: Session, mode: str) -> IngestRun | None:
+    """The latest ingest run if it stopped part-way in ``mode``; call while holding the ingest lock."""
+    run = db.execute(select(IngestRun).order_by(IngestRun.started_at.desc()).limit(1)).scalar_one_or_none()
+    if run is None or run.mode != mode or run.status not in ("running", "failed"):
+        return None
+    checkpoints = [entry.get("checkpoint_last_id") for entry in (run.assets or {}).values()]
+    if run.checkpoint_last_id is None and all(checkpoint is None for checkpoint in checkpoints):
+        return None
+    return run
+
+
+def _fetch_concurrently(
+    jobs: list[tuple[KoboAsset, datetime | None, int | None]],
+) -> Iterator[tuple[str, KoboAsset, Any]]:
+    """Page through several assets at once and yield their pages to a single consumer.
+
+    Yields ``("page", asset, (page_start, submissions, total))``, then one
+    ``("done", asset, seconds)`` or ``("failed", asset, exception)`` per asset.
+    At most ``settings.kobo_max_connections`` requests are in flight, and a
+    bounded queue holds fetchers back when the writer falls behind.
+    """
+    if not jobs:
+        return
+    workers = max(1, min(len(jobs), settings.kobo_max_connections))
+    pages: queue.Queue = queue.Queue(maxsize=2 * workers)
+    stop = threading.Event()
+    adapter = HTTPAdapter(pool_connections=len(jobs), pool_maxsize=workers, pool_block=True)
+
+    def put(item: tuple[str, KoboAsset, Any]) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch(asset: KoboAsset, since: datetime | None, after_id: int | None) -> None:
+        started = time.monotonic()
+        # Not closed: closing a session would close the shared adapter.
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        try:
+            for page in iter_kobo_pages(since=since, after_id=after_id, asset=asset, session=session):
+                if not put(("page", asset, page)):
+                    return
+        except Exception as exc:
+            put(("failed", asset, exc))
+        else:
+            put(("done", asset, time.monotonic() - started))
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kobo-fetch")
+    try:
+        for job in jobs:
+            executor.submit(fetch, *job)
+        remaining = len(jobs)
+        while remaining:
+            item = pages.get()
+            if item[0] != "page":
+                remaining -= 1
+            yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        adapter.close()
+
+
+def _save_progress(db: Session, run: IngestRun, state: dict[str, dict[str, Any]], counts: dict[str, int]) -> None:
+    run.assets = {uid: dict(entry) for uid, entry in state.items()}
+    flag_modified(run, "assets")
+    run.processed = sum(entry["processed"] for entry in state.values())
+    run.total = sum(entry["processed"] if entry["total"] is None else entry["total"] for entry in state.values())
+    for key in COUNT_KEYS:
+        setattr(run, key, counts[key])
+    run.updated_at = datetime.utcnow()
+    db.commit()
+
+
+def ingest_kobo_submissions(
+    db: Session,
+    actor: str = "system",
+    since: datetime | None = None,
+    progress: Callable[[int, int], None] | None = None,
+    run: IngestRun | None = None,
+    assets: tuple[KoboAsset, ...] | None = None,
+) -> dict[str, Any]:
+    """Fetch every configured asset concurrently and ingest through this session, committing every batch.
+
+    ``run.assets`` holds each asset's watermark (``since``), checkpoint (last
+    Kobo ``_id``) and metrics, saved with every commit. Pass an unfinished
+    run (see ``resumable_ingest_run``) to continue from the checkpoints;
+    assets that already finished are skipped. ``progress(processed, total)``
+    is called after each batch. If any asset fails, the others still finish
+    and the run is then marked failed.
+    """
+    assets = kobo_assets() if assets is None else assets
+    if run is None:
+        run = IngestRun(trigger=actor, mode="incremental" if since else "full", since=since)
+    db.add(run)
+    run.status = "running"
+    run.error = None
+    run.finished_at = None
+
+    state: dict[str, dict[str, Any]] = {uid: dict(entry) for uid, entry in (run.assets or {}).items()}
+    for asset in assets:
+        if asset.uid not in state:
+            # Runs from before per-asset checkpoints kept a single one for the default asset.
+            legacy_id = run.checkpoint_last_id if not run.assets and asset == default_asset() else None
+            state[asset.uid] = _asset_state(asset, since or run.since, legacy_id)
+    counts = {key: getattr(run, key) or 0 for key in COUNT_KEYS}
+    _save_progress(db, run, state, counts)
+
+    jobs = [
+        (
+            asset,
+            datetime.fromisoformat(state[asset.uid]["since"]) if state[asset.uid]["since"] else None,
+            state[asset.uid]["checkpoint_last_id"],
+        )
+        for asset in assets
+        if state[asset.uid]["status"] != "succeeded"
+    ]
+    batch_size = settings.ingest_batch_size
+    try:
+        for kind, asset, payload in _fetch_concurrently(jobs):
+            entry = state[asset.uid]
+            if kind == "done":
+                entry.update(status="succeeded", fetch_seconds=round(payload, 2), error=None)
+                logger.info(
+                    "Kobo asset %s: %s submissions, %s ingested, fetched in %.1fs",
+                    asset.name,
+                    entry["processed"],
+                    entry["ingested"],
+                    payload,
+                )
+                _save_progress(db, run, state, counts)
+                continue
+            if kind == "failed":
+                entry.update(status="failed", error=f"{type(payload).__name__}: {payload}")
+                logger.error("Fetching Kobo asset %s failed: %s", asset.name, entry["error"])
+                _save_progress(db, run, state, counts)
+                continue
+
+            page_start, page, page_total = payload
+            entry["status"] = "running"
+            entry["pages"] += 1
+            if page_total is not None and page_start == 0:
+                entry["total"] = entry["processed"] + page_total
+            for offset in range(0, len(page), batch_size):
+                batch = page[offset : offset + batch_size]
+                batch_counts = dict.fromkeys(COUNT_KEYS, 0)
+                ingest_submission_batch(db, batch, actor, batch_counts, asset)
+                for key, value in batch_counts.items():
+                    entry[key] += value
+                    counts[key] += value
+                batch_ids = [submission_id for submission_id in map(_submission_id, batch) if submission_id is not None]
+                if batch_ids:
+                    entry["checkpoint_last_id"] = max(batch_ids + [entry["checkpoint_last_id"] or 0])
+                entry["processed"] += len(batch)
+                _save_progress(db, run, state, counts)
+                if progress:
+                    progress(run.processed, run.total or run.processed)
+    except Exception as exc:
+        db.rollback()
+        run.status = "failed"
+        run.error = f"{type(exc).__name__}: {exc}"
+        run.finished_at = datetime.utcnow()
+        db.commit()
+        raise
+
+    inserted = db.execute(
+        select(Sample.id).where(Sample.data_source == "kobo", Sample.submitted_at >= run.started_at)
+    ).scalars().all()
+    refresh_country_stats(db, inserted)
+    run.finished_at = datetime.utcnow()
+    failed = [entry for entry in state.values() if entry["status"] == "failed"]
+    if failed:
+        run.status = "failed"
+        run.error = "; ".join(f"{entry['name']}: {entry['error']}" for entry in failed)
+        db.commit()
+        raise RuntimeError(f"Kobo ingest failed for {len(failed)} asset(s): {run.error}")
+    run.status = "succeeded"
     db.commit()
+    return {**counts, "assets": {entry["name"]: entry for entry in state.values()}}
+
+
+def run_kobo_ingest(
+    db: Session,
+    trigger: str,
+    mode: str = "full",
+    progress: Callable[[int, int], None] | None = None,
+    resume: bool = True,
+) -> dict[str, Any]:
+    """Start a ``full`` or ``incremental`` ingest, or resume the last one of that mode if it stopped part-way.
+
+    Incremental runs start each asset from its own watermark. Callers must
+    hold ``INGEST_LOCK_KEY`` so no other run is in flight.
+    """
+    run = resumable_ingest_run(db, mode) if resume else None
+    if run is not None:
+        logger.info("Resuming %s ingest run %s from its checkpoints", mode, run.id)
+    else:
+        run = IngestRun(trigger=trigger, mode=mode, started_at=datetime.utcnow())
+        if mode == "incremental":
+            run.assets = {
+                asset.uid: _asset_state(asset, latest_kobo_submission_time(db, asset.uid)) for asset in kobo_assets()
+            }
+            watermarks = [entry["since"] for entry in run.assets.values() if entry["since"]]
+            run.since = datetime.fromisoformat(min(watermarks)) if watermarks else None
+    return ingest_kobo_submissions(db, actor=trigger, progress=progress, run=run)
+
+
+def refresh_kobo_samples(
+    db: Session,
+    actor: str = "admin_refresh",
+    progress: Callable[[int, int], None] | None = None,
+) -> dict[str, Any]:
+    """Replace every Kobo-sourced sample (and its audit rows) with a fresh copy; seed samples are kept.
+
+    Every asset is fetched in full before anything is deleted, and the delete
+    and re-ingest commit as one transaction, so an unreachable asset or a
+    failing batch leaves the current samples in place.
+    """
+    assets = kobo_assets()
+    submissions: dict[str, list[dict[str, Any]]] = {asset.uid: [] for asset in assets}
+    for kind, asset, payload in _fetch_concurrently([(asset, None, None) for asset in assets]):
+        if kind == "failed":
+            raise RuntimeError(f"Fetching Kobo asset {asset.name} failed: {type(payload).__name__}: {payload}")
+        if kind == "page":
+            submissions[asset.uid].extend(payload[1])
+    total = sum(len(items) for items in submissions.values())
+
+    counts = dict.fromkeys(COUNT_KEYS, 0)
+    per_asset: dict[str, dict[str, int]] = {}
+    try:
+        kobo_sample_ids = db.execute(select(Sample.id).where(Sample.data_source == "kobo")).scalars().all()
+        if kobo_sample_ids:
+            db.execute(
+                delete(AuditLog).where(
+                    AuditLog.entity_type == "sample",
+                    AuditLog.entity_id.in_([str(sample_id) for sample_id in kobo_sample_ids]),
+                )
+            )
+            db.execute(delete(Sample).where(Sample.id.in_(kobo_sample_ids)).execution_options(synchronize_session=False))
+
+        processed = 0
+        batch_size = settings.ingest_batch_size
+        for asset in assets:
+            items = submissions[asset.uid]
+            asset_counts = dict.fromkeys(COUNT_KEYS, 0)
+            for offset in range(0, len(items), batch_size):
+                batch = items[offset : offset + batch_size]
+                ingest_submission_batch(db, batch, actor, asset_counts, asset)
+                processed += len(batch)
+                if progress:
+                    progress(processed, total)
+            for key, value in asset_counts.items():
+                counts[key] += value
+            per_asset[asset.name] = {"processed": len(items), **asset_counts}
+        refresh_country_stats(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    seed_samples_remaining = db.execute(select(func.count(Sample.id)).where(Sample.data_source == "seed")).scalar_one()
     return {
-        "ingested": ingested,
-        "duplicates": duplicates,
-        "errors": errors,
+        "deleted_kobo_samples": len(kobo_sample_ids),
+        "reingested_kobo_samples": counts["ingested"],
+        "seed_samples_remaining": seed_samples_remaining,
+        "kobo_count_reported": total,
+        "assets": per_asset,
     }
@@ -0,0 +1,177 @@
+"""Kobo REST-service webhook: verified push into a durable queue, drained in micro-batches.
+
+The receiver only stores the payload (one row per ``_uuid``, so retries from
+Kobo are no-ops). The scheduler leader drains pending rows every
+``settings.webhook_drain_seconds`` through ``ingest_submission_batch``, taking
+them with ``FOR UPDATE SKIP LOCKED`` so drains never overlap. Each payload is
+mapped with the asset named by its ``_xform_id_string``.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+import hashlib
+import hmac
+import logging
+from typing import Any
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import KoboWebhookSubmission
+from app.services.kobo_assets import KoboAsset, asset_for_submission
+from app.services.kobo_ingest import ingest_submission_batch
+from app.services.stats import refresh_country_stats
+
+logger = logging.getLogger(__name__)
+
+
+def webhook_enabled() -> bool:
+    return bool(settings.kobo_webhook_secret or settings.kobo_webhook_token)
+
+
+def verify_webhook(body: bytes, signature: str | None, token: str | None) -> bool:
+    """Accept an HMAC-SHA256 body signature (hex, optional ``sha256=`` prefix) or the static token."""
+    if settings.kobo_webhook_secret and signature:
+        expected = hmac.new(settings.kobo_webhook_secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+        if hmac.compare_digest(expected, signature.removeprefix("sha256=").strip().lower()):
+            return True
+    if settings.kobo_webhook_token and token:
+        return hmac.compare_digest(settings.kobo_webhook_token, token)
+    return False
+
+
+def enqueue_submission(db: Session, payload: dict[str, Any]) -> bool:
+    """Store a pushed submission; returns False if its ``_uuid`` was already queued. Commits."""
+    queued = db.execute(
+        insert(KoboWebhookSubmission)
+        .values(kobo_uuid=str(payload["_uuid"]), payload=payload, received_at=datetime.utcnow(), attempts=0)
+        .on_conflict_do_nothing(index_elements=["kobo_uuid"])
+        .returning(KoboWebhookSubmission.id)
+    ).scalar_one_or_none()
+    db.commit()
+    return queued is not None
+
+
+def _mark_failed(db: Session, ids: list[int], error: str) -> None:
+    db.execute(
+        update(KoboWebhookSubmission)
+        .where(KoboWebhookSubmission.id.in_(ids))
+        .values(attempts=KoboWebhookSubmission.attempts + 1, error=error)
+    )
+    db.commit()
+
+
+def _ingest_items(db: Session, items: list, counts: dict[str, int]) -> dict[int, str]:
+    """Ingest queued rows, each with its own asset mapping. Does not commit.
+
+    Rows that were stored (or already were) are marked processed. Submissions
+    the ingest skipped stay pending with an attempt charged and their error
+    recorded; those are returned, by queue row id.
+    """
+    by_asset: dict[str, list] = defaultdict(list)
+    assets: dict[str, KoboAsset] = {}
+    for item in items:
+        asset = asset_for_submission(item.payload)
+        assets[asset.uid] = asset
+        by_asset[asset.uid].append(item)
+    inserted: list[int] = []
+    failed: dict[int, str] = {}
+    for uid, asset_items in by_asset.items():
+        result = ingest_submission_batch(db, [item.payload for item in asset_items], "webhook", counts, assets[uid])
+        inserted.extend(result.inserted)
+        failed.update({asset_items[index].id: error for index, error in result.failed.items()})
+    refresh_country_stats(db, inserted)
+    db.execute(
+        update(KoboWebhookSubmission)
+        .where(KoboWebhookSubmission.id.in_([item.id for item in items if item.id not in failed]))
+        .values(processed_at=datetime.utcnow(), attempts=KoboWebhookSubmission.attempts + 1, error=None)
+    )
+    for submission_id, error in failed.items():
+        db.execute(
+            update(KoboWebhookSubmission)
+            .where(KoboWebhookSubmission.id == submission_id)
+            .values(attempts=KoboWebhookSubmission.attempts + 1, error=error)
+        )
+    return failed
+
+
+def _add_counts(total: dict[str, int], part: dict[str, int]) -> None:
+    for key, value in part.items():
+        total[key] = total.get(key, 0) + value
+
+
+def _drain_one_by_one(db: Session, ids: list[int], counts: dict[str, int], failed: set[int]) -> None:
+    """Retry the rows of a failed micro-batch singly so only the offending ones are charged an attempt."""
+    for submission_id in ids:
+        item = db.execute(
+            select(KoboWebhookSubmission.id, KoboWebhookSubmission.payload)
+            .where(KoboWebhookSubmission.id == submission_id, KoboWebhookSubmission.processed_at.is_(None))
+            .with_for_update(skip_locked=True)
+        ).one_or_none()
+        if item is None:
+            db.rollback()
+            continue
+        item_counts = dict.fromkeys(counts, 0)
+        try:
+            failed.update(_ingest_items(db, [item], item_counts))
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Queued webhook submission %s failed", submission_id)
+            _mark_failed(db, [submission_id], f"{type(exc).__name__}: {exc}")
+            failed.add(submission_id)
+            continue
+        _add_counts(counts, item_counts)
+
+
+def drain_webhook_queue(db: Session, max_batches: int = 20) -> dict[str, int]:
+    """Ingest pending queued submissions, one committed micro-batch at a time.
+
+    A failing micro-batch is rolled back and retried row by row. Rows that fail
+    on their own, or whose submission the ingest skipped, stay pending with the
+    error recorded and are left alone for the rest of this drain.
+    """
+    counts = {"ingested": 0, "duplicates": 0, "possible_duplicates": 0, "errors": 0}
+    failed: set[int] = set()
+    for _ in range(max_batches):
+        items = db.execute(
+            select(KoboWebhookSubmission.id, KoboWebhookSubmission.payload)
+            .where(
+                KoboWebhookSubmission.processed_at.is_(None),
+                KoboWebhookSubmission.attempts < settings.webhook_max_attempts,
+                KoboWebhookSubmission.id.not_in(failed),
+            )
+            .order_by(KoboWebhookSubmission.id)
+            .limit(settings.webhook_batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not items:
+            break
+
+        batch_counts = dict.fromkeys(counts, 0)
+        try:
+            skipped = _ingest_items(db, items, batch_counts)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Webhook micro-batch of %s submissions failed; retrying one by one", len(items))
+            _drain_one_by_one(db, [item.id for item in items], counts, failed)
+        else:
+            failed.update(skipped)
+            _add_counts(counts, batch_counts)
+
+        if len(items) < settings.webhook_batch_size:
+            break
+    return counts
+
+
+def prune_webhook_queue(db: Session) -> int:
+    """Drop processed rows past the retention window; commits."""
+    cutoff = datetime.utcnow() - timedelta(days=settings.webhook_retention_days)
+    deleted = db.execute(
+        delete(KoboWebhookSubmission).where(KoboWebhookSubmission.processed_at < cutoff)
+    ).rowcount
+    db.commit()
+    return deleted
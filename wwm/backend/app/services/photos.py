@@ -0,0 +1,291 @@
+"""Kobo photo attachments: queued at ingest, downloaded into a content-addressed cache.
+
+Ingest records a ``sample_photos`` row for each submission whose
+``photo_sample`` names one of its ``_attachments``. ``fetch_pending_photos``
+downloads pending rows on a bounded thread pool into
+``<ATTACHMENT_CACHE_DIR>/originals/<sha256[:2]>/<sha256>``, so identical
+files are stored once. Only raster images are kept: anything else Kobo
+returns, SVG included, is refused because the originals are served from our
+origin. It then builds JPEG thumbnails for new images in a process pool.
+The files never change for a given hash, which makes the hash a natural ETag.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+import hashlib
+import importlib.util
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Sample, SamplePhoto, SampleRawPayload
+from app.services.kobo_assets import KoboAsset, default_asset, kobo_assets
+
+logger = logging.getLogger(__name__)
+
+
+class UnsupportedAttachment(ValueError):
+    """The attachment is not a raster image or not on the asset's Kobo server; retrying will not help."""
+
+
+def is_raster_image(media_type: str | None) -> bool:
+    """Whether ``media_type`` is safe to serve inline: an ``image/*`` type other than SVG (which can run script)."""
+    return bool(media_type) and media_type.startswith("image/") and media_type != "image/svg+xml"
+
+
+def original_path(cache_dir: Path, content_hash: str) -> Path:
+    return cache_dir / "originals" / content_hash[:2] / content_hash
+
+
+def thumbnail_path(cache_dir: Path, content_hash: str) -> Path:
+    return cache_dir / "thumbnails" / content_hash[:2] / f"{content_hash}-{settings.thumbnail_size}.jpg"
+
+
+def _attachment_url(submission: dict[str, Any], filename: str) -> str | None:
+    basename = filename.rsplit("/", 1)[-1]
+    # Kobo stores the upload with spaces replaced by underscores.
+    candidates = {basename, basename.replace(" ", "_")}
+    for attachment in submission.get("_attachments") or []:
+        if not isinstance(attachment, dict):
+            continue
+        stored = str(attachment.get("filename") or "").rsplit("/", 1)[-1]
+        if stored in candidates:
+            return attachment.get("download_url") or attachment.get("download_large_url")
+    return None
+
+
+def queue_sample_photo(db: Session, sample_id: int, normalized: dict[str, Any]) -> bool:
+    """Add a pending ``SamplePhoto`` for a normalized submission's ``photo_sample``; does not flush."""
+    filename = normalized.get("photo_sample")
+    if not isinstance(filename, str) or not filename.strip():
+        return False
+    url = _attachment_url(normalized["raw"], filename.strip())
+    if url is None:
+        return False
+    db.add(
+        SamplePhoto(
+            sample_id=sample_id,
+            filename=filename.strip()[:255],
+            source_url=url,
+            asset_uid=normalized.get("kobo_asset_uid"),
+        )
+    )
+    return True
+
+
+def queue_missing_photos(db: Session, photo_field: str = "photo_sample") -> int:
+    """Queue photos for Kobo samples stored before attachments were tracked; commits."""
+    has_photo = select(SamplePhoto.id).where(SamplePhoto.sample_id == Sample.id).exists()
+    rows = db.execute(
+        select(Sample.id, Sample.kobo_asset_uid, SampleRawPayload.payload)
+        .join(SampleRawPayload, SampleRawPayload.sample_id == Sample.id)
+        .where(Sample.data_source == "kobo", ~has_photo)
+        .execution_options(yield_per=1000)
+    )
+    queued = 0
+    for row in rows:
+        filename = next(
+            (value for key, value in row.payload.items() if key == photo_field or key.endswith(f"/{photo_field}")),
+            None,
+        )
+        normalized = {"photo_sample": filename, "raw": row.payload, "kobo_asset_uid": row.kobo_asset_uid}
+        queued += queue_sample_photo(db, row.id, normalized)
+    db.commit()
+    return queued
+
+
+def _origin(url: str) -> tuple[str, str | None, int | None]:
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    return scheme, parts.hostname, parts.port or {"http": 80, "https": 443}.get(scheme)
+
+
+def _download(session: requests.Session, url: str, asset: KoboAsset, cache_dir: Path) -> tuple[str, str | None, int]:
+    # download_url comes from the submission, which a webhook caller controls:
+    # never hand the asset's API token to any other server.
+    if _origin(url) != _origin(asset.base_url):
+        raise UnsupportedAttachment(f"attachment is not served by {asset.base_url}")
+    tmp_dir = cache_dir / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_dir / uuid.uuid4().hex
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        # requests drops the Authorization header if Kobo redirects to another host (e.g. storage).
+        headers = {"Authorization": f"Token {asset.token}"}
+        with session.get(url, headers=headers, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            media_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower() or None
+            if not is_raster_image(media_type):
+                raise UnsupportedAttachment(f"unsupported attachment type {media_type or 'unknown'}")
+            with tmp_path.open("wb") as handle:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    size += len(chunk)
+                    if size > settings.attachment_max_bytes:
+                        raise ValueError(f"attachment exceeds {settings.attachment_max_bytes} bytes")
+                    digest.update(chunk)
+                    handle.write(chunk)
+        content_hash = digest.hexdigest()
+        target = original_path(cache_dir, content_hash)
+        if target.exists():
+            tmp_path.unlink()
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, target)
+        return content_hash, media_type, size
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _download_all(pending: list, cache_dir: Path) -> dict[int, tuple[str, str | None, int] | Exception]:
+    assets = {asset.uid: asset for asset in kobo_assets()}
+    fallback_asset = default_asset()
+    workers = max(1, settings.attachment_download_workers)
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=workers, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    def download(row) -> tuple[int, tuple[str, str | None, int] | Exception]:
+        try:
+            return row.id, _download(session, row.source_url, assets.get(row.asset_uid, fallback_asset), cache_dir)
+        except Exception as exc:
+            return row.id, exc
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="photo-download") as executor:
+            return dict(executor.map(download, pending))
+    finally:
+        session.close()
+
+
+def make_thumbnail(source: str, target: str, size: int) -> str | None:
+    """Write a JPEG thumbnail of ``source``; runs in a worker process. Returns an error message or None."""
+    try:
+        from PIL import Image, ImageOps
+
+        with Image.open(source) as image:
+            thumbnail = ImageOps.exif_transpose(image)
+            thumbnail.thumbnail((size, size))
+            if thumbnail.mode not in ("RGB", "L"):
+                thumbnail = thumbnail.convert("RGB")
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            thumbnail.save(tmp_path, "JPEG", quality=82, optimize=True, progressive=True)
+        os.replace(tmp_path, target)
+        return None
+    except Exception as exc:
+        return f"{type(exc).__name__}: {exc}"
+
+
+def _make_thumbnails(cache_dir: Path, hashes: set[str]) -> None:
+    missing = sorted(content_hash for content_hash in hashes if not thumbnail_path(cache_dir, content_hash).exists())
+    if not missing:
+        return
+    if importlib.util.find_spec("PIL") is None:
+        logger.warning("Pillow is not installed; skipping %s thumbnails.", len(missing))
+        return
+    sources = [str(original_path(cache_dir, content_hash)) for content_hash in missing]
+    targets = [str(thumbnail_path(cache_dir, content_hash)) for content_hash in missing]
+    sizes = [settings.thumbnail_size] * len(missing)
+    # spawn, not fork: the API process runs scheduler and worker threads.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max(1, settings.thumbnail_workers), mp_context=context) as pool:
+        for source, error in zip(sources, pool.map(make_thumbnail, sources, targets, sizes)):
+            if error:
+                logger.warning("Could not build thumbnail for %s: %s", source, error)
+
+
+def fetch_pending_photos(db: Session, limit: int | None = None) -> dict[str, int]:
+    """Download one batch of pending photos and thumbnail them; commits."""
+    counts = {"stored": 0, "failed": 0}
+    if not settings.attachment_cache_dir:
+        return counts
+    cache_dir = Path(settings.attachment_cache_dir)
+    pending = db.execute(
+        select(SamplePhoto.id, SamplePhoto.source_url, SamplePhoto.asset_uid)
+        .where(SamplePhoto.status == "pending")
+        .order_by(SamplePhoto.id)
+        .limit(limit or settings.attachment_batch_size)
+    ).all()
+    # Downloads can take a while; don't hold a transaction open across them.
+    db.rollback()
+    if not pending:
+        return counts
+
+    outcomes = _download_all(pending, cache_dir)
+    _make_thumbnails(
+        cache_dir,
+        {
+            outcome[0]
+            for outcome in outcomes.values()
+            if not isinstance(outcome, Exception)
+        },
+    )
+
+    now = datetime.utcnow()
+    for photo_id, outcome in outcomes.items():
+        if isinstance(outcome, Exception):
+            counts["failed"] += 1
+            status = case((SamplePhoto.attempts + 1 >= settings.attachment_max_attempts, "failed"), else_="pending")
+            db.execute(
+                update(SamplePhoto)
+                .where(SamplePhoto.id == photo_id)
+                .values(
+                    attempts=SamplePhoto.attempts + 1,
+                    status="failed" if isinstance(outcome, UnsupportedAttachment) else status,
+                    error=f"{type(outcome).__name__}: {outcome}",
+                )
+            )
+            continue
+        content_hash, media_type, size = outcome
+        counts["stored"] += 1
+        db.execute(
+            update(SamplePhoto)
+            .where(SamplePhoto.id == photo_id)
+            .values(
+                attempts=SamplePhoto.attempts + 1,
+                status="stored",
+                content_hash=content_hash,
+                media_type=media_type,
+                size_bytes=size,
+                has_thumbnail=thumbnail_path(cache_dir, content_hash).exists(),
+                fetched_at=now,
+                error=None,
+            )
+        )
+    db.commit()
+    return counts
+
+
+def photo_file(db: Session, sample_id: int, variant: str = "thumbnail") -> tuple[Path, str, str] | None:
+    """``(path, media_type, etag)`` of a sample's stored photo; the original when no thumbnail exists."""
+    if not settings.attachment_cache_dir:
+        return None
+    photo = db.execute(
+        select(SamplePhoto)
+        .where(SamplePhoto.sample_id == sample_id, SamplePhoto.status == "stored")
+        .order_by(SamplePhoto.id)
+        .limit(1)
+    ).scalar_one_or_none()
+    if photo is None:
+        return None
+    cache_dir = Path(settings.attachment_cache_dir)
+    if variant == "thumbnail" and photo.has_thumbnail:
+        path = thumbnail_path(cache_dir, photo.content_hash)
+        if path.exists():
+            return path, "image/jpeg", f'"{photo.content_hash}-{settings.thumbnail_size}"'
+    path = original_path(cache_dir, photo.content_hash)
+    if not path.exists():
+        return None
+    return path, photo.media_type or "application/octet-stream", f'"{photo.content_hash}"'
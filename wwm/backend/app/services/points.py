@@ -0,0 +1,97 @@
+"""Compact map payloads: parallel point arrays plus per-sample popup details.
+
+The binary layout is little-endian and 4-byte aligned so the browser can wrap
+it in typed arrays without copying::
+
+    int32   ids[count]
+    float32 lat[count]
+    float32 lon[count]
+    int8    status[count]   (index into STATUS_CODES, -1 if unknown)
+
+``count`` and the status table travel in response headers.
+"""
+
+from array import array
+import sys
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from app.models import Sample, SampleAffiliation, SamplePhoto
+from app.services.sample_filters import sample_filter_clauses
+
+STATUS_CODES = ("pending", "validated", "rejected")
+_STATUS_INDEX = {status: index for index, status in enumerate(STATUS_CODES)}
+
+
+def sample_points(
+    db: Session,
+    species: str | None = None,
+    status: str | None = None,
+    affiliation: str | None = None,
+) -> tuple[array, array, array, array]:
+    rows = db.execute(
+        select(Sample.id, Sample.latitude, Sample.longitude, Sample.status)
+        .where(*sample_filter_clauses(species=species, status=status, affiliation=affiliation))
+        .order_by(Sample.id)
+    ).all()
+    ids = array("i", (row.id for row in rows))
+    lats = array("f", (row.latitude for row in rows))
+    lons = array("f", (row.longitude for row in rows))
+    statuses = array("b", (_STATUS_INDEX.get(row.status, -1) for row in rows))
+    return ids, lats, lons, statuses
+
+
+def points_as_json(ids: array, lats: array, lons: array, statuses: array) -> dict[str, Any]:
+    return {
+        "count": len(ids),
+        "statuses": list(STATUS_CODES),
+        "ids": ids.tolist(),
+        "lat": [round(value, 5) for value in lats],
+        "lon": [round(value, 5) for value in lons],
+        "status": statuses.tolist(),
+    }
+
+
+def points_as_bytes(ids: array, lats: array, lons: array, statuses: array) -> bytes:
+    parts = []
+    for values in (ids, lats, lons, statuses):
+        if sys.byteorder == "big" and values.itemsize > 1:
+            values = array(values.typecode, values)
+            values.byteswap()
+        parts.append(values.tobytes())
+    return b"".join(parts)
+
+
+def sample_popup(db: Session, sample_id: int) -> dict[str, Any] | None:
+    sample = db.execute(
+        select(Sample)
+        .options(
+            selectinload(Sample.affiliations).selectinload(SampleAffiliation.affiliation),
+            selectinload(Sample.species_entries),
+        )
+        .where(Sample.id == sample_id)
+    ).scalar_one_or_none()
+    if sample is None:
+        return None
+    has_photo = db.execute(
+        select(select(SamplePhoto.id).where(SamplePhoto.sample_id == sample.id, SamplePhoto.status == "stored").exists())
+    ).scalar()
+    return {
+        "id": sample.id,
+        "sample_id": sample.external_sample_id,
+        "status": sample.status,
+        "site_name": sample.site_name or "Unknown site",
+        "sampling_date": sample.sampling_date.isoformat()
+        if sample.sampling_date
+        else sample.submitted_at.date().isoformat(),
+        "collector_name": sample.submitted_by,
+        "tube_id": sample.tube_id,
+        "affiliations": [
+            {"slug": sa.affiliation.name, "name": sa.affiliation.display_name} for sa in sample.affiliations
+        ],
+        "affiliation_other": sample.affiliation_other,
+        "species": [sp.species_name for sp in sample.species_entries],
+        "has_photo": has_photo,
+    }
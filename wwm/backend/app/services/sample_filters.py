@@ -0,0 +1,48 @@
+from sqlalchemy import ColumnElement, func, select
+
+from app.models import Affiliation, GenomicRecord, Sample, SampleAffiliation, SampleSpecies
+
+
+def sample_filter_clauses(
+    species: str | None = None,
+    status: str | None = None,
+    affiliation: str | None = None,
+) -> list[ColumnElement[bool]]:
+    """WHERE clauses on ``Sample`` for the public list filters.
+
+    Species and affiliation are EXISTS subqueries so callers never need to
+    de-duplicate rows, and they hit the ``lower(...)`` functional indexes.
+    """
+    clauses: list[ColumnElement[bool]] = []
+    if status:
+        clauses.append(Sample.status == status)
+    if species:
+        clauses.append(
+            select(SampleSpecies.id)
+            .where(
+                SampleSpecies.sample_id == Sample.id,
+                func.lower(SampleSpecies.species_name) == species.lower(),
+            )
+            .exists()
+        )
+    if affiliation:
+        clauses.append(
+            select(SampleAffiliation.id)
+            .join(Affiliation, Affiliation.id == SampleAffiliation.affiliation_id)
+            .where(
+                SampleAffiliation.sample_id == Sample.id,
+                func.lower(Affiliation.name) == affiliation.lower(),
+            )
+            .exists()
+        )
+    return clauses
+
+
+def has_genomic_links() -> ColumnElement[bool]:
+    """EXISTS over ``genomic_records`` for the outer ``Sample`` row."""
+    return (
+        select(GenomicRecord.id)
+        .join(SampleSpecies, SampleSpecies.id == GenomicRecord.sample_species_id)
+        .where(SampleSpecies.sample_id == Sample.id)
+        .exists()
+    )
@@ -0,0 +1,277 @@
+"""Sample list and detail views.
+
+``sample_list`` honours a sparse fieldset: relationships are only loaded
+when a requested field needs them, and ``has_genomic_links`` is an EXISTS
+column rather than a load of every genomic record.
+
+``sample_rows`` is the pre-shaped variant for large responses: every field
+is computed in SQL (lists via ``array_agg`` subqueries) and rows come back as
+plain tuples in ``fields`` order, with no ORM objects or per-row dicts.
+
+``sample_changes`` is the incremental feed: ``samples.change_txid`` is the
+transaction ID of the last write to a sample or any of its child rows
+(migration 13 triggers), and deletes leave rows in ``sample_tombstones``.
+"""
+
+from datetime import datetime, timedelta
+import time
+from typing import Any
+
+from sqlalchemy import ColumnElement, Row, Select, and_, delete, func, literal_column, select, text, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session, selectinload
+
+from app.models import Affiliation, Sample, SampleAffiliation, SampleRawPayload, SampleSpecies, SampleTombstone
+from app.services.sample_filters import has_genomic_links, sample_filter_clauses
+
+SAMPLE_FIELDS = (
+    "sample_id",
+    "data_source",
+    "status",
+    "site_name",
+    "sampling_date",
+    "collector_name",
+    "tube_id",
+    "soil_ph",
+    "depth_cm",
+    "lat",
+    "lon",
+    "affiliations",
+    "affiliation_other",
+    "species",
+    "has_genomic_links",
+    "possible_duplicate_of_id",
+)
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...]:
+    """Validate a comma-separated ``fields=`` value; all fields when empty."""
+    if not fields:
+        return SAMPLE_FIELDS
+    requested = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in SAMPLE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested or SAMPLE_FIELDS
+
+
+def _sampling_date(sample: Sample) -> str:
+    return sample.sampling_date.isoformat() if sample.sampling_date else sample.submitted_at.date().isoformat()
+
+
+_FIELD_VALUES = {
+    "sample_id": lambda sample: sample.external_sample_id,
+    "data_source": lambda sample: sample.data_source,
+    "status": lambda sample: sample.status,
+    "site_name": lambda sample: sample.site_name or "Unknown site",
+    "sampling_date": _sampling_date,
+    "collector_name": lambda sample: sample.submitted_by,
+    "tube_id": lambda sample: sample.tube_id,
+    "soil_ph": lambda sample: sample.soil_ph,
+    "depth_cm": lambda sample: sample.depth_cm,
+    "lat": lambda sample: sample.latitude,
+    "lon": lambda sample: sample.longitude,
+    "affiliations": lambda sample: [sa.affiliation.name for sa in sample.affiliations],
+    "affiliation_other": lambda sample: sample.affiliation_other,
+    "species": lambda sample: [sp.species_name for sp in sample.species_entries],
+    "possible_duplicate_of_id": lambda sample: sample.possible_duplicate_of_id,
+}
+
+
+def sample_list(
+    db: Session,
+    fields: tuple[str, ...] = SAMPLE_FIELDS,
+    species: str | None = None,
+    status: str | None = None,
+    affiliation: str | None = None,
+) -> list[dict[str, Any]]:
+    stmt = _sample_select(fields).where(*sample_filter_clauses(species=species, status=status, affiliation=affiliation))
+    return [_shape(row, fields) for row in db.execute(stmt.order_by(Sample.submitted_at.desc()))]
+
+
+def _string_array(stmt: Select) -> ColumnElement:
+    return func.coalesce(stmt.scalar_subquery(), literal_column("ARRAY[]::varchar[]"))
+
+
+def _row_columns() -> dict[str, ColumnElement]:
+    return {
+        "sample_id": Sample.external_sample_id,
+        "data_source": Sample.data_source,
+        "status": Sample.status,
+        "site_name": func.coalesce(Sample.site_name, "Unknown site"),
+        "sampling_date": func.coalesce(Sample.sampling_date, func.date(Sample.submitted_at)),
+        "collector_name": Sample.submitted_by,
+        "tube_id": Sample.tube_id,
+        "soil_ph": Sample.soil_ph,
+        "depth_cm": Sample.depth_cm,
+        "lat": Sample.latitude,
+        "lon": Sample.longitude,
+        "affiliations": _string_array(
+            select(func.array_agg(Affiliation.name))
+            .select_from(SampleAffiliation)
+            .join(Affiliation, Affiliation.id == SampleAffiliation.affiliation_id)
+            .where(SampleAffiliation.sample_id == Sample.id)
+        ),
+        "affiliation_other": Sample.affiliation_other,
+        "species": _string_array(
+            select(func.array_agg(aggregate_order_by(SampleSpecies.species_name, SampleSpecies.id))).where(SampleSpecies.sample_id == Sample.id)
+        ),
+        "has_genomic_links": has_genomic_links(),
+        "possible_duplicate_of_id": Sample.possible_duplicate_of_id,
+    }
+
+
+def sample_rows(
+    db: Session,
+    fields: tuple[str, ...] = SAMPLE_FIELDS,
+    species: str | None = None,
+    status: str | None = None,
+    affiliation: str | None = None,
+) -> dict[str, Any]:
+    """``{"fields": [...], "rows": [[...], ...]}`` with the same values as ``sample_list``."""
+    columns = _row_columns()
+    stmt = (
+        select(*(columns[name].label(name) for name in fields))
+        .where(*sample_filter_clauses(species=species, status=status, affiliation=affiliation))
+        .order_by(Sample.submitted_at.desc())
+    )
+    return {"fields": list(fields), "rows": [tuple(row) for row in db.execute(stmt)]}
+
+
+def _sample_select(fields: tuple[str, ...], *extra_columns: ColumnElement) -> Select:
+    columns: list[Any] = [Sample, *extra_columns]
+    if "has_genomic_links" in fields:
+        columns.append(has_genomic_links().label("has_genomic_links"))
+    stmt = select(*columns)
+    if "affiliations" in fields:
+        stmt = stmt.options(selectinload(Sample.affiliations).selectinload(SampleAffiliation.affiliation))
+    if "species" in fields:
+        stmt = stmt.options(selectinload(Sample.species_entries))
+    return stmt
+
+
+def _shape(row: Row, fields: tuple[str, ...]) -> dict[str, Any]:
+    sample = row[0]
+    return {
+        name: row.has_genomic_links if name == "has_genomic_links" else _FIELD_VALUES[name](sample) for name in fields
+    }
+
+
+def current_change_token(db: Session) -> str:
+    """Token for the current snapshot; take it before reading the data it covers."""
+    txid = db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")).scalar_one()
+    return f"{txid}.{int(time.time())}"
+
+
+def parse_change_token(token: str | None) -> tuple[int, int] | None:
+    """``(txid, issued_at)`` from a change-feed token, ``(0, 0)`` when absent, None if malformed."""
+    if not token:
+        return 0, 0
+    txid, _, issued_at = token.partition(".")
+    if not (txid.isdigit() and issued_at.isdigit()):
+        return None
+    return int(txid), int(issued_at)
+
+
+def sample_changes(
+    db: Session,
+    since: int,
+    fields: tuple[str, ...] = SAMPLE_FIELDS,
+    species: str | None = None,
+    status: str | None = None,
+    affiliation: str | None = None,
+) -> dict[str, Any]:
+    """Samples written by transactions at or after ``since``, plus removals.
+
+    The returned token is the xmin of the current snapshot: every transaction
+    below it has finished, so anything committed later carries a txid at or
+    above it and shows up on the next call. Rows may repeat across calls;
+    clients apply them as upserts keyed by ``id``.
+    """
+    token = current_change_token(db)
+    filters = sample_filter_clauses(species=species, status=status, affiliation=affiliation)
+
+    if since == 0:
+        stmt = _sample_select(fields, true().label("matches_filter")).where(*filters)
+    else:
+        matches = and_(*filters) if filters else true()
+        stmt = _sample_select(fields, matches.label("matches_filter")).where(Sample.change_txid >= since)
+
+    changes: list[dict[str, Any]] = []
+    removed: list[dict[str, Any]] = []
+    for row in db.execute(stmt.order_by(Sample.id)):
+        sample = row[0]
+        if row.matches_filter:
+            changes.append({"id": sample.id, **_shape(row, fields)})
+        else:
+            removed.append({"id": sample.id, "sample_id": sample.external_sample_id, "deleted": False})
+
+    if since:
+        tombstones = db.execute(
+            select(SampleTombstone.sample_id, SampleTombstone.external_sample_id)
+            .where(SampleTombstone.change_txid >= since)
+            .order_by(SampleTombstone.sample_id)
+        ).all()
+        removed.extend({"id": row.sample_id, "sample_id": row.external_sample_id, "deleted": True} for row in tombstones)
+
+    return {"token": token, "full": since == 0, "changes": changes, "removed": removed}
+
+
+def prune_tombstones(db: Session, retention_days: int) -> int:
+    """Delete tombstones older than the change-feed retention window; commits."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = db.execute(delete(SampleTombstone).where(SampleTombstone.deleted_at < cutoff)).rowcount
+    db.commit()
+    return deleted
+
+
+def sample_detail(db: Session, external_id: str, include_raw: bool = False) -> dict[str, Any] | None:
+    sample = db.execute(
+        select(Sample)
+        .options(
+            selectinload(Sample.affiliations).selectinload(SampleAffiliation.affiliation),
+            selectinload(Sample.species_entries).selectinload(SampleSpecies.genomic_records),
+        )
+        .where(Sample.external_sample_id == external_id)
+    ).scalar_one_or_none()
+    if sample is None:
+        return None
+
+    detail: dict[str, Any] = {
+        "id": sample.id,
+        **{name: _FIELD_VALUES[name](sample) for name in SAMPLE_FIELDS if name != "has_genomic_links"},
+        "has_genomic_links": any(sp.genomic_records for sp in sample.species_entries),
+        "country": sample.country,
+        "country_code": sample.country_code,
+        "notes": sample.notes,
+        "submitted_at": sample.submitted_at.isoformat(),
+        "kobo_uuid": sample.kobo_uuid,
+        "kobo_id": sample.kobo_id,
+        "kobo_submission_time": sample.kobo_submission_time.isoformat() if sample.kobo_submission_time else None,
+        "affiliations": [
+            {"slug": sa.affiliation.name, "name": sa.affiliation.display_name} for sa in sample.affiliations
+        ],
+        "species": [
+            {
+                "id": sp.id,
+                "species_name": sp.species_name,
+                "is_provisional": sp.is_provisional,
+                "curated_by": sp.curated_by,
+                "genomic_records": [
+                    {
+                        "id": record.id,
+                        "accession": record.accession,
+                        "accession_validated": record.accession_validated,
+                        "resolved_url": record.resolved_url,
+                    }
+                    for record in sp.genomic_records
+                ],
+            }
+            for sp in sample.species_entries
+        ],
+    }
+    if include_raw:
+        detail["raw_payload"] = db.execute(
+            select(SampleRawPayload.payload).where(SampleRawPayload.sample_id == sample.id)
+        ).scalar_one_or_none()
+    return detail
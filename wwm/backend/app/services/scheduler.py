@@ -1,28 +1,204 @@
 import logging
+import threading
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
 
 from app.core.config import settings
-from app.db.session import SessionLocal
-from app.services.kobo_ingest import ingest_kobo_submissions
+from app.db.locks import INGEST_LOCK_KEY, SCHEDULER_LEADER_LOCK_KEY, try_advisory_lock
+from app.db.session import SessionLocal, engine
+from app.services.audit import ensure_audit_partitions
+from app.services.export import precompute_exports
+from app.services.genomics_import import validate_pending_accessions
+from app.services.kobo_ingest import run_kobo_ingest
+from app.services.kobo_webhook import drain_webhook_queue, prune_webhook_queue, webhook_enabled
+from app.services.photos import fetch_pending_photos
+from app.services.samples import prune_tombstones
+from app.services.stats import refresh_activity_rollup
 
 scheduler = BackgroundScheduler(timezone="UTC")
 logger = logging.getLogger(__name__)
 
 
-def run_ingestion_job() -> None:
+class LeaderElection:
+    """Single scheduler leader across uvicorn workers via a session-level advisory lock.
+
+    The leader keeps the lock on a dedicated connection for the life of the
+    process. If that connection dies the lock is released server-side and the
+    next worker to call ``ensure`` takes over.
+    """
+
+    def __init__(self, key: int):
+        self.key = key
+        self._connection: Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._connection is not None
+
+    def ensure(self) -> bool:
+        with self._lock:
+            if self._connection is not None:
+                try:
+                    self._connection.execute(text("SELECT 1"))
+                    return True
+                except DBAPIError:
+                    logger.warning("Scheduler leader connection lost; re-running election.")
+                    self._connection.invalidate()
+                    self._connection.close()
+                    self._connection = None
+
+            connection = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            try:
+                acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            except DBAPIError:
+                connection.invalidate()
+                connection.close()
+                raise
+            if not acquired:
+                connection.close()
+                return False
+
+            self._connection = connection
+            logger.info("This worker is now the scheduler leader.")
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            if self._connection is None:
+                return
+            try:
+                self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            except DBAPIError:
+                self._connection.invalidate()
+            finally:
+                self._connection.close()
+                self._connection = None
+
+
+leader = LeaderElection(SCHEDULER_LEADER_LOCK_KEY)
+
+
+def _record_run(mode: str) -> None:
     db = SessionLocal()
     try:
-        result = ingest_kobo_submissions(db, actor="scheduler")
-        logger.info("Scheduled Kobo ingestion complete: %s", result)
-    except Exception:
-        logger.exception("Scheduled Kobo ingestion failed.")
+        result = run_kobo_ingest(db, trigger="scheduler", mode=mode)
+        logger.info("Scheduled Kobo %s ingestion complete: %s", mode, result)
+        if result["ingested"]:
+            refresh_activity_rollup(db)
     finally:
         db.close()
 
 
+def run_ingestion_job(mode: str = "full") -> None:
+    try:
+        if not leader.ensure():
+            logger.debug("Not the scheduler leader; skipping %s Kobo ingestion.", mode)
+            return
+
+        with try_advisory_lock(INGEST_LOCK_KEY) as acquired:
+            if not acquired:
+                logger.info("Another Kobo ingestion is still running; skipping %s run.", mode)
+                return
+            _record_run(mode)
+    except Exception:
+        logger.exception("Scheduled Kobo %s ingestion failed.", mode)
+
+
+def run_audit_maintenance_job() -> None:
+    try:
+        if not leader.ensure():
+            return
+        db = SessionLocal()
+        try:
+            ensure_audit_partitions(db)
+            pruned = prune_tombstones(db, settings.change_feed_retention_days)
+            if pruned:
+                logger.info("Pruned %s sample tombstones.", pruned)
+            pruned = prune_webhook_queue(db)
+            if pruned:
+                logger.info("Pruned %s processed webhook submissions.", pruned)
+        finally:
+            db.close()
+    except Exception:
+        logger.exception("Daily maintenance failed.")
+
+
+def run_accession_validation_job() -> None:
+    try:
+        if not leader.ensure():
+            return
+        db = SessionLocal()
+        try:
+            checked = validate_pending_accessions(db)
+            if checked:
+                logger.info("Validated %s pending accessions against NCBI.", checked)
+        finally:
+            db.close()
+    except Exception:
+        logger.exception("Deferred accession validation failed.")
+
+
+def run_export_precompute_job() -> None:
+    try:
+        if not leader.ensure():
+            return
+        written = precompute_exports()
+        if written:
+            logger.info("Precomputed %s sample exports.", len(written))
+    except Exception:
+        logger.exception("Export precompute failed.")
+
+
+def run_webhook_drain_job() -> None:
+    try:
+        if not leader.ensure():
+            return
+        db = SessionLocal()
+        try:
+            result = drain_webhook_queue(db)
+            if result["ingested"] or result["errors"]:
+                logger.info("Drained Kobo webhook queue: %s", result)
+        finally:
+            db.close()
+    except Exception:
+        logger.exception("Kobo webhook queue drain failed.")
+
+
+def run_stats_refresh_job() -> None:
+    try:
+        if not leader.ensure():
+            return
+        db = SessionLocal()
+        try:
+            if refresh_activity_rollup(db):
+                logger.info("Refreshed sample activity rollup.")
+        finally:
+            db.close()
+    except Exception:
+        logger.exception("Sample activity rollup refresh failed.")
+
+
+def run_photo_fetch_job() -> None:
+    try:
+        if not leader.ensure():
+            return
+        db = SessionLocal()
+        try:
+            counts = fetch_pending_photos(db)
+            if counts["stored"] or counts["failed"]:
+                logger.info("Photo attachments: %s", counts)
+        finally:
+            db.close()
+    except Exception:
+        logger.exception("Photo attachment download failed.")
+
+
 def start_scheduler() -> None:
-    if scheduler.running:
+    if scheduler.running or not settings.scheduler_enabled:
         return
 
     scheduler.add_job(
@@ -30,15 +206,96 @@ def start_scheduler() -> None:
         trigger="cron",
         hour=settings.ingest_hour,
         minute=settings.ingest_minute,
+        kwargs={"mode": "full"},
         id="daily_kobo_ingest",
         replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+    if settings.ingest_interval_minutes > 0:
+        scheduler.add_job(
+            run_ingestion_job,
+            trigger="interval",
+            minutes=settings.ingest_interval_minutes,
+            kwargs={"mode": "incremental"},
+            id="incremental_kobo_ingest",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+    if webhook_enabled():
+        scheduler.add_job(
+            run_webhook_drain_job,
+            trigger="interval",
+            seconds=settings.webhook_drain_seconds,
+            id="kobo_webhook_drain",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+    scheduler.add_job(
+        run_audit_maintenance_job,
+        trigger="cron",
+        hour=0,
+        minute=15,
+        id="audit_partition_maintenance",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
     )
+    if settings.enable_real_ncbi_validation:
+        scheduler.add_job(
+            run_accession_validation_job,
+            trigger="interval",
+            minutes=10,
+            id="accession_validation",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+    scheduler.add_job(
+        run_stats_refresh_job,
+        trigger="interval",
+        minutes=settings.stats_refresh_minutes,
+        id="stats_refresh",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+    if settings.attachment_cache_dir:
+        scheduler.add_job(
+            run_photo_fetch_job,
+            trigger="interval",
+            minutes=settings.attachment_fetch_minutes,
+            id="photo_fetch",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+    if settings.export_cache_dir:
+        scheduler.add_job(
+            run_export_precompute_job,
+            trigger="interval",
+            minutes=15,
+            id="export_precompute",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
     scheduler.start()
+
+    try:
+        leader.ensure()
+    except DBAPIError:
+        logger.exception("Scheduler leader election failed; will retry on the next run.")
+
     job = scheduler.get_job("daily_kobo_ingest")
     logger.info(
-        "Kobo scheduler started (UTC %02d:%02d). Next run: %s",
+        "Kobo scheduler started (UTC %02d:%02d, incremental every %s min, leader=%s). Next run: %s",
         settings.ingest_hour,
         settings.ingest_minute,
+        settings.ingest_interval_minutes or "-",
+        leader.is_leader,
         job.next_run_time.isoformat() if job and job.next_run_time else "unknown",
     )
 
@@ -46,3 +303,4 @@ def start_scheduler() -> None:
 def stop_scheduler() -> None:
     if scheduler.running:
         scheduler.shutdown(wait=False)
+    leader.release()
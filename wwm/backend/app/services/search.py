@@ -0,0 +1,95 @@
+from typing import Any
+
+from sqlalchemy import ColumnElement, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import Sample, SampleSpecies
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _matches(query: str, column) -> ColumnElement[bool]:
+    """Substring or fuzzy word match; both forms are served by the pg_trgm GIN indexes."""
+    return or_(column.ilike(f"%{_escape_like(query)}%"), literal(query).op("<%")(column))
+
+
+def search(db: Session, query: str, limit: int = 10) -> list[dict[str, Any]]:
+    """Ranked typeahead matches over sample IDs, site names, notes and species names."""
+    query = query.strip()
+
+    id_score = func.word_similarity(query, Sample.external_sample_id)
+    site_score = func.coalesce(func.word_similarity(query, Sample.site_name), 0)
+    notes_score = func.coalesce(func.word_similarity(query, Sample.notes), 0) * 0.8
+    sample_score = func.greatest(id_score, site_score, notes_score).label("score")
+    sample_rows = db.execute(
+        select(
+            Sample.external_sample_id,
+            Sample.site_name,
+            Sample.status,
+            Sample.latitude,
+            Sample.longitude,
+            id_score.label("id_score"),
+            site_score.label("site_score"),
+            sample_score,
+        )
+        .where(
+            or_(
+                _matches(query, Sample.external_sample_id),
+                _matches(query, Sample.site_name),
+                _matches(query, Sample.notes),
+            )
+        )
+        .order_by(sample_score.desc(), Sample.external_sample_id)
+        .limit(limit)
+    ).all()
+
+    species_score = func.max(func.word_similarity(query, SampleSpecies.species_name)).label("score")
+    species_rows = db.execute(
+        select(
+            # The most common spelling is the one /api/species lists as a filter option.
+            func.mode().within_group(SampleSpecies.species_name).label("species_name"),
+            func.count(func.distinct(SampleSpecies.sample_id)).label("sample_count"),
+            species_score,
+        )
+        .where(_matches(query, SampleSpecies.species_name))
+        .group_by(func.lower(SampleSpecies.species_name))
+        .order_by(species_score.desc())
+        .limit(limit)
+    ).all()
+
+    results: list[dict[str, Any]] = []
+    for row in sample_rows:
+        if row.id_score >= row.score:
+            matched = "sample_id"
+        elif row.site_score >= row.score:
+            matched = "site_name"
+        else:
+            matched = "notes"
+        results.append(
+            {
+                "type": "sample",
+                "sample_id": row.external_sample_id,
+                "label": f"{row.external_sample_id} — {row.site_name or 'Unknown site'}",
+                "matched": matched,
+                "status": row.status,
+                "lat": row.latitude,
+                "lon": row.longitude,
+                "score": round(float(row.score), 3),
+            }
+        )
+    for row in species_rows:
+        results.append(
+            {
+                "type": "species",
+                "species_name": row.species_name,
+                "label": f"{row.species_name} ({row.sample_count})",
+                "matched": "species_name",
+                "sample_count": row.sample_count,
+                "score": round(float(row.score), 3),
+            }
+        )
+
+    results.sort(key=lambda item: item["score"], reverse=True)
+    return results[:limit]
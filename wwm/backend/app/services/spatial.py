@@ -0,0 +1,133 @@
+from datetime import date, timedelta
+import math
+from typing import Any
+
+from sqlalchemy import ColumnElement, Date, Float, Integer, and_, column, func, literal, select, values
+from sqlalchemy.orm import Session
+
+from app.models import Sample
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+def sample_geography() -> ColumnElement:
+    """``geography(samples.geom)``, matching the expression of ``idx_samples_geog``."""
+    return func.geography(Sample.geom)
+
+
+def point_geography(lat: float, lon: float) -> ColumnElement:
+    return func.geography(func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326))
+
+
+def samples_near(
+    db: Session,
+    lat: float,
+    lon: float,
+    radius_km: float,
+    k: int,
+    filters: list[ColumnElement[bool]] | None = None,
+) -> list[dict[str, Any]]:
+    """The ``k`` nearest samples within ``radius_km`` of a point, nearest first.
+
+    ``ST_DWithin`` on geography bounds the search and ``<->`` orders it; both
+    are served by the GiST index on ``geography(geom)``.
+    """
+    target = point_geography(lat, lon)
+    distance = func.ST_Distance(sample_geography(), target)
+    rows = db.execute(
+        select(
+            Sample.id,
+            Sample.external_sample_id,
+            Sample.status,
+            Sample.site_name,
+            Sample.sampling_date,
+            Sample.latitude,
+            Sample.longitude,
+            distance.label("distance_m"),
+        )
+        .where(func.ST_DWithin(sample_geography(), target, radius_km * 1000), *(filters or []))
+        .order_by(sample_geography().op("<->")(target))
+        .limit(k)
+    ).all()
+
+    return [
+        {
+            "id": row.id,
+            "sample_id": row.external_sample_id,
+            "status": row.status,
+            "site_name": row.site_name or "Unknown site",
+            "sampling_date": row.sampling_date.isoformat() if row.sampling_date else None,
+            "lat": row.latitude,
+            "lon": row.longitude,
+            "distance_km": round(row.distance_m / 1000, 3),
+        }
+        for row in rows
+    ]
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1_rad, lat2_rad = math.radians(lat1), math.radians(lat2)
+    d_lat = lat2_rad - lat1_rad
+    d_lon = math.radians(lon2 - lon1)
+    a = math.sin(d_lat / 2) ** 2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def find_nearby_samples(
+    db: Session,
+    candidates: list[tuple[int, float, float, date]],
+    radius_m: float,
+    window_days: int,
+) -> dict[int, int]:
+    """Map candidate key -> closest stored sample within ``radius_m`` and ``window_days`` of its sampling date.
+
+    ``candidates`` are ``(key, lat, lon, sampling_date)``; all of them are
+    checked in one query joined through the geography GiST index.
+    """
+    if not candidates:
+        return {}
+
+    points = values(
+        column("key", Integer),
+        column("lat", Float),
+        column("lon", Float),
+        column("sampling_date", Date),
+        name="candidates",
+    ).data(candidates)
+    candidate_point = func.geography(func.ST_SetSRID(func.ST_MakePoint(points.c.lon, points.c.lat), 4326))
+    window = literal(window_days)
+    rows = db.execute(
+        select(points.c.key, Sample.id)
+        .select_from(points)
+        .join(
+            Sample,
+            and_(
+                func.ST_DWithin(sample_geography(), candidate_point, radius_m),
+                Sample.sampling_date.between(points.c.sampling_date - window, points.c.sampling_date + window),
+            ),
+        )
+        .distinct(points.c.key)
+        .order_by(points.c.key, func.ST_Distance(sample_geography(), candidate_point))
+    ).all()
+    return {row.key: row.id for row in rows}
+
+
+def find_nearby_candidates(
+    candidates: list[tuple[int, float, float, date]],
+    radius_m: float,
+    window_days: int,
+) -> dict[int, list[int]]:
+    """Map candidate key -> every earlier candidate in the same list within the radius and date window, in order.
+
+    All of them are returned because an earlier match may itself not get
+    stored (a duplicate, a failed insert); callers pick the first that was.
+    """
+    matches: dict[int, list[int]] = {}
+    window = timedelta(days=window_days)
+    for position, (key, lat, lon, sampling_date) in enumerate(candidates):
+        for earlier_key, earlier_lat, earlier_lon, earlier_date in candidates[:position]:
+            if abs(sampling_date - earlier_date) > window:
+                continue
+            if haversine_m(lat, lon, earlier_lat, earlier_lon) <= radius_m:
+                matches.setdefault(key, []).append(earlier_key)
+    return matches
@@ -0,0 +1,183 @@
+"""Dashboard rollups maintained alongside sample writes.
+
+``country_stats`` holds one row per ISO country code (``ZZ`` for samples with
+no recognised country). Write paths call ``refresh_country_stats`` with the
+sample IDs they touched before committing, which recomputes only the affected
+countries through ``idx_samples_country_key``; reads never scan ``samples``.
+
+``sample_activity_monthly`` is a materialized view of distinct sample counts
+per month, status, species and affiliation (``*`` meaning all), built with
+GROUPING SETS. The scheduler leader refreshes it whenever the data version
+moves, so a time series is one index range scan.
+"""
+
+from collections.abc import Iterable
+from datetime import date
+from typing import Any
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.models import CountryStats
+from app.services.countries import UNKNOWN_COUNTRY_CODE, country_lookup, country_name
+from app.services.data_version import current_data_version
+
+_COUNTRY_KEY = f"coalesce(s.country_code, '{UNKNOWN_COUNTRY_CODE}')"
+
+_REFRESH_COUNTRIES = """
+    WITH scope AS (
+        SELECT s.id, s.status, {key} AS code FROM samples s {where}
+    ),
+    sample_counts AS (
+        SELECT
+            code,
+            count(*) AS sample_count,
+            count(*) FILTER (WHERE status = 'pending') AS pending_count,
+            count(*) FILTER (WHERE status = 'validated') AS validated_count,
+            count(*) FILTER (WHERE status = 'rejected') AS rejected_count
+        FROM scope
+        GROUP BY code
+    ),
+    species_counts AS (
+        SELECT sc.code, count(DISTINCT lower(ss.species_name)) AS species_count
+        FROM scope sc
+        JOIN sample_species ss ON ss.sample_id = sc.id
+        WHERE NOT ss.is_provisional
+        GROUP BY sc.code
+    ),
+    link_counts AS (
+        SELECT sc.code, count(g.id) AS genomic_link_count
+        FROM scope sc
+        JOIN sample_species ss ON ss.sample_id = sc.id
+        JOIN genomic_records g ON g.sample_species_id = ss.id
+        GROUP BY sc.code
+    )
+    INSERT INTO country_stats (
+        country_code, sample_count, pending_count, validated_count, rejected_count,
+        species_count, genomic_link_count, refreshed_at
+    )
+    SELECT
+        c.code, c.sample_count, c.pending_count, c.validated_count, c.rejected_count,
+        coalesce(sp.species_count, 0), coalesce(l.genomic_link_count, 0), now() AT TIME ZONE 'utc'
+    FROM sample_counts c
+    LEFT JOIN species_counts sp ON sp.code = c.code
+    LEFT JOIN link_counts l ON l.code = c.code
+    ON CONFLICT (country_code) DO UPDATE SET
+        sample_count = EXCLUDED.sample_count,
+        pending_count = EXCLUDED.pending_count,
+        validated_count = EXCLUDED.validated_count,
+        rejected_count = EXCLUDED.rejected_count,
+        species_count = EXCLUDED.species_count,
+        genomic_link_count = EXCLUDED.genomic_link_count,
+        refreshed_at = EXCLUDED.refreshed_at
+"""
+
+
+def refresh_country_stats(db: Session, sample_ids: Iterable[int] | None = None) -> int:
+    """Recompute rollup rows for the countries of ``sample_ids`` (all countries if None).
+
+    Does not commit; the caller owns the transaction. Returns the number of
+    countries refreshed.
+    """
+    if sample_ids is None:
+        db.execute(text("DELETE FROM country_stats"))
+        return db.execute(text(_REFRESH_COUNTRIES.format(key=_COUNTRY_KEY, where=""))).rowcount
+
+    ids = list(set(sample_ids))
+    if not ids:
+        return 0
+    codes = list(
+        db.execute(
+            text(f"SELECT DISTINCT {_COUNTRY_KEY} FROM samples s WHERE s.id = ANY(:ids)"), {"ids": ids}
+        ).scalars()
+    )
+    if not codes:
+        return 0
+    db.execute(text("DELETE FROM country_stats WHERE country_code = ANY(:codes)"), {"codes": codes})
+    statement = _REFRESH_COUNTRIES.format(key=_COUNTRY_KEY, where=f"WHERE {_COUNTRY_KEY} = ANY(:codes)")
+    db.execute(text(statement), {"codes": codes})
+    return len(codes)
+
+
+def backfill_country_codes(db: Session) -> int:
+    """Normalise ``samples.country`` into ``country_code`` for rows that predate the column."""
+    lookup = country_lookup()
+    if not lookup:
+        return 0
+    result = db.execute(
+        text(
+            "UPDATE samples s SET country_code = iso.code "
+            "FROM (SELECT unnest(CAST(:keys AS text[])) AS key, unnest(CAST(:codes AS text[])) AS code) iso "
+            "WHERE s.country_code IS NULL AND s.country IS NOT NULL AND lower(btrim(s.country)) = iso.key"
+        ),
+        {"keys": list(lookup.keys()), "codes": list(lookup.values())},
+    )
+    return result.rowcount
+
+
+def country_stats(db: Session) -> list[dict[str, Any]]:
+    rows = db.execute(select(CountryStats).order_by(CountryStats.sample_count.desc(), CountryStats.country_code)).scalars()
+    return [
+        {
+            "country_code": row.country_code,
+            "country_name": country_name(row.country_code),
+            "sample_count": row.sample_count,
+            "status": {
+                "pending": row.pending_count,
+                "validated": row.validated_count,
+                "rejected": row.rejected_count,
+            },
+            "species_richness": row.species_count,
+            "genomic_link_count": row.genomic_link_count,
+            "refreshed_at": row.refreshed_at.isoformat(),
+        }
+        for row in rows
+    ]
+
+
+_last_activity_refresh_version: int | None = None
+
+
+def refresh_activity_rollup(db: Session, force: bool = False) -> bool:
+    """Refresh ``sample_activity_monthly`` if sample data changed since the last refresh.
+
+    Uses REFRESH ... CONCURRENTLY so readers keep the previous contents
+    meanwhile. Commits. Returns whether a refresh ran.
+    """
+    global _last_activity_refresh_version
+    version = current_data_version(db)
+    if not force and version == _last_activity_refresh_version:
+        return False
+    db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY sample_activity_monthly"))
+    db.commit()
+    _last_activity_refresh_version = version
+    return True
+
+
+def sample_timeseries(
+    db: Session,
+    bucket: str = "month",
+    species: str | None = None,
+    affiliation: str | None = None,
+) -> list[dict[str, Any]]:
+    """Sample counts per time bucket from the monthly rollup, with a status breakdown."""
+    rows = db.execute(
+        text(
+            "SELECT date_trunc(:bucket, bucket)::date AS period, status, sum(sample_count) AS sample_count "
+            "FROM sample_activity_monthly "
+            "WHERE species_key = :species AND affiliation_key = :affiliation "
+            "GROUP BY period, status ORDER BY period"
+        ),
+        {
+            "bucket": bucket,
+            "species": species.strip().lower() if species else "*",
+            "affiliation": affiliation.strip().lower() if affiliation else "*",
+        },
+    ).all()
+
+    series: dict[date, dict[str, Any]] = {}
+    for row in rows:
+        point = series.setdefault(row.period, {"bucket": row.period.isoformat(), "count": 0, "status": {}})
+        point["count"] += int(row.sample_count)
+        point["status"][row.status] = int(row.sample_count)
+    return list(series.values())
@@ -0,0 +1,110 @@
+"""Compare JSON serialisation of large sample lists: default encoder vs FastJSONResponse.
+
+Usage: python -m scripts.bench_serialization [--sizes 10000,100000] [--repeat 3]
+
+Rows are synthetic tuples shaped like ``sample_rows`` output, so no database
+is needed. Each strategy starts from those tuples, so the "objects" cases
+include building one dict per row. Time is the best of ``--repeat`` runs;
+memory is the tracemalloc peak of a separate run.
+"""
+
+import argparse
+from datetime import date, timedelta
+import random
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.responses import FastJSONResponse, msgspec, orjson
+from app.services.samples import SAMPLE_FIELDS
+
+STATUSES = ("pending", "validated", "rejected")
+
+
+def synthetic_rows(count: int) -> list[tuple]:
+    rng = random.Random(count)
+    start = date(2023, 1, 1)
+    rows = []
+    for index in range(count):
+        rows.append(
+            (
+                f"WWM-{index:07d}",
+                "kobo",
+                rng.choice(STATUSES),
+                f"Site {index % 997}",
+                start + timedelta(days=index % 700),
+                f"Collector {index % 211}",
+                f"T{index:07d}",
+                round(rng.uniform(4, 9), 2),
+                round(rng.uniform(0, 60), 1),
+                rng.uniform(-60, 70),
+                rng.uniform(-180, 180),
+                ["uni-a", "lab-b"][: index % 3],
+                None,
+                ["Boletus edulis", "Amanita muscaria"][: index % 3],
+                index % 5 == 0,
+                None,
+            )
+        )
+    return rows
+
+
+def default_objects(rows: list[tuple]) -> bytes:
+    content = [dict(zip(SAMPLE_FIELDS, row)) for row in rows]
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast_objects(rows: list[tuple]) -> bytes:
+    return FastJSONResponse([dict(zip(SAMPLE_FIELDS, row)) for row in rows]).body
+
+
+def fast_rows(rows: list[tuple]) -> bytes:
+    return FastJSONResponse({"fields": list(SAMPLE_FIELDS), "rows": rows}).body
+
+
+STRATEGIES = {
+    "default objects": default_objects,
+    "fast objects": fast_objects,
+    "fast rows": fast_rows,
+}
+
+
+def measure(function, rows: list[tuple], repeat: int) -> tuple[float, int, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(function(rows))
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    function(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backend = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "json (no fast library installed)"
+    print(f"fast encoder: {backend}")
+    print(f"{'rows':>8}  {'strategy':<16} {'seconds':>9} {'peak MiB':>9} {'body MiB':>9} {'speedup':>8}")
+    for count in (int(size) for size in args.sizes.split(",")):
+        rows = synthetic_rows(count)
+        baseline = None
+        for name, function in STRATEGIES.items():
+            seconds, peak, size = measure(function, rows, args.repeat)
+            baseline = baseline or seconds
+            print(
+                f"{count:>8}  {name:<16} {seconds:>9.3f} {peak / 2**20:>9.1f} {size / 2**20:>9.1f} "
+                f"{baseline / seconds:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ from sqlalchemy import func, select
 from app.db.init_db import init_db
 from app.db.session import SessionLocal
 from app.models import Affiliation, Sample, SampleAffiliation, SampleSpecies
+from app.services.stats import refresh_country_stats
 
 
 def upsert_affiliation(name: str, display_name: str, db):
@@ -107,6 +108,7 @@ def main():
             species_names=["unidentified", "Pristionchus pacificus"],
         )
 
+        refresh_country_stats(db)
         db.commit()
         print("Seed data loaded.")
     finally:
@@ -0,0 +1,33 @@
+"""Bulk import curated species and genomic accessions from a CSV file.
+
+Usage: python -m scripts.import_genomics results.csv [--validate]
+"""
+
+import argparse
+import json
+
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+from app.services.genomics_import import import_genomics_csv, validate_pending_accessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv_path", help="CSV with external_sample_id,species_name,accession columns")
+    parser.add_argument("--validate", action="store_true", help="validate pending accessions against NCBI afterwards")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        with open(args.csv_path, encoding="utf-8-sig", newline="") as handle:
+            report = import_genomics_csv(db, handle, actor="import_script")
+        print(json.dumps(report.as_dict(), indent=2))
+        if args.validate:
+            print({"accessions_checked": validate_pending_accessions(db)})
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,36 @@
-"""Manual Kobo ingestion trigger script for local testing."""
+"""Manual Kobo ingestion trigger script for local testing.
+
+Resumes the last full (or ``--incremental``) run from its checkpoint if it
+stopped part-way; pass ``--fresh`` to start over.
+"""
+
+import argparse
+import sys
 
 from app.db.init_db import init_db
+from app.db.locks import INGEST_LOCK_KEY, try_advisory_lock
 from app.db.session import SessionLocal
-from app.services.kobo_ingest import ingest_kobo_submissions
+from app.services.kobo_ingest import run_kobo_ingest
 
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--incremental", action="store_true", help="only fetch submissions newer than the latest stored")
+    parser.add_argument("--fresh", action="store_true", help="ignore any unfinished run's checkpoint")
+    args = parser.parse_args()
+
     init_db()
-    db = SessionLocal()
-    try:
-        result = ingest_kobo_submissions(db, actor="manual_script")
-        print(result)
-    finally:
-        db.close()
+    with try_advisory_lock(INGEST_LOCK_KEY) as acquired:
+        if not acquired:
+            print("Another Kobo ingestion is running.", file=sys.stderr)
+            sys.exit(1)
+        db = SessionLocal()
+        try:
+            mode = "incremental" if args.incremental else "full"
+            result = run_kobo_ingest(db, trigger="manual_script", mode=mode, resume=not args.fresh)
+            print(result)
+        finally:
+            db.close()
 
 
 if __name__ == "__main__":
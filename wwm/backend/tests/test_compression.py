@@ -0,0 +1,111 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+
+from app.api.compression import CompressionMiddleware, negotiate_encoding
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        ("gzip", "gzip"),
+        ("br;q=0.5, gzip;q=0.8", "br"),
+        ("br;q=0, gzip", "gzip"),
+        ("GZIP;q=1.0", "gzip"),
+        ("*", "br"),
+        ("*;q=0.1, br;q=0", "gzip"),
+        ("gzip;q=0, *;q=1", "br"),
+        ("gzip;q=nonsense", None),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate_encoding(accept, expected):
+    assert negotiate_encoding(accept, ("br", "gzip")) == expected
+
+
+def _run(headers: list[tuple[bytes, bytes]], bodies: list[bytes], status: int = 200, minimum_size: int = 16):
+    """Messages sent by the middleware for an app answering with ``headers`` and ``bodies``."""
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": list(headers)})
+        for index, body in enumerate(bodies):
+            await send({"type": "http.response.body", "body": body, "more_body": index < len(bodies) - 1})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=minimum_size)(scope, receive, send))
+    return sent
+
+
+def _headers(message) -> dict[str, str]:
+    return {name.decode().lower(): value.decode() for name, value in message["headers"]}
+
+
+def test_compresses_complete_bodies_and_weakens_the_etag():
+    body = b"sample," * 100
+    start, message = _run(
+        [(b"content-type", b"text/csv"), (b"content-length", str(len(body)).encode()), (b"etag", b'"abc"')],
+        [body],
+    )
+    headers = _headers(start)
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert headers["etag"] == 'W/"abc"'
+    assert headers["content-length"] == str(len(message["body"]))
+    assert gzip.decompress(message["body"]) == body
+
+
+def test_keeps_an_already_weak_etag():
+    start, _ = _run([(b"content-type", b"text/csv"), (b"etag", b'W/"abc"')], [b"x" * 64])
+    assert _headers(start)["etag"] == 'W/"abc"'
+
+
+def test_small_bodies_pass_through_unchanged():
+    start, message = _run([(b"content-type", b"application/json"), (b"etag", b'"abc"')], [b"{}"])
+    headers = _headers(start)
+    assert "content-encoding" not in headers
+    assert headers["etag"] == '"abc"'
+    assert message["body"] == b"{}"
+
+
+@pytest.mark.parametrize(
+    ("status", "headers"),
+    [
+        (204, []),
+        (304, [(b"etag", b'"abc"')]),
+        (206, [(b"content-range", b"bytes 0-99/200")]),
+        (200, [(b"content-encoding", b"br")]),
+        (200, [(b"content-type", b"text/event-stream")]),
+        (200, [(b"content-type", b"image/png")]),
+        (200, [(b"content-type", b"application/vnd.apache.parquet")]),
+    ],
+)
+def test_skipped_responses_pass_through(status, headers):
+    body = b"x" * 64
+    start, message = _run(headers, [body], status=status)
+    assert _headers(start).get("content-encoding") in (None, "br")
+    assert message["body"] == body
+
+
+def test_streamed_chunks_are_flushed_as_they_arrive():
+    chunks = [b"first chunk " * 8, b"second chunk " * 8, b"last"]
+    start, *messages = _run([(b"content-type", b"application/x-ndjson")], chunks)
+    headers = _headers(start)
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert [message["more_body"] for message in messages] == [True, True, False]
+
+    decoder = zlib.decompressobj(31)
+    for chunk, message in zip(chunks, messages):
+        assert decoder.decompress(message["body"]) == chunk
+    assert decoder.eof
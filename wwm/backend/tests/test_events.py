@@ -0,0 +1,35 @@
+import json
+
+from app.services.events import RESYNC, coalesce_events
+
+
+def _payload(op: str, *rows) -> str:
+    return json.dumps({"op": op, "rows": [list(row) for row in rows]})
+
+
+def test_coalesce_keeps_the_last_change_per_sample():
+    events = coalesce_events(
+        [
+            _payload("insert", (1, "pending", 10.0, 20.0), (2, "pending", 11.0, 21.0)),
+            _payload("update", (1, "approved", 10.0, 20.0)),
+        ],
+        limit=10,
+    )
+
+    assert events == [
+        {"type": "sample", "op": "insert", "id": 2, "status": "pending", "lat": 11.0, "lon": 21.0},
+        {"type": "sample", "op": "update", "id": 1, "status": "approved", "lat": 10.0, "lon": 20.0},
+    ]
+
+
+def test_coalesce_resyncs_on_large_bursts_and_trigger_requests():
+    rows = [(sample_id, "pending", 0.0, 0.0) for sample_id in range(5)]
+
+    assert coalesce_events([_payload("update", *rows)], limit=4) == [RESYNC]
+    assert coalesce_events([_payload("delete", rows[0]), '{"resync":true}'], limit=10) == [RESYNC]
+
+
+def test_coalesce_skips_malformed_payloads():
+    assert coalesce_events(["not json", _payload("delete", (3, "rejected", None, None))], limit=10) == [
+        {"type": "sample", "op": "delete", "id": 3, "status": "rejected", "lat": None, "lon": None}
+    ]
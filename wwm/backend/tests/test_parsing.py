@@ -0,0 +1,85 @@
+from array import array
+import hashlib
+import hmac
+import struct
+
+import pytest
+
+from app.core.config import settings
+from app.services.kobo_assets import DEFAULT_FIELD_KEYS, _parse_asset
+from app.services.kobo_webhook import verify_webhook
+from app.services.points import points_as_bytes
+from app.services.samples import SAMPLE_FIELDS, parse_change_token, parse_fields
+
+
+@pytest.mark.parametrize(
+    ("token", "expected"),
+    [
+        (None, (0, 0)),
+        ("", (0, 0)),
+        ("1234.1700000000", (1234, 1700000000)),
+        ("1234", None),
+        ("1234.", None),
+        ("-1.5", None),
+        ("12a.5", None),
+        ("1.2.3", None),
+    ],
+)
+def test_parse_change_token(token, expected):
+    assert parse_change_token(token) == expected
+
+
+def test_parse_fields():
+    assert parse_fields(None) == SAMPLE_FIELDS
+    assert parse_fields(" , ") == SAMPLE_FIELDS
+    assert parse_fields("lat, sample_id,lat,") == ("lat", "sample_id")
+    with pytest.raises(ValueError, match="password, id2"):
+        parse_fields("sample_id,password,id2")
+
+
+def test_points_as_bytes_packs_little_endian_columns():
+    packed = points_as_bytes(array("i", [7, 9]), array("f", [1.5, -2.0]), array("f", [30.0, 31.25]), array("B", [1, 2]))
+    assert packed == struct.pack("<2i2f2f2B", 7, 9, 1.5, -2.0, 30.0, 31.25, 1, 2)
+
+
+def _sign(secret: str, body: bytes) -> str:
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def test_verify_webhook_signature(monkeypatch):
+    monkeypatch.setattr(settings, "kobo_webhook_secret", "s3cret")
+    monkeypatch.setattr(settings, "kobo_webhook_token", "")
+    body = b'{"_uuid": "a"}'
+    signature = _sign("s3cret", body)
+    assert verify_webhook(body, signature, None)
+    assert verify_webhook(body, f"sha256={signature.upper()}", None)
+    assert not verify_webhook(body + b" ", signature, None)
+    assert not verify_webhook(body, _sign("other", body), None)
+    assert not verify_webhook(body, None, "s3cret")
+
+
+def test_verify_webhook_token(monkeypatch):
+    monkeypatch.setattr(settings, "kobo_webhook_secret", "s3cret")
+    monkeypatch.setattr(settings, "kobo_webhook_token", "tok")
+    assert verify_webhook(b"{}", "bad", "tok")
+    assert not verify_webhook(b"{}", None, "tok2")
+    monkeypatch.setattr(settings, "kobo_webhook_token", "")
+    assert not verify_webhook(b"{}", None, "")
+
+
+def test_parse_asset(monkeypatch):
+    monkeypatch.setattr(settings, "kobo_base_url", "https://kf.example.org")
+    monkeypatch.setattr(settings, "kobo_token", "default-token")
+    asset = _parse_asset({"uid": " aAsset ", "fields": {"sample_id": "code", "tube_id": ["tube", "tube_no"]}})
+    assert (asset.uid, asset.name, asset.base_url, asset.token) == ("aAsset", "aAsset", "https://kf.example.org", "default-token")
+    assert asset.keys("sample_id") == ("code",)
+    assert asset.keys("tube_id") == ("tube", "tube_no")
+    assert asset.keys("soil_ph") == DEFAULT_FIELD_KEYS["soil_ph"]
+
+    own = _parse_asset({"uid": "b", "name": "Other", "base_url": "https://eu.example.org", "token": "t"})
+    assert (own.name, own.base_url, own.token) == ("Other", "https://eu.example.org", "t")
+
+    with pytest.raises(ValueError, match="uid"):
+        _parse_asset({"name": "nameless"})
+    with pytest.raises(ValueError, match="'colour'"):
+        _parse_asset({"uid": "c", "fields": {"colour": "c"}})
@@ -0,0 +1,158 @@
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+
+import pytest
+import requests
+from starlette.requests import Request
+
+from app.api.routes import get_sample_photo
+from app.core.config import settings
+from app.models import SamplePhoto
+from app.services.kobo_assets import KoboAsset
+from app.services.photos import (
+    UnsupportedAttachment,
+    _download,
+    original_path,
+    photo_file,
+    thumbnail_path,
+)
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+ATTACHMENTS = {
+    "/photo.png": ("image/png", PNG),
+    "/photo.svg": ("image/svg+xml", b'<svg xmlns="http://www.w3.org/2000/svg" onload="alert(1)"/>'),
+    "/photo.html": ("text/html; charset=utf-8", b"<script>alert(1)</script>"),
+}
+
+
+class _KoboStub(BaseHTTPRequestHandler):
+    authorizations: list[str | None] = []
+
+    def do_GET(self) -> None:
+        self.authorizations.append(self.headers.get("Authorization"))
+        if self.path not in ATTACHMENTS:
+            self.send_error(404)
+            return
+        media_type, body = ATTACHMENTS[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", media_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def kobo_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KoboStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _KoboStub.authorizations = []
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def _asset(base_url: str) -> KoboAsset:
+    return KoboAsset("aAsset", "test", base_url, "secret")
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "attachment_cache_dir", str(tmp_path))
+    return tmp_path
+
+
+class _FakeSession:
+    def __init__(self, photo: SamplePhoto | None) -> None:
+        self.photo = photo
+
+    def execute(self, statement):
+        return self
+
+    def scalar_one_or_none(self):
+        return self.photo
+
+
+def _stored_photo(cache_dir, body: bytes, media_type: str, has_thumbnail: bool = False) -> SamplePhoto:
+    content_hash = hashlib.sha256(body).hexdigest()
+    path = original_path(cache_dir, content_hash)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+    return SamplePhoto(
+        sample_id=7, status="stored", content_hash=content_hash, media_type=media_type, has_thumbnail=has_thumbnail
+    )
+
+
+def _request(headers: dict[str, str] | None = None) -> Request:
+    raw = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw, "query_string": b""})
+
+
+def test_download_stores_raster_image_under_its_hash(kobo_url, cache_dir):
+    with requests.Session() as session:
+        content_hash, media_type, size = _download(session, f"{kobo_url}/photo.png", _asset(kobo_url), cache_dir)
+
+    assert content_hash == hashlib.sha256(PNG).hexdigest()
+    assert (media_type, size) == ("image/png", len(PNG))
+    assert original_path(cache_dir, content_hash).read_bytes() == PNG
+    assert _KoboStub.authorizations == ["Token secret"]
+    assert list((cache_dir / "tmp").iterdir()) == []
+
+
+@pytest.mark.parametrize("path", ["/photo.svg", "/photo.html"])
+def test_download_refuses_scriptable_types(kobo_url, cache_dir, path):
+    with requests.Session() as session, pytest.raises(UnsupportedAttachment):
+        _download(session, f"{kobo_url}{path}", _asset(kobo_url), cache_dir)
+
+    assert not (cache_dir / "originals").exists()
+    assert list((cache_dir / "tmp").iterdir()) == []
+
+
+def test_download_keeps_the_token_away_from_other_hosts(kobo_url, cache_dir):
+    with requests.Session() as session, pytest.raises(UnsupportedAttachment):
+        _download(session, f"{kobo_url}/photo.png", _asset("https://kf.kobotoolbox.org"), cache_dir)
+
+    assert _KoboStub.authorizations == []
+
+
+def test_photo_file_prefers_thumbnail_and_falls_back_to_original(cache_dir):
+    photo = _stored_photo(cache_dir, PNG, "image/png", has_thumbnail=True)
+    db = _FakeSession(photo)
+
+    path, media_type, etag = photo_file(db, 7, "thumbnail")
+    assert (path, media_type) == (original_path(cache_dir, photo.content_hash), "image/png")
+    assert etag == f'"{photo.content_hash}"'
+
+    thumbnail = thumbnail_path(cache_dir, photo.content_hash)
+    thumbnail.parent.mkdir(parents=True, exist_ok=True)
+    thumbnail.write_bytes(b"jpeg")
+    assert photo_file(db, 7, "thumbnail")[:2] == (thumbnail, "image/jpeg")
+    assert photo_file(db, 7, "original")[0] == original_path(cache_dir, photo.content_hash)
+    assert photo_file(_FakeSession(None), 7) is None
+
+
+def test_photo_route_serves_images_inline_with_nosniff(cache_dir):
+    photo = _stored_photo(cache_dir, PNG, "image/png")
+
+    response = get_sample_photo(7, _request(), "original", _FakeSession(photo))
+
+    assert response.media_type == "image/png"
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert "content-disposition" not in response.headers
+
+    cached = get_sample_photo(7, _request({"If-None-Match": f'"{photo.content_hash}"'}), "original", _FakeSession(photo))
+    assert cached.status_code == 304
+
+
+@pytest.mark.parametrize("media_type", ["image/svg+xml", "text/html", None])
+def test_photo_route_sends_other_types_as_attachments(cache_dir, media_type):
+    photo = _stored_photo(cache_dir, b"<svg onload='alert(1)'/>", media_type)
+
+    response = get_sample_photo(7, _request(), "thumbnail", _FakeSession(photo))
+
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["content-disposition"].startswith("attachment;")
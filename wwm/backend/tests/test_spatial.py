@@ -0,0 +1,16 @@
+from datetime import date
+
+from app.services.spatial import find_nearby_candidates
+
+
+def test_find_nearby_candidates_returns_every_earlier_match_in_order():
+    day = date(2024, 5, 1)
+    candidates = [
+        (10, 52.0, 4.0, day),
+        (11, 52.0001, 4.0, day),
+        (12, 52.0002, 4.0, date(2024, 5, 3)),
+        (13, 52.0001, 4.0, date(2024, 9, 1)),
+        (14, 40.0, 4.0, day),
+    ]
+
+    assert find_nearby_candidates(candidates, radius_m=50, window_days=7) == {11: [10], 12: [10, 11]}
@@ -14,7 +14,8 @@ const refreshBtn = document.getElementById("refresh-btn");
 const apiStatus = document.getElementById("apiStatus");
 const statusText = apiStatus ? apiStatus.querySelector(".status-text") : null;
 const emptyState = document.getElementById("emptyState");
-const affiliationNamesBySlug = {};
+const searchBox = document.getElementById("search-box");
+const searchResults = document.getElementById("search-results");
 
 function setApiStatus(isOnline) {
   if (!apiStatus) return;
@@ -57,52 +58,107 @@ function buildSampleQuery() {
   return query ? `?${query}` : "";
 }
 
-function getLatLon(sample) {
-  const lat = Number(sample.lat);
-  const lon = Number(sample.lon);
-  if (Number.isFinite(lat) && Number.isFinite(lon)) {
-    return [lat, lon];
+const POINT_RECORD_BYTES = 13;
+
+async function getPoints(url) {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`Request failed: ${url} (${response.status})`);
+  }
+  const buffer = await response.arrayBuffer();
+  const count = Number(response.headers.get("X-Point-Count") ?? buffer.byteLength / POINT_RECORD_BYTES);
+  const statusCodes = (response.headers.get("X-Status-Codes") || "pending,validated,rejected").split(",");
+  return {
+    count,
+    statusCodes,
+    ids: new Int32Array(buffer, 0, count),
+    lat: new Float32Array(buffer, count * 4, count),
+    lon: new Float32Array(buffer, count * 8, count),
+    status: new Int8Array(buffer, count * 12, count),
+    token: response.headers.get("X-Change-Token"),
+  };
+}
+
+function popupHtml(sample) {
+  const affiliations = sample.affiliations.length
+    ? sample.affiliations.map((item) => item.name || item.slug).join(", ")
+    : "n/a";
+  const affiliationOther = sample.affiliation_other ? ` (${sample.affiliation_other})` : "";
+  const species = sample.species.length ? sample.species.join(", ") : "n/a";
+  const photo = sample.has_photo
+    ? `<a href="${API_BASE}/samples/${sample.id}/photo?variant=original" target="_blank" rel="noopener">` +
+      `<img class="popup-photo" src="${API_BASE}/samples/${sample.id}/photo" alt="Sample photo" loading="lazy"></a><br>`
+    : "";
+  return (
+    photo +
+    `<strong>sample_id:</strong> ${sample.sample_id || "n/a"}<br>` +
+    `<strong>status:</strong> ${sample.status || "n/a"}<br>` +
+    `<strong>site_name:</strong> ${sample.site_name || "n/a"}<br>` +
+    `<strong>sampling_date:</strong> ${sample.sampling_date || "n/a"}<br>` +
+    `<strong>collector_name:</strong> ${sample.collector_name || "n/a"}<br>` +
+    `<strong>tube_id:</strong> ${sample.tube_id || "n/a"}<br>` +
+    `<strong>affiliations:</strong> ${affiliations}${affiliationOther}<br>` +
+    `<strong>species:</strong> ${species}`
+  );
+}
+
+async function loadPopup(event) {
+  const marker = event.target;
+  if (marker.popupLoaded) return;
+  try {
+    const sample = await getJson(`${API_BASE}/samples/points/${marker.sampleId}`);
+    marker.popupLoaded = true;
+    marker.setPopupContent(popupHtml(sample));
+  } catch (error) {
+    marker.setPopupContent("Could not load sample details.");
+    console.warn("Could not load sample details.", error);
   }
-  if (
-    sample.geometry &&
-    Array.isArray(sample.geometry.coordinates) &&
-    sample.geometry.coordinates.length >= 2
-  ) {
-    return [sample.geometry.coordinates[1], sample.geometry.coordinates[0]];
+}
+
+const markersById = new Map();
+let changeToken = null;
+
+function upsertMarker(id, lat, lon, status) {
+  const existing = markersById.get(id);
+  if (existing) {
+    existing.setLatLng([lat, lon]);
+    existing.setStyle(styleForStatus(status));
+    existing.popupLoaded = false;
+    return;
   }
-  return null;
+  const marker = L.circleMarker([lat, lon], styleForStatus(status));
+  marker.sampleId = id;
+  marker.bindPopup("Loading…");
+  marker.on("popupopen", loadPopup);
+  markersById.set(id, marker);
+  markerLayer.addLayer(marker);
+}
+
+function removeMarker(id) {
+  const marker = markersById.get(id);
+  if (!marker) return;
+  markerLayer.removeLayer(marker);
+  markersById.delete(id);
 }
 
-function renderMarkers(samples) {
+function clearMarkers() {
   markerLayer.clearLayers();
+  markersById.clear();
+  changeToken = null;
+}
 
-  samples.forEach((sample) => {
-    const coords = getLatLon(sample);
-    if (!coords) {
-      return;
-    }
+function renderMarkers(points) {
+  clearMarkers();
+  for (let i = 0; i < points.count; i += 1) {
+    upsertMarker(points.ids[i], points.lat[i], points.lon[i], points.statusCodes[points.status[i]]);
+  }
+  changeToken = points.token;
+}
 
-    const affiliations = Array.isArray(sample.affiliations)
-      ? sample.affiliations
-          .map((slug) => affiliationNamesBySlug[slug] || slug)
-          .join(", ")
-      : "n/a";
-    const affiliationOther = sample.affiliation_other ? ` (${sample.affiliation_other})` : "";
-    const species = Array.isArray(sample.species) ? sample.species.join(", ") : "n/a";
-
-    const marker = L.circleMarker(coords, styleForStatus(sample.status));
-    marker.bindPopup(
-      `<strong>sample_id:</strong> ${sample.sample_id || "n/a"}<br>` +
-        `<strong>status:</strong> ${sample.status || "n/a"}<br>` +
-        `<strong>site_name:</strong> ${sample.site_name || "n/a"}<br>` +
-        `<strong>sampling_date:</strong> ${sample.sampling_date || "n/a"}<br>` +
-        `<strong>collector_name:</strong> ${sample.collector_name || "n/a"}<br>` +
-        `<strong>tube_id:</strong> ${sample.tube_id || "n/a"}<br>` +
-        `<strong>affiliations:</strong> ${affiliations}${affiliationOther}<br>` +
-        `<strong>species:</strong> ${species}`
-    );
-    markerLayer.addLayer(marker);
-  });
+function applyChanges(feed) {
+  feed.changes.forEach((sample) => upsertMarker(sample.id, sample.lat, sample.lon, sample.status));
+  feed.removed.forEach((sample) => removeMarker(sample.id));
+  changeToken = feed.token;
 }
 
 async function loadFilters() {
@@ -124,7 +180,6 @@ async function loadFilters() {
       const option = document.createElement("option");
       option.value = item.slug;
       option.textContent = item.name || item.slug;
-      affiliationNamesBySlug[item.slug] = item.name || item.slug;
       affiliationFilter.appendChild(option);
     });
   } catch (error) {
@@ -135,20 +190,151 @@ async function loadFilters() {
 
 async function loadSamples() {
   try {
-    const samples = await getJson(`${API_BASE}/samples${buildSampleQuery()}`);
-    const list = Array.isArray(samples) ? samples : [];
+    const query = buildSampleQuery();
+    const points = await getPoints(`${API_BASE}/samples/points${query ? `${query}&` : "?"}format=binary`);
     setApiStatus(true);
-    renderMarkers(list);
-    setEmptyState(list.length === 0);
+    renderMarkers(points);
+    setEmptyState(points.count === 0);
   } catch (error) {
     setApiStatus(false);
-    renderMarkers([]);
+    clearMarkers();
     setEmptyState(false);
     console.warn("Could not load samples from API.", error);
   }
 }
 
-refreshBtn.addEventListener("click", loadSamples);
+async function syncSamples() {
+  if (!changeToken) {
+    await loadSamples();
+    return;
+  }
+  const params = new URLSearchParams(buildSampleQuery().slice(1));
+  params.set("since", changeToken);
+  params.set("fields", "lat,lon,status");
+  try {
+    const response = await fetch(`${API_BASE}/samples/changes?${params}`);
+    if (response.status === 410) {
+      await loadSamples();
+      return;
+    }
+    if (!response.ok) {
+      throw new Error(`Change feed failed (${response.status})`);
+    }
+    applyChanges(await response.json());
+    setApiStatus(true);
+    setEmptyState(markersById.size === 0);
+  } catch (error) {
+    setApiStatus(false);
+    console.warn("Could not sync sample changes.", error);
+  }
+}
+
+let syncTimer = null;
+
+function scheduleSync() {
+  clearTimeout(syncTimer);
+  syncTimer = setTimeout(syncSamples, 1000);
+}
+
+function applySampleEvent(event) {
+  // Species and affiliation membership is not in the event, so filtered views go through the change feed.
+  if (speciesFilter.value || affiliationFilter.value) {
+    scheduleSync();
+    return;
+  }
+  const hidden = event.op === "delete" || event.lat === null || event.lon === null;
+  if (hidden || (statusFilter.value && event.status !== statusFilter.value)) {
+    removeMarker(event.id);
+  } else {
+    upsertMarker(event.id, event.lat, event.lon, event.status);
+  }
+  setEmptyState(markersById.size === 0);
+}
+
+function subscribeToEvents() {
+  if (!window.EventSource) return;
+  const source = new EventSource(`${API_BASE}/events`);
+  let connected = false;
+  source.addEventListener("open", () => {
+    // Anything written while we were disconnected is only in the change feed.
+    if (connected) scheduleSync();
+    connected = true;
+  });
+  source.addEventListener("sample", (message) => applySampleEvent(JSON.parse(message.data)));
+  source.addEventListener("resync", scheduleSync);
+}
+
+let searchTimer = null;
+let searchController = null;
+
+function hideSearchResults() {
+  searchResults.classList.add("hidden");
+  searchResults.innerHTML = "";
+}
+
+function selectSearchResult(result) {
+  hideSearchResults();
+  if (result.type === "species") {
+    const wanted = result.species_name.toLowerCase();
+    const option = Array.from(speciesFilter.options).find((item) => item.value.toLowerCase() === wanted);
+    searchBox.value = result.species_name;
+    speciesFilter.value = option ? option.value : "";
+    loadSamples();
+    return;
+  }
+  searchBox.value = result.sample_id;
+  if (Number.isFinite(result.lat) && Number.isFinite(result.lon)) {
+    map.setView([result.lat, result.lon], 12);
+  }
+}
+
+function renderSearchResults(results) {
+  searchResults.innerHTML = "";
+  results.forEach((result) => {
+    const item = document.createElement("li");
+    const type = document.createElement("span");
+    type.className = "result-type";
+    type.textContent = result.type;
+    item.appendChild(type);
+    item.appendChild(document.createTextNode(result.label));
+    item.addEventListener("mousedown", (event) => {
+      event.preventDefault();
+      selectSearchResult(result);
+    });
+    searchResults.appendChild(item);
+  });
+  searchResults.classList.toggle("hidden", results.length === 0);
+}
+
+async function runSearch(query) {
+  if (searchController) searchController.abort();
+  searchController = new AbortController();
+  try {
+    const response = await fetch(`${API_BASE}/search?q=${encodeURIComponent(query)}`, {
+      signal: searchController.signal,
+    });
+    if (!response.ok) throw new Error(`Search failed (${response.status})`);
+    const payload = await response.json();
+    renderSearchResults(payload.results || []);
+  } catch (error) {
+    if (error.name !== "AbortError") {
+      console.warn("Search request failed.", error);
+    }
+  }
+}
+
+searchBox.addEventListener("input", () => {
+  clearTimeout(searchTimer);
+  const query = searchBox.value.trim();
+  if (query.length < 3) {
+    hideSearchResults();
+    return;
+  }
+  searchTimer = setTimeout(() => runSearch(query), 200);
+});
+searchBox.addEventListener("blur", hideSearchResults);
+
+refreshBtn.addEventListener("click", syncSamples);
 speciesFilter.addEventListener("change", loadSamples);
 statusFilter.addEventListener("change", loadSamples);
 affiliationFilter.addEventListener("change", loadSamples);
@@ -157,5 +343,6 @@ setApiStatus(false);
 setEmptyState(false);
 loadFilters();
 loadSamples();
+subscribeToEvents();
 
 setTimeout(() => map.invalidateSize(), 0);